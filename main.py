@@ -1,74 +1,288 @@
+from modules.startup_clock import STARTUP_TIME  # First, so startup reports include the imports below
+import argparse
 import cv2
 import logging
-import pygame
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from modules.fatigue_detector import FatigueDetector
 from modules.posture_analyzer import PostureAnalyzer
 from modules.hand_detector import HandDetector
 from modules.alert_system import AlertSystem
+from modules.alert_dispatcher import AlertDispatcher, SoundSink, FileSink, UdpSink
 from modules.visualizer import Visualizer
+from modules.batch_analyzer import BatchAnalyzer, default_output_path
+from modules.shard_runner import ShardRunner, find_videos
+from modules.frame_pipeline import FramePipeline
+from modules.frame_context import FrameContext
+from modules.detector_scheduler import DetectorScheduler, parse_cadence
+from modules.face_region import FaceRegionTracker
+from modules.fleet_server import FleetServer
+from modules.detection_results import PostureResult, HandsResult
+from modules.metrics import PipelineMetrics, MetricsServer, SnapshotWriter
+from modules.telemetry_store import TelemetryRecorder
+from modules.temporal import CaptureClock
+from modules.quality_governor import QualityGovernor
+from modules.output_recorder import OutputRecorder
+from modules.process_pipeline import ProcessPipeline
 
 class DriverMonitoringSystem:
-    def __init__(self, fatigue_model_path, alert_sound_path='alert_sound.wav'):
+    def __init__(self, fatigue_model_path, alert_sound_path='alert_sound.wav', fatigue_backend=None,
+                 detector_cadence=None, hand_pose_roi=True, face_roi=False, render=True, metrics=None,
+                 background_init=False, startup_time=None, recorder=None, alert_sinks=None, alert_cooldown=5.0,
+                 target_fps=None, output_recorder=None, display=True):
         # Initialize logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
-        # Initialize pygame mixer for sound
-        pygame.mixer.init()
+        # Startup milestones are measured from startup_time (e.g. process start), defaulting to now
+        self.startup_time = time.perf_counter() if startup_time is None else startup_time
+        self.startup_report = {}
+        self.ready = threading.Event()  # Set once every detector is loaded and warmed up
+        self.load_error = None
+
+        # With render=False nothing is drawn or displayed and no flipped display copy is kept; with
+        # display=False overlays are still drawn (e.g. for recording) but no window is opened
+        self.render = render
+        self.display = render and display
+        self.visualizer = Visualizer()
+
+        # Shared per-frame buffers; four flipped-frame buffers cover the pipelined display queue
+        self.frame_context = FrameContext(frame_buffers=4, keep_frame=render)
+        # Per-detector cadence, e.g. {"fatigue": {"every": 3}, "posture": {"hz": 10}}; the last result of
+        # a detector that was skipped on a frame is carried forward
+        self.scheduler = DetectorScheduler(detector_cadence)
+        self.base_cadence = dict(self.scheduler.cadence)  # Restored when the quality governor is back at full quality
+        self.detector_results = {"fatigue": None, "posture": PostureResult(), "hands": HandsResult()}
+
+        # Stage timings, frame/alert counters and gauges; cheap enough to always be on
+        self.metrics = metrics or PipelineMetrics()
+
+        self.last_results = None  # Verdict of the most recent frame
+        self.pipeline = None  # FramePipeline of the last pipelined run
+        self.recorder = recorder  # Optional TelemetryRecorder that keeps every verdict on disk
+
+        # Optional governor that trades analysis quality for speed to hold a target frame rate
+        self.quality_governor = QualityGovernor(target_fps) if target_fps else None
+        # Optional OutputRecorder that saves the annotated frames on its own thread
+        self.output_recorder = output_recorder
+
+        # Alerts are handed to a background dispatcher so sound and logging never stall the frame loop;
+        # the alert sound is added as a sink once it has loaded
+        self.alert_dispatcher = AlertDispatcher(alert_sinks, cooldown=alert_cooldown, metrics=self.metrics).start()
+
+        # Heavy components are loaded in parallel. With background_init this happens on a separate thread so
+        # the camera can start right away; frames are reported as initializing until everything is ready.
+        self.fatigue_detector = self.posture_analyzer = self.hand_detector = None
+        self.alert_system = self.face_tracker = None
+        load_args = (fatigue_model_path, alert_sound_path, fatigue_backend, hand_pose_roi, face_roi)
+        if background_init:
+            self.loader = threading.Thread(target=self._load_components, args=load_args, name="model-loader",
+                                           daemon=True)
+            self.loader.start()
+        else:
+            self.loader = None
+            self._load_components(*load_args)
+            if self.load_error is not None:
+                raise self.load_error
+
+    def _load_components(self, fatigue_model_path, alert_sound_path, fatigue_backend, hand_pose_roi, face_roi):
+        """Load the fatigue model, both MediaPipe graphs and the alert sound in parallel, then mark ready."""
+        def load_fatigue_detector():
+            detector = FatigueDetector(fatigue_model_path, fatigue_backend)
+            detector.warm_up()  # Take the first-inference stall now rather than on the first frame
+            return detector
 
-        # Initialize component systems
         try:
-            self.fatigue_detector = FatigueDetector(fatigue_model_path)
-            self.posture_analyzer = PostureAnalyzer()
-            self.hand_detector = HandDetector()
-            self.alert_system = AlertSystem(alert_sound_path)
-            self.visualizer = Visualizer()
-            self.logger.info("All modules initialized successfully")
+            with ThreadPoolExecutor(max_workers=4, thread_name_prefix="load") as pool:
+                fatigue = pool.submit(load_fatigue_detector)
+                posture = pool.submit(PostureAnalyzer)
+                hands = pool.submit(HandDetector, use_pose_roi=hand_pose_roi)
+                alerts = pool.submit(AlertSystem, alert_sound_path)
+                self.fatigue_detector = fatigue.result()
+                self.posture_analyzer = posture.result()
+                self.hand_detector = hands.result()
+                self.alert_system = alerts.result()
+            self.alert_dispatcher.add_sink(SoundSink(self.alert_system))
+            # Optional face crop for the fatigue model, derived from the pose landmarks
+            self.face_tracker = FaceRegionTracker() if face_roi else None
         except Exception as e:
             self.logger.error(f"Error initializing modules: {str(e)}")
-            raise
+            self.load_error = e
+            return
+
+        self.metrics.watch_detectors({
+            "fatigue": self.fatigue_detector,
+            "posture": self.posture_analyzer,
+            "hands": self.hand_detector
+        })
+        self._record_startup("models_ready")
+        self.ready.set()
+        self.logger.info("All modules initialized successfully")
+
+    def _record_startup(self, milestone):
+        """Record the first time a startup milestone is reached."""
+        if milestone in self.startup_report:
+            return
+        seconds = round(time.perf_counter() - self.startup_time, 3)
+        self.startup_report[milestone] = seconds
+        self.metrics.startup.set(seconds, milestone=milestone)
+        self.logger.info(f"Startup: {milestone.replace('_', ' ')} after {seconds:.2f}s")
 
-    def process_frame(self, frame):
+    def process_frame(self, frame, timestamp=None):
         """Process a single frame for all monitoring systems"""
         if frame is None:
             self.logger.warning("Empty frame received")
             return frame
 
+        metrics = self.metrics
+        frame_start = stage_start = time.perf_counter()
         try:
-            frame = cv2.flip(frame, 1)  # Flip frame horizontally for natural view
+            # Flip and color-convert once; every detector reads from the shared context
+            context = self.frame_context.update(frame, timestamp)
+            if self.render:
+                frame = context.frame
+            stage_start = self._end_stage("flip", stage_start)
+            self._record_startup("first_frame")
 
-            # Run fatigue detection
-            fatigue_score = self.fatigue_detector.predict_fatigue(frame)
-            fatigue_alert = self.fatigue_detector.check_fatigue_alert(fatigue_score)
+            # Until the detectors are loaded, show the live frame marked as initializing
+            if not self.ready.is_set():
+                self.last_results = {"initializing": True, "alert": False}
+                if self.render:
+                    frame = self.visualizer.draw_initializing(frame)
+                return frame
 
-            # Run posture detection with proper error handling
-            result = self.posture_analyzer.detect_posture(frame)
-            if result is None:
-                posture_issues, person_visible = [], False
-            else:
-                posture_issues, person_visible = result
+            # Detectors that are not due on this frame keep their last result
+            now = time.time() if timestamp is None else timestamp
+            results = self.detector_results
+            evaluated = []
+
+            # Run posture detection with proper error handling. The stage clock restarts at every stage
+            # boundary, so time spent around a skipped detector is not charged to the next one that runs
+            posture_due = self.scheduler.should_run("posture", context.frame_index, now)
+            if posture_due:
+                results["posture"] = self.posture_analyzer.detect_posture(context, now)
+                evaluated.append("posture")
+            stage_start = self._end_stage("posture", stage_start, posture_due)
+            posture_result = results["posture"]
+            posture_issues, person_visible = posture_result.issues, posture_result.person_visible
+
+            # Run fatigue detection; the sustained-fatigue timer still advances on every frame
+            fatigue_due = self.scheduler.should_run("fatigue", context.frame_index, now)
+            if fatigue_due:
+                face_box = None
+                if self.face_tracker is not None:
+                    face_box = self.face_tracker.update(
+                        self.posture_analyzer.get_last_pose_result(), context.width, context.height)
+                results["fatigue"] = self.fatigue_detector.predict_fatigue(context, face_box)
+                evaluated.append("fatigue")
+            fatigue_score = results["fatigue"]
+            fatigue_alert = self.fatigue_detector.check_fatigue_alert(fatigue_score, now)
+            stage_start = self._end_stage("fatigue", stage_start, fatigue_due)
 
-            # Run hand position detection
-            hands_info = self.hand_detector.detect_hands(frame, self.posture_analyzer.get_last_pose_result())
+            # Run hand position detection, cropped to the area around the pose wrists
+            hands_due = self.scheduler.should_run("hands", context.frame_index, now)
+            if hands_due:
+                results["hands"] = self.hand_detector.detect_hands(
+                    context, self.posture_analyzer.get_last_pose_result(), now)
+                evaluated.append("hands")
+            stage_start = self._end_stage("hands", stage_start, hands_due)
+            hands_info = results["hands"]
 
             # Update the visualizer with current results
-            frame = self.visualizer.draw_face_status(frame, fatigue_alert, posture_issues)
-            frame = self.visualizer.draw_posture_status(frame, posture_issues)
-            frame = self.visualizer.draw_hands_status(frame, hands_info, posture_issues)
-            frame = self.visualizer.draw_summary(frame, fatigue_alert, posture_issues, person_visible, hands_info)
+            if self.render:
+                frame = self.visualizer.draw_pose(frame, posture_result)
+                frame = self.visualizer.draw_hands(frame, hands_info)
+                frame = self.visualizer.draw_face_status(frame, fatigue_alert, posture_issues)
+                frame = self.visualizer.draw_posture_status(frame, posture_issues)
+                frame = self.visualizer.draw_hands_status(frame, hands_info, posture_issues)
+                frame = self.visualizer.draw_summary(frame, fatigue_alert, posture_issues, person_visible, hands_info)
+            stage_start = self._end_stage("visualize", stage_start, self.render)
 
-            # Play alert sound if needed
-            if fatigue_alert or (posture_issues and len(posture_issues) > 0) or (hands_info and hands_info.get("hands_off_wheel_alert", False)):
-                self.alert_system.play_alert()
+            # Hand active alerts to the dispatcher; it coalesces repeats and plays/logs them off this thread
+            active_alerts = [issue.replace(" ", "_") for issue in posture_issues]
+            if fatigue_alert:
+                active_alerts.append("fatigue")
+            if hands_info and hands_info.hands_off_wheel_alert:
+                active_alerts.append("hands_off_wheel")
+            alert = bool(active_alerts)
+            if alert:
+                for alert_type in active_alerts:
+                    if alert_type == "fatigue" and fatigue_score is not None:
+                        self.alert_dispatcher.submit(alert_type, now, fatigue_score=round(float(fatigue_score), 4))
+                    else:
+                        self.alert_dispatcher.submit(alert_type, now)
+                self._end_stage("alert", stage_start)
 
+            # Keep the verdict around for callers that only get the annotated frame back
+            fatigue_statistics = self.fatigue_detector.fatigue_statistics()
+            self.last_results = {
+                "initializing": False,
+                "fatigue_score": fatigue_score,
+                "perclos": fatigue_statistics["perclos"],
+                "smoothed_fatigue_score": fatigue_statistics["smoothed_score"],
+                "fatigue_alert": fatigue_alert,
+                "posture_issues": posture_issues,
+                "person_visible": person_visible,
+                "posture": posture_result,
+                "hands_info": hands_info,
+                "alert": alert,
+                "quality_level": self.quality_level
+            }
+
+            if self.output_recorder is not None and self.render:
+                self.output_recorder.submit(frame, now, alert)
+            if self.recorder is not None:
+                self.recorder.record_results(now, self.last_results, context.width, context.height, evaluated)
+
+            latency = time.perf_counter() - frame_start
+            metrics.frame_done(latency, active_alerts)
+            if self.quality_governor is not None:
+                settings = self.quality_governor.observe(latency, now)
+                if settings is not None:
+                    self._apply_quality(settings)
+            self._record_startup("first_verdict")
             return frame
         except Exception as e:
+            metrics.frames_errored.inc()
             self.logger.error(f"Error processing frame: {str(e)}")
+            # A failed frame has no verdict; do not leave the previous frame's in place
+            self.last_results = None
             # Return original frame if there's an error in processing
             return frame
 
-    def run(self, video_source=0):
+    @property
+    def quality_level(self):
+        """Current adaptive quality level; 0 is full quality, and always 0 without a governor."""
+        return 0 if self.quality_governor is None else self.quality_governor.level
+
+    def _apply_quality(self, settings):
+        """Switch the analysis scale, MediaPipe model complexity and detector cadence to a quality level."""
+        self.frame_context.analysis_scale = settings["analysis_scale"]
+        self.posture_analyzer.set_model_complexity(settings["pose_complexity"])
+        self.hand_detector.set_model_complexity(settings["hands_complexity"])
+        for name in ("fatigue", "posture", "hands"):
+            rule = slower_cadence(self.base_cadence.get(name), settings["cadence"].get(name),
+                                  self.quality_governor.stream_fps)
+            if rule is not None:
+                self.scheduler.set_cadence(name, **rule)
+            else:
+                self.scheduler.cadence.pop(name, None)
+        self.metrics.quality_level.set(self.quality_level)
+
+    def _end_stage(self, stage, stage_start, ran=True):
+        """Record a stage's latency if it ran, and return the start time of the next stage."""
+        now = time.perf_counter()
+        if ran:
+            self.metrics.observe_stage(stage, now - stage_start)
+        return now
+
+    def run(self, video_source=0, pipelined=False):
         """Run the monitoring system on video input"""
+        if pipelined:
+            self.run_pipelined(video_source)
+            return
+
         try:
             cap = cv2.VideoCapture(video_source)
             if not cap.isOpened():
@@ -76,6 +290,8 @@ class DriverMonitoringSystem:
                 return
 
             self.logger.info(f"Starting video capture from source {video_source}")
+            # Alert timers follow the video's own time for files, so results do not depend on processing speed
+            clock = CaptureClock(cap, isinstance(video_source, str))
             while True:
                 ret, frame = cap.read()
                 if not ret:
@@ -83,7 +299,13 @@ class DriverMonitoringSystem:
                     break
 
                 # Process frame
-                processed_frame = self.process_frame(frame)
+                processed_frame = self.process_frame(frame, clock.timestamp(cap))
+                if self.load_error is not None:
+                    self.logger.error("Detectors failed to load, stopping")
+                    break
+
+                if not self.display:
+                    continue
 
                 # Display frame
                 cv2.imshow('Driver Monitoring System', processed_frame)
@@ -99,28 +321,295 @@ class DriverMonitoringSystem:
             self.logger.info("Cleaning up resources")
             if 'cap' in locals() and cap.isOpened():
                 cap.release()
-            cv2.destroyAllWindows()
+            if self.render:
+                cv2.destroyAllWindows()
             self.cleanup()
 
+    def run_pipelined(self, video_source=0):
+        """Run capture, analysis and display on separate threads, always analyzing the newest frame."""
+        self.pipeline = FramePipeline(self, video_source, display=self.display)
+        try:
+            self.pipeline.run()
+        except Exception as e:
+            self.logger.error(f"Error in pipelined run: {str(e)}")
+        finally:
+            if self.render:
+                cv2.destroyAllWindows()
+            self.cleanup()
+
+    def reset(self):
+        """Forget alert timers, tracking, detector cadence and the last verdict, e.g. before another video."""
+        self.fatigue_detector.reset()
+        self.posture_analyzer.reset()
+        self.hand_detector.reset()
+        if self.face_tracker is not None:
+            self.face_tracker.reset()
+        self.scheduler.reset()
+        self.detector_results = {"fatigue": None, "posture": PostureResult(), "hands": HandsResult()}
+        self.last_results = None
+
     def cleanup(self):
         """Clean up all resources."""
         try:
+            # Let a background load finish so nothing is left half-initialized
+            if self.loader is not None:
+                self.loader.join()
             # Close all MediaPipe resources
-            self.posture_analyzer.close()
-            self.hand_detector.close()
+            if self.posture_analyzer is not None:
+                self.posture_analyzer.close()
+            if self.hand_detector is not None:
+                self.hand_detector.close()
+            if self.recorder is not None:
+                self.recorder.close()
+            self.alert_dispatcher.stop()
+            if self.output_recorder is not None:
+                self.output_recorder.stop()
+            if self.startup_report:
+                self.logger.info(f"Startup report: {self.startup_report}")
             self.logger.info("All resources cleaned up")
         except Exception as e:
             self.logger.error(f"Error during cleanup: {str(e)}")
 
-if __name__ == "__main__":
-    # Initialize the monitoring system
+def cadence_interval(rule, fps):
+    """Seconds between runs of a detector under a cadence rule on a stream of `fps` frames per second."""
+    if rule is None:
+        return 1.0 / fps
+    if rule.get("every") is not None:
+        return rule["every"] / fps
+    if rule.get("hz") is not None:
+        return 1.0 / rule["hz"]
+    return 1.0 / fps
+
+def slower_cadence(base, degraded, fps):
+    """Pick the quality level's cadence unless the configured one already runs a detector less often."""
+    if degraded is None:
+        return base
+    if base is not None and cadence_interval(base, fps) >= cadence_interval(degraded, fps):
+        return base
+    return degraded
+
+def parse_video_source(value):
+    """Interpret numeric sources as camera indices and everything else as a file path or URL."""
+    return int(value) if value.isdigit() else value
+
+# Run options that --processes cannot honor: each detector runs on its own in a worker process
+PROCESS_UNSUPPORTED_OPTIONS = ("cadence", "face_roi", "target_fps", "fast_start")
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Fatigue Sense driver monitoring system")
+    parser.add_argument("--model", default='models/best_fatigue_model.keras', help="Path to the fatigue model")
+    parser.add_argument("--backend", choices=["keras", "tflite", "onnx"],
+                        help="Fatigue inference backend (default: from the model file extension)")
+    parser.add_argument("--face-roi", action="store_true",
+                        help="Feed only the driver's face (located from the pose landmarks) to the fatigue model")
+    # Without a command the run command's defaults apply
+    parser.set_defaults(source="0", pipelined=False, processes=False, headless=False, fast_start=False, telemetry=None,
+                        target_fps=None, record=None, record_clips=None, pre_roll=5, post_roll=5, cadence=None,
+                        no_hand_roi=False, metrics_port=None, metrics_snapshot=None, metrics_interval=10,
+                        sound='sounds/alert_sound.wav', alert_cooldown=5.0, alert_log=None, alert_udp=None)
+    subparsers = parser.add_subparsers(dest="command")
+
+    run_parser = subparsers.add_parser("run", help="Live monitoring with on-screen display (default)")
+    run_parser.add_argument("--source", default="0", help="Camera index or video file")
+    run_parser.add_argument("--pipelined", action="store_true",
+                            help="Run capture, analysis and display on separate threads, dropping stale frames")
+    run_parser.add_argument("--processes", action="store_true",
+                            help="Run the fatigue, posture and hand detectors in separate processes over shared memory")
+    run_parser.add_argument("--headless", action="store_true",
+                            help="Analyze and alert without drawing overlays or opening a window")
+    run_parser.add_argument("--fast-start", action="store_true",
+                            help="Open the camera immediately and load the models in the background")
+    run_parser.add_argument("--cadence", nargs="+", metavar="DETECTOR=RATE",
+                            help="Per-detector cadence, e.g. fatigue=3 (every 3rd frame) posture=10hz")
+    run_parser.add_argument("--no-hand-roi", action="store_true",
+                            help="Run hand detection on the full frame instead of around the pose wrists")
+    run_parser.add_argument("--target-fps", type=float,
+                            help="Lower analysis quality (cadence, MediaPipe models, resolution) as needed to hold this fps")
+    run_parser.add_argument("--sound", default='sounds/alert_sound.wav', help="Path to the alert sound")
+    run_parser.add_argument("--alert-cooldown", type=float, default=5.0,
+                            help="Seconds before the same alert type is raised again while it stays active")
+    run_parser.add_argument("--alert-log", metavar="PATH", help="Append dispatched alerts to a JSON lines file")
+    run_parser.add_argument("--alert-udp", metavar="HOST:PORT", help="Send dispatched alerts as JSON UDP datagrams")
+    run_parser.add_argument("--record", metavar="PATH", help="Save the annotated video to PATH")
+    run_parser.add_argument("--record-clips", metavar="DIR",
+                            help="Save only annotated clips around alerts, one file each, to DIR")
+    run_parser.add_argument("--pre-roll", type=float, default=5, help="Seconds kept before an alert in each clip")
+    run_parser.add_argument("--post-roll", type=float, default=5, help="Seconds kept after an alert in each clip")
+    run_parser.add_argument("--telemetry", metavar="DIR",
+                            help="Record every frame's score, landmarks and alerts to a telemetry store")
+    run_parser.add_argument("--metrics-port", type=int,
+                            help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    run_parser.add_argument("--metrics-snapshot", metavar="PATH", help="Periodically write a JSON metrics snapshot")
+    run_parser.add_argument("--metrics-interval", type=float, default=10, help="Seconds between metrics snapshots")
+
+    analyze_parser = subparsers.add_parser("analyze", help="Headless offline analysis of a recorded video")
+    analyze_parser.add_argument("video", help="Video file to analyze")
+    analyze_parser.add_argument("--output", help="Timeline output path (.jsonl or .csv)")
+    analyze_parser.add_argument("--format", choices=["jsonl", "csv"], help="Timeline format (default: from extension)")
+    analyze_parser.add_argument("--batch-size", type=int, default=32, help="Frames per fatigue model batch")
+    analyze_parser.add_argument("--telemetry", metavar="DIR",
+                                help="Also record scores and landmarks to a telemetry store for threshold replay")
+
+    batch_parser = subparsers.add_parser("batch", help="Analyze long recordings in parallel shards on every core")
+    batch_parser.add_argument("inputs", nargs="+", help="Video files and/or directories of videos")
+    batch_parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    batch_parser.add_argument("--shard-seconds", type=float, default=300, help="Length of each shard of video")
+    batch_parser.add_argument("--overlap-seconds", type=float, default=10,
+                              help="Video decoded before each shard to warm the alert timers")
+    batch_parser.add_argument("--output-dir", help="Directory for the timelines (default: next to each video)")
+    batch_parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="Timeline format")
+    batch_parser.add_argument("--batch-size", type=int, default=32, help="Frames per fatigue model batch")
+
+    fleet_parser = subparsers.add_parser("fleet", help="Monitor several cameras or videos in one process")
+    fleet_parser.add_argument("sources", nargs="+", help="Camera indices or video files")
+    fleet_parser.add_argument("--max-batch", type=int, help="Largest cross-stream model batch (default: one per stream)")
+    fleet_parser.add_argument("--max-latency-ms", type=float, default=20,
+                              help="Longest a frame waits for its batch to fill")
+    fleet_parser.add_argument("--report-interval", type=float, default=10, help="Seconds between stats reports")
+    return parser
+
+def check_process_options(parser, args):
+    """Exit with a usage error if --processes is combined with an option it would ignore."""
+    if not args.processes:
+        return
+    for option in PROCESS_UNSUPPORTED_OPTIONS:
+        if getattr(args, option) != parser.get_default(option):
+            parser.error(f"--{option.replace('_', '-')} cannot be combined with --processes")
+
+def run_fleet(args):
+    """Run the multi-stream server with cross-stream batched inference."""
+    server = FleetServer(
+        [parse_video_source(source) for source in args.sources],
+        args.model,
+        fatigue_backend=args.backend,
+        max_batch_size=args.max_batch,
+        max_latency_ms=args.max_latency_ms,
+        face_roi=args.face_roi,
+        report_interval=args.report_interval
+    )
+    server.run()
+
+def run_analysis(args):
+    """Run the headless batch analysis mode."""
+    output_path = args.output or default_output_path(args.video, args.format or "jsonl")
+    analyzer = BatchAnalyzer(args.model, batch_size=args.batch_size, fatigue_backend=args.backend,
+                             face_roi=args.face_roi,
+                             recorder=TelemetryRecorder(args.telemetry) if args.telemetry else None)
     try:
-        monitoring_system = DriverMonitoringSystem(
-            fatigue_model_path='models/best_fatigue_model.keras',
-            alert_sound_path='sounds/alert_sound.wav'
-        )
+        summary = analyzer.analyze(args.video, output_path, args.format)
+    finally:
+        analyzer.close()
+    print(f"Timeline written to {output_path}")
+    print(f"Frames: {summary['frames']}  Elapsed: {summary['elapsed_seconds']}s  "
+          f"Throughput: {summary['fps']} fps ({summary['realtime_factor']}x real time)")
+
+def build_alert_sinks(args):
+    """Create the extra alert sinks requested on the command line; the alert sound is always added."""
+    sinks = []
+    if args.alert_log:
+        sinks.append(FileSink(args.alert_log))
+    if args.alert_udp:
+        host, _, port = args.alert_udp.rpartition(":")
+        sinks.append(UdpSink(host or "127.0.0.1", int(port)))
+    return sinks
+
+def run_batch(args):
+    """Run sharded multi-process analysis over files and directories of recordings."""
+    runner = ShardRunner(args.model, workers=args.workers, shard_seconds=args.shard_seconds,
+                         overlap_seconds=args.overlap_seconds, batch_size=args.batch_size,
+                         fatigue_backend=args.backend, face_roi=args.face_roi)
+    outputs, summary = runner.run(find_videos(args.inputs), args.output_dir, args.format)
+    for video_path, output_path in outputs.items():
+        print(f"{video_path} -> {output_path}")
+    print(f"Videos: {summary['videos']}  Shards: {summary['shards']}  Frames: {summary['frames']}  "
+          f"Elapsed: {summary['elapsed_seconds']}s  Throughput: {summary['fps']} fps")
+
+def build_output_recorder(args, metrics):
+    """Create the requested continuous or alert-clip recorder, or None."""
+    if args.record and args.record_clips:
+        raise ValueError("Use either --record or --record-clips, not both")
+    if args.record:
+        return OutputRecorder(args.record, metrics=metrics).start()
+    if args.record_clips:
+        return OutputRecorder(args.record_clips, mode="clips", pre_roll=args.pre_roll, post_roll=args.post_roll,
+                              metrics=metrics).start()
+    return None
 
-        # Run the system
-        monitoring_system.run()
+def run_monitoring(args, metrics, output_recorder):
+    """Run live monitoring in this process, optionally pipelined across threads."""
+    monitoring_system = DriverMonitoringSystem(
+        fatigue_model_path=args.model,
+        alert_sound_path=args.sound,
+        fatigue_backend=args.backend,
+        detector_cadence=parse_cadence(args.cadence),
+        hand_pose_roi=not args.no_hand_roi,
+        face_roi=args.face_roi,
+        render=not args.headless or output_recorder is not None,
+        display=not args.headless,
+        metrics=metrics,
+        background_init=args.fast_start,
+        startup_time=STARTUP_TIME,
+        recorder=TelemetryRecorder(args.telemetry) if args.telemetry else None,
+        alert_sinks=build_alert_sinks(args),
+        alert_cooldown=args.alert_cooldown,
+        target_fps=args.target_fps,
+        output_recorder=output_recorder
+    )
+    monitoring_system.run(parse_video_source(args.source), pipelined=args.pipelined)
+
+def run_processes(args, metrics, output_recorder):
+    """Run live monitoring with one worker process per detector."""
+    pipeline = ProcessPipeline(
+        args.model,
+        args.sound,
+        fatigue_backend=args.backend,
+        video_source=parse_video_source(args.source),
+        render=not args.headless or output_recorder is not None,
+        display=not args.headless,
+        metrics=metrics,
+        alert_sinks=build_alert_sinks(args),
+        alert_cooldown=args.alert_cooldown,
+        output_recorder=output_recorder,
+        recorder=TelemetryRecorder(args.telemetry) if args.telemetry else None,
+        hand_pose_roi=not args.no_hand_roi
+    )
+    pipeline.run()
+
+def start_metrics_exporters(metrics, args):
+    """Start the requested metrics endpoint and snapshot writer and return them for stopping."""
+    exporters = []
+    if args.metrics_port:
+        exporters.append(MetricsServer(metrics.registry, args.metrics_port))
+    if args.metrics_snapshot:
+        exporters.append(SnapshotWriter(metrics.registry, args.metrics_snapshot, args.metrics_interval))
+    for exporter in exporters:
+        exporter.start()
+    return exporters
+
+if __name__ == "__main__":
+    parser = build_arg_parser()
+    args = parser.parse_args()
+    check_process_options(parser, args)
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        if args.command == "analyze":
+            run_analysis(args)
+        elif args.command == "batch":
+            run_batch(args)
+        elif args.command == "fleet":
+            run_fleet(args)
+        else:
+            metrics = PipelineMetrics()
+            output_recorder = build_output_recorder(args, metrics)
+            exporters = start_metrics_exporters(metrics, args)
+            try:
+                if args.processes:
+                    run_processes(args, metrics, output_recorder)
+                else:
+                    run_monitoring(args, metrics, output_recorder)
+            finally:
+                for exporter in exporters:
+                    exporter.stop()
     except Exception as e:
-        logging.error(f"Fatal error: {str(e)}")
\ No newline at end of file
+        logging.error(f"Fatal error: {str(e)}")
@@ -0,0 +1,217 @@
+import heapq
+import itertools
+import json
+import logging
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+
+# Lower values are dispatched first when several alert types are waiting
+ALERT_PRIORITIES = {
+    "fatigue": 0,
+    "hands_off_wheel": 1,
+    "head_tilt": 2,
+    "neck_posture": 3,
+    "shoulder_misalignment": 4,
+}
+DEFAULT_PRIORITY = 5
+
+
+@dataclass
+class AlertEvent:
+    """One alert raised by the frame loop, possibly standing for several coalesced frames."""
+
+    alert_type: str  # e.g. "fatigue", "hands_off_wheel", "neck_posture"
+    timestamp: float  # Frame time the alert was first raised at
+    priority: int = DEFAULT_PRIORITY
+    details: dict = field(default_factory=dict)  # Small JSON-friendly context, e.g. the fatigue score
+    count: int = 1  # Frames coalesced into this event before it was dispatched
+    last_timestamp: float = None  # Frame time of the latest coalesced frame
+    submitted: float = 0.0  # time.perf_counter() at submit, for dispatch latency
+
+    def to_dict(self):
+        return {
+            "type": self.alert_type,
+            "timestamp": round(self.timestamp, 3),
+            "last_timestamp": round(self.last_timestamp if self.last_timestamp is not None else self.timestamp, 3),
+            "priority": self.priority,
+            "count": self.count,
+            **self.details
+        }
+
+
+class SoundSink:
+    """Play the AlertSystem sound; overlapping alerts are skipped while it is still playing."""
+
+    def __init__(self, alert_system):
+        self.alert_system = alert_system
+
+    def handle(self, event):
+        self.alert_system.play_alert()
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """Append every dispatched alert to a JSON lines file."""
+
+    def __init__(self, path):
+        self.file = open(path, "a")
+
+    def handle(self, event):
+        self.file.write(json.dumps(event.to_dict()) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class UdpSink:
+    """Send every dispatched alert as a JSON datagram, e.g. to a local logger or vehicle gateway."""
+
+    def __init__(self, host, port):
+        self.address = (host, port)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def handle(self, event):
+        self.socket.sendto(json.dumps(event.to_dict()).encode("utf-8"), self.address)
+
+    def close(self):
+        self.socket.close()
+
+
+class CallbackSink:
+    """Call a function with each dispatched AlertEvent."""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def handle(self, event):
+        self.callback(event)
+
+    def close(self):
+        pass
+
+
+class AlertDispatcher:
+    """Deliver alerts to sinks on a background thread so the frame loop never waits on audio or I/O.
+
+    `submit` only takes a lock and pushes onto a heap. While an event of the same type is still waiting it
+    absorbs new frames instead of queueing more (coalescing), and after an event is accepted that type is
+    quiet for `cooldown` seconds of frame time (rate limiting). Waiting events go out by priority.
+    """
+
+    def __init__(self, sinks=None, cooldown=5.0, cooldowns=None, max_pending=32, metrics=None):
+        self.logger = logging.getLogger(__name__)
+        self.sinks = list(sinks or [])
+        self.cooldown = cooldown
+        self.cooldowns = dict(cooldowns or {})  # Per alert type overrides of `cooldown`
+        self.max_pending = max_pending
+
+        self.heap = []
+        self.pending = {}  # alert_type -> event still waiting on the heap
+        self.last_accepted = {}  # alert_type -> frame time of the last accepted event
+        self.sequence = itertools.count()  # Keeps equal priorities in submit order
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.counts = {"submitted": 0, "dispatched": 0, "coalesced": 0, "rate_limited": 0, "dropped": 0,
+                       "sink_errors": 0}
+
+        self.dispatch_latency = None
+        self.events = None
+        if metrics is not None:
+            registry = metrics.registry
+            self.dispatch_latency = registry.histogram(
+                "fatigue_sense_alert_dispatch_seconds", "Time from submitting an alert to its sinks finishing").labels()
+            self.events = registry.counter("fatigue_sense_alert_events_total", "Alert submissions by outcome",
+                                           ("outcome",))
+
+        self.thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+
+    def add_sink(self, sink):
+        with self.condition:
+            self.sinks.append(sink)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def submit(self, alert_type, timestamp, **details):
+        """Queue an alert without blocking. Returns True if a new event was queued."""
+        with self.condition:
+            self.counts["submitted"] += 1
+            waiting = self.pending.get(alert_type)
+            if waiting is not None:
+                waiting.count += 1
+                waiting.last_timestamp = timestamp
+                waiting.details.update(details)
+                return self._count("coalesced")
+
+            last = self.last_accepted.get(alert_type)
+            if last is not None and 0 <= timestamp - last < self.cooldowns.get(alert_type, self.cooldown):
+                return self._count("rate_limited")
+            if len(self.heap) >= self.max_pending:
+                return self._count("dropped")
+
+            event = AlertEvent(alert_type, timestamp, ALERT_PRIORITIES.get(alert_type, DEFAULT_PRIORITY),
+                               dict(details), last_timestamp=timestamp, submitted=time.perf_counter())
+            heapq.heappush(self.heap, (event.priority, next(self.sequence), event))
+            self.pending[alert_type] = event
+            self.last_accepted[alert_type] = timestamp
+            self.condition.notify()
+        return True
+
+    def _count(self, outcome):
+        self.counts[outcome] += 1
+        if self.events is not None:
+            self.events.inc(outcome=outcome)
+        return False
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.heap and not self.stopping:
+                    self.condition.wait()
+                if not self.heap:
+                    return  # Stopping with nothing left to deliver
+                _, _, event = heapq.heappop(self.heap)
+                del self.pending[event.alert_type]
+                sinks = list(self.sinks)
+            self._dispatch(event, sinks)
+
+    def _dispatch(self, event, sinks):
+        errors = 0
+        for sink in sinks:
+            try:
+                sink.handle(event)
+            except Exception as e:
+                errors += 1
+                self.logger.error(f"Error in alert sink {type(sink).__name__}: {str(e)}")
+        # The counts are shared with submit() and stats() on other threads; the sinks ran without the lock
+        with self.condition:
+            self.counts["sink_errors"] += errors
+            self.counts["dispatched"] += 1
+        if self.events is not None:
+            self.events.inc(outcome="dispatched")
+        if self.dispatch_latency is not None:
+            self.dispatch_latency.observe(time.perf_counter() - event.submitted)
+
+    def stop(self):
+        """Deliver what is still waiting, stop the worker and close the sinks."""
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+        if self.thread.is_alive():
+            self.thread.join()
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                self.logger.error(f"Error closing alert sink {type(sink).__name__}: {str(e)}")
+        self.logger.info(f"Alert dispatcher stopped: {self.stats()}")
+
+    def stats(self):
+        with self.condition:
+            return dict(self.counts)
@@ -1,16 +1,19 @@
-import pygame
 import logging
 
 class AlertSystem:
     def __init__(self, alert_sound_path):
         self.logger = logging.getLogger(__name__)
 
-        # Initialize pygame mixer for sound
-        pygame.mixer.init()
+        # Import pygame only when alerts are actually set up; it is slow to import and prints a banner
+        import pygame
+        self.mixer = pygame.mixer
+
+        # Initialize pygame mixer for sound (a no-op if it is already initialized)
+        self.mixer.init()
 
         # Load the alert sound
         try:
-            self.alert_sound = pygame.mixer.Sound(alert_sound_path)
+            self.alert_sound = self.mixer.Sound(alert_sound_path)
             self.logger.info("Alert sound loaded successfully")
         except Exception as e:
             self.logger.error(f"Error loading alert sound: {str(e)}")
@@ -18,5 +21,5 @@ class AlertSystem:
 
     def play_alert(self):
         """Play alert sound if it's not already playing."""
-        if not pygame.mixer.get_busy():
-            self.alert_sound.play()
\ No newline at end of file
+        if not self.mixer.get_busy():
+            self.alert_sound.play()
@@ -0,0 +1,240 @@
+import cv2
+import csv
+import json
+import logging
+import os
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from modules.fatigue_detector import FatigueDetector
+from modules.posture_analyzer import PostureAnalyzer
+from modules.hand_detector import HandDetector
+from modules.frame_context import FrameContext
+from modules.face_region import FaceRegionTracker
+from modules import telemetry_store as telemetry
+from modules.temporal import CaptureClock
+
+TIMELINE_FIELDS = [
+    "frame", "timestamp", "fatigue_score", "fatigue_alert", "posture_issues", "person_visible",
+    "left_hand_on_wheel", "right_hand_on_wheel", "hands_off_wheel_alert", "alert"
+]
+
+
+class TimelineWriter:
+    """Write per-frame analysis records to a JSONL or CSV file."""
+
+    def __init__(self, output_path, output_format=None):
+        if output_format is None:
+            output_format = "csv" if output_path.lower().endswith(".csv") else "jsonl"
+        if output_format not in ("jsonl", "csv"):
+            raise ValueError(f"Unsupported timeline format: {output_format}")
+
+        self.output_format = output_format
+        self.file = open(output_path, "w", newline="")
+        self.csv_writer = None
+        if output_format == "csv":
+            self.csv_writer = csv.DictWriter(self.file, fieldnames=TIMELINE_FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, record):
+        """Append a single frame record to the timeline."""
+        if self.csv_writer is not None:
+            row = dict(record)
+            row["posture_issues"] = ";".join(record["posture_issues"])
+            self.csv_writer.writerow(row)
+        else:
+            self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        """Flush and close the output file."""
+        self.file.close()
+
+
+class BatchAnalyzer:
+    """Headless analysis of recorded video with batched fatigue inference."""
+
+    def __init__(self, fatigue_model_path, batch_size=32, fatigue_backend=None, face_roi=False, recorder=None):
+        self.logger = logging.getLogger(__name__)
+        self.batch_size = batch_size
+        self.recorder = recorder  # Optional TelemetryRecorder, e.g. to cache landmarks for threshold replay
+        self.first_output_frame = 0  # Frames before this one are analyzed for warm-up but not written
+
+        self.fatigue_detector = FatigueDetector(fatigue_model_path, fatigue_backend)
+        self.posture_analyzer = PostureAnalyzer()
+        self.hand_detector = HandDetector()
+        self.face_tracker = FaceRegionTracker() if face_roi else None
+
+        # Model inference runs on a worker thread so MediaPipe keeps going on the next batch
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def analyze(self, video_path, output_path, output_format=None, start_frame=0, end_frame=None, warmup_frames=0,
+                progress=None):
+        """Analyze a video file and write its per-frame timeline. Returns a throughput summary.
+
+        Only frames in [start_frame, end_frame) are written, or up to the end of the video without an end_frame.
+        Decoding begins `warmup_frames` earlier so the sustained-alert timers are already in the state they
+        would have been in had the whole file been analyzed, which lets shards of one recording be processed
+        independently. `progress`, if given, is called with the number of frames analyzed past start_frame
+        after every batch.
+        """
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise IOError(f"Cannot open video file {video_path}")
+
+        video_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        # An analyzer can be reused for several videos or shards (one per worker in ShardRunner); each one
+        # starts from clean timers and trackers, whatever ran before it
+        self.reset()
+        decode_start = max(0, start_frame - warmup_frames)
+        if decode_start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, decode_start)
+        self.first_output_frame = start_frame
+        writer = TimelineWriter(output_path, output_format)
+        self.logger.info(f"Analyzing {video_path} at {video_fps:.1f} fps with batch size {self.batch_size}")
+
+        context = FrameContext(keep_frame=False)
+        # Alert timers follow video time, not processing speed
+        clock = CaptureClock(cap, from_file=True, start_frame=decode_start)
+
+        # Two input buffers so one batch can be filled while the other is being inferred
+        buffers = [None, None]
+        active = 0
+        records = []
+        landmarks = []  # (pose points, hand points) per record, for the telemetry recorder
+        in_flight = None
+        frame_index = decode_start
+        start_time = time.perf_counter()
+
+        try:
+            while end_frame is None or frame_index < end_frame:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                timestamp = clock.timestamp(cap)
+                context.update(frame, timestamp)
+
+                posture_result = self.posture_analyzer.detect_posture(context)
+                pose_result = self.posture_analyzer.get_last_pose_result()
+                hands_info = self.hand_detector.detect_hands(context, pose_result)
+
+                face_box = None
+                if self.face_tracker is not None:
+                    face_box = self.face_tracker.update(pose_result, context.width, context.height)
+                model_input = self.fatigue_detector.preprocess_for_model(context, face_box)
+                if buffers[active] is None and model_input is not None:
+                    buffers[active] = np.empty((self.batch_size,) + model_input.shape[1:], dtype=np.float32)
+                if model_input is not None:
+                    buffers[active][len(records)] = model_input[0]
+                elif buffers[active] is not None:
+                    buffers[active][len(records)] = 0.0
+
+                records.append({
+                    "frame": frame_index,
+                    "timestamp": round(timestamp, 3),
+                    "fatigue_score": None if model_input is None else 0.0,
+                    "fatigue_alert": False,
+                    "posture_issues": posture_result.issues,
+                    "person_visible": posture_result.person_visible,
+                    "left_hand_on_wheel": hands_info.left_hand_on_wheel,
+                    "right_hand_on_wheel": hands_info.right_hand_on_wheel,
+                    "hands_off_wheel_alert": hands_info.hands_off_wheel_alert,
+                    "alert": False
+                })
+                landmarks.append((posture_result.points, hands_info.points))
+                frame_index += 1
+
+                if len(records) == self.batch_size:
+                    self._finish_batch(in_flight, writer)
+                    in_flight = self._submit_batch(buffers[active], records, landmarks)
+                    active = 1 - active
+                    records = []
+                    landmarks = []
+                    if progress is not None:
+                        progress(max(0, frame_index - start_frame))
+
+            self._finish_batch(in_flight, writer)
+            if records:
+                self._finish_batch(self._submit_batch(buffers[active], records, landmarks), writer)
+        finally:
+            cap.release()
+            writer.close()
+            if self.recorder is not None:
+                if frame_index > decode_start:
+                    self.recorder.set_frame_size(context.width, context.height)
+                self.recorder.close()
+
+        elapsed = time.perf_counter() - start_time
+        frames = max(0, frame_index - start_frame)
+        video_duration = frames / video_fps
+        summary = {
+            "frames": frames,
+            "decoded_frames": frame_index - decode_start,
+            "elapsed_seconds": round(elapsed, 3),
+            "fps": round((frame_index - decode_start) / elapsed, 2) if elapsed > 0 else 0.0,
+            "video_seconds": round(video_duration, 3),
+            "realtime_factor": round(video_duration / elapsed, 2) if elapsed > 0 else 0.0
+        }
+        self.logger.info(
+            f"Analyzed {summary['frames']} frames in {summary['elapsed_seconds']}s "
+            f"({summary['fps']} fps, {summary['realtime_factor']}x real time)")
+        return summary
+
+    def reset(self):
+        """Reset every detector's alert timers, smoothing windows and tracking state."""
+        self.fatigue_detector.reset()
+        self.posture_analyzer.reset()
+        self.hand_detector.reset()
+        if self.face_tracker is not None:
+            self.face_tracker.reset()
+
+    def _submit_batch(self, buffer, records, landmarks):
+        """Start fatigue inference for a filled batch on the worker thread."""
+        if buffer is None:
+            return None, records, landmarks
+        return self.executor.submit(self.fatigue_detector.predict_batch, buffer[:len(records)]), records, landmarks
+
+    def _finish_batch(self, in_flight, writer):
+        """Wait for a batch's fatigue scores, resolve alerts in frame order and write the records."""
+        if in_flight is None:
+            return
+        future, records, landmarks = in_flight
+        scores = future.result() if future is not None else None
+
+        for i, record in enumerate(records):
+            score = None
+            if record["fatigue_score"] is not None and scores is not None:
+                score = float(scores[i])
+            record["fatigue_alert"] = self.fatigue_detector.check_fatigue_alert(score, record["timestamp"])
+            record["fatigue_score"] = None if score is None else round(score, 4)
+            record["alert"] = bool(record["fatigue_alert"] or record["posture_issues"]
+                                   or record["hands_off_wheel_alert"])
+            if record["frame"] < self.first_output_frame:
+                continue  # Warm-up frame: it only advanced the alert timers
+            writer.write(record)
+            if self.recorder is not None:
+                self._record_telemetry(record, score, *landmarks[i])
+
+    def _record_telemetry(self, record, score, pose_points, hand_points):
+        """Append a timeline record and its landmarks to the telemetry store; every detector ran on it."""
+        alerts = telemetry.alert_mask(record["posture_issues"])
+        if record["fatigue_alert"]:
+            alerts |= telemetry.ALERT_FATIGUE
+        if record["hands_off_wheel_alert"]:
+            alerts |= telemetry.ALERT_HANDS_OFF_WHEEL
+        flags = telemetry.FLAG_FATIGUE_EVALUATED | telemetry.FLAG_POSTURE_EVALUATED | telemetry.FLAG_HANDS_EVALUATED
+        if record["person_visible"]:
+            flags |= telemetry.FLAG_PERSON_VISIBLE
+        # The unrounded score, so replayed cutoffs decide exactly like the live check did
+        self.recorder.append(record["timestamp"], score, alerts, flags, pose_points, hand_points)
+
+    def close(self):
+        """Clean up resources."""
+        self.executor.shutdown(wait=True)
+        self.posture_analyzer.close()
+        self.hand_detector.close()
+
+
+def default_output_path(video_path, output_format="jsonl"):
+    """Derive a timeline path next to the input video."""
+    return os.path.splitext(video_path)[0] + f"_timeline.{output_format}"
@@ -0,0 +1,37 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class PostureResult:
+    """Outcome of one posture analysis pass. Nothing is drawn; Visualizer renders it."""
+
+    issues: list = field(default_factory=list)  # Posture alerts sustained past the alert threshold
+    person_visible: bool = False
+    landmarks: dict = field(default_factory=dict)  # Keypoint name -> (x, y) pixel position
+    points: object = None  # (33, 3) array of normalized pose landmarks, None without a person
+    visibility: object = None  # (33,) array of pose landmark visibility scores
+    shoulder_angle: float = None  # Degrees away from level shoulders
+    head_tilt_angle: float = None  # Degrees away from the head being upright over the shoulders
+    neck_ratio: float = None  # Nose-to-shoulder-midpoint distance over midpoint-to-shoulder distance
+
+
+@dataclass
+class HandStatus:
+    """One detected hand."""
+
+    landmarks: list  # 21 (x, y) pixel positions in MediaPipe hand landmark order
+    on_wheel: bool = False
+
+
+@dataclass
+class HandsResult:
+    """Outcome of one hand detection pass. Nothing is drawn; Visualizer renders it."""
+
+    left_hand_on_wheel: bool = False
+    right_hand_on_wheel: bool = False
+    hands_off_wheel_alert: bool = False
+    hands: list = field(default_factory=list)  # HandStatus per detected hand
+    points: object = None  # (H, 21, 3) array of normalized hand landmarks, None without hands
+    wheel_center: tuple = None  # (x, y) pixel center of the steering wheel region
+    wheel_radius: int = 0
+    roi: tuple = None  # (x0, y0, x1, y1) crop the hands were searched in, None for the full frame
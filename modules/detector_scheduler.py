@@ -0,0 +1,82 @@
+import logging
+
+# Timestamps within this many seconds of a rate-based deadline count as due, so that e.g. a
+# 10 Hz detector on a 30 fps stream runs on every third frame despite float rounding
+SCHEDULE_TOLERANCE = 1e-3
+
+DETECTOR_NAMES = ("fatigue", "posture", "hands")
+
+
+class DetectorScheduler:
+    """Decide which detectors run on each frame.
+
+    Every detector has its own cadence: either every N frames ({"every": 3}) or a fixed rate in
+    frames per second of video time ({"hz": 10}). Detectors without a cadence run on every frame.
+    """
+
+    def __init__(self, cadence=None):
+        self.logger = logging.getLogger(__name__)
+        self.cadence = {}
+        self.last_run = {}  # detector name -> (frame_index, timestamp) of its last run
+        for name, rule in (cadence or {}).items():
+            self.set_cadence(name, **rule)
+
+    def set_cadence(self, name, every=None, hz=None):
+        """Set how often a detector runs. Passing neither argument makes it run on every frame."""
+        if every is not None and hz is not None:
+            raise ValueError(f"Cadence for {name} must use either 'every' or 'hz', not both")
+        if every is not None and every < 1:
+            raise ValueError(f"Cadence for {name} must run at least every frame, got every={every}")
+        if hz is not None and hz <= 0:
+            raise ValueError(f"Cadence rate for {name} must be positive, got hz={hz}")
+
+        self.cadence[name] = {"every": every, "hz": hz}
+        self.logger.info(f"Detector cadence for {name}: {describe_cadence(every, hz)}")
+
+    def should_run(self, name, frame_index, timestamp):
+        """Return True if the detector is due on this frame, and record the run if so."""
+        rule = self.cadence.get(name)
+        last = self.last_run.get(name)
+
+        due = True
+        if rule is not None and last is not None:
+            last_frame, last_timestamp = last
+            if rule["every"] is not None:
+                due = frame_index - last_frame >= rule["every"]
+            elif rule["hz"] is not None:
+                due = timestamp - last_timestamp >= 1.0 / rule["hz"] - SCHEDULE_TOLERANCE
+
+        if due:
+            self.last_run[name] = (frame_index, timestamp)
+        return due
+
+    def reset(self):
+        """Forget previous runs so every detector runs on the next frame."""
+        self.last_run.clear()
+
+
+def describe_cadence(every=None, hz=None):
+    if every is not None:
+        return f"every {every} frame(s)"
+    if hz is not None:
+        return f"{hz:g} Hz"
+    return "every frame"
+
+
+def parse_cadence(specs):
+    """Parse command-line cadence specs such as ["fatigue=3", "posture=10hz"]."""
+    cadence = {}
+    for spec in specs or []:
+        name, _, value = spec.partition("=")
+        value = value.strip().lower()
+        name = name.strip()
+        if not name or not value:
+            raise ValueError(f"Invalid cadence '{spec}', expected name=N or name=RATEhz")
+        if name not in DETECTOR_NAMES:
+            raise ValueError(f"Unknown detector '{name}' in cadence '{spec}', expected one of "
+                             f"{', '.join(DETECTOR_NAMES)}")
+        if value.endswith("hz"):
+            cadence[name] = {"hz": float(value[:-2])}
+        else:
+            cadence[name] = {"every": int(value)}
+    return cadence
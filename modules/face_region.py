@@ -0,0 +1,76 @@
+import logging
+
+
+class FaceRegionTracker:
+    """Track a smoothed square face box from the pose landmarks for cropping the fatigue model input."""
+
+    def __init__(self, scale=2.0, smoothing=0.4, min_visibility=0.5, max_missing_frames=15, min_size=48):
+        self.logger = logging.getLogger(__name__)
+
+        import mediapipe as mp
+        pose_landmark = mp.solutions.pose.PoseLandmark
+        self.FACE_LANDMARKS = [
+            pose_landmark.NOSE,
+            pose_landmark.LEFT_EYE_INNER, pose_landmark.LEFT_EYE, pose_landmark.LEFT_EYE_OUTER,
+            pose_landmark.RIGHT_EYE_INNER, pose_landmark.RIGHT_EYE, pose_landmark.RIGHT_EYE_OUTER,
+            pose_landmark.LEFT_EAR, pose_landmark.RIGHT_EAR
+        ]
+
+        self.scale = scale  # Box side as a multiple of the landmark spread (ears are inside the face)
+        self.smoothing = smoothing  # Weight of the newest box in the exponential moving average
+        self.min_visibility = min_visibility
+        self.max_missing_frames = max_missing_frames  # Keep the last box briefly through dropouts
+        self.min_size = min_size  # Smallest box side in pixels
+
+        self.box = None  # Smoothed (center_x, center_y, side) in pixels
+        self.missing_frames = 0
+
+    def update(self, pose_result, width, height):
+        """Update with the latest pose result and return the crop (x0, y0, x1, y1), or None for the full frame."""
+        measurement = self._measure(pose_result, width, height)
+
+        if measurement is None:
+            self.missing_frames += 1
+            if self.missing_frames > self.max_missing_frames:
+                self.box = None
+        else:
+            self.missing_frames = 0
+            if self.box is None:
+                self.box = measurement
+            else:
+                self.box = tuple(self.smoothing * new + (1 - self.smoothing) * old
+                                 for new, old in zip(measurement, self.box))
+
+        if self.box is None:
+            return None
+        return self._to_crop(self.box, width, height)
+
+    def reset(self):
+        self.box = None
+        self.missing_frames = 0
+
+    def _measure(self, pose_result, width, height):
+        """Return the raw (center_x, center_y, side) of the face box, or None if no face is visible."""
+        if pose_result is None or not pose_result.pose_landmarks:
+            return None
+
+        landmarks = pose_result.pose_landmarks.landmark
+        points = [(landmarks[i].x * width, landmarks[i].y * height) for i in self.FACE_LANDMARKS
+                  if landmarks[i].visibility >= self.min_visibility]
+        if len(points) < 3:
+            return None
+
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        center_x = (min(xs) + max(xs)) / 2
+        center_y = (min(ys) + max(ys)) / 2
+        side = max(max(xs) - min(xs), max(ys) - min(ys)) * self.scale
+        return center_x, center_y, max(side, self.min_size)
+
+    def _to_crop(self, box, width, height):
+        """Turn a (center_x, center_y, side) box into integer frame coordinates, kept inside the frame."""
+        center_x, center_y, side = box
+        side = min(int(side), width, height)
+        x0 = min(max(int(center_x - side / 2), 0), width - side)
+        y0 = min(max(int(center_y - side / 2), 0), height - side)
+        return x0, y0, x0 + side, y0 + side
@@ -2,74 +2,136 @@ import cv2
 import numpy as np
 import time
 import logging
-from tensorflow.keras.models import load_model
+from modules.inference_backends import InferenceBackend, create_backend
+from modules.frame_context import FrameContext
+from modules.temporal import SustainedCondition, SlidingWindowRatio, ExponentialMovingAverage
+
+def prepare_model_input(frame, input_size=(224, 224), roi=None):
+    """Turn a BGR frame (or its (x0, y0, x1, y1) crop) into a normalized RGB batch of one for the fatigue model."""
+    if roi is not None:
+        x0, y0, x1, y1 = roi
+        frame = frame[y0:y1, x0:x1]
+
+    # Step 1: Resize the frame to the input size expected by the model
+    processed_frame = cv2.resize(frame, (input_size[1], input_size[0]))
+
+    # Step 2: Convert BGR to RGB
+    processed_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
+
+    # Step 3: Normalize pixel values
+    processed_frame = processed_frame * np.float32(1.0 / 255.0)  # Normalize to [0, 1] as float32
+
+    # Step 4: Add batch dimension
+    return np.expand_dims(processed_frame, axis=0)  # Shape: (1, height, width, 3)
+
+def fatigue_scores(predictions):
+    """Reduce raw model outputs to the probability of fatigue per frame.
+
+    Single-unit models output P(fatigue) directly with shape (N, 1); two-class models output
+    (N, 2) probabilities with fatigue as class 1. Taking the argmax class's confidence instead
+    would report a confidently *active* frame as fatigued.
+    """
+    predictions = np.asarray(predictions)
+    if predictions.ndim == 1:
+        return predictions
+    if predictions.shape[-1] == 1:
+        return predictions[:, 0]
+    return predictions[:, 1]
 
 class FatigueDetector:
-    def __init__(self, model_path):
+    def __init__(self, model_path, backend=None, **backend_options):
         self.logger = logging.getLogger(__name__)
 
-        # Load the fatigue detection model
+        # Load the fatigue detection model through the requested (or extension-inferred) backend.
+        # An already loaded backend can be passed in to share one model between detectors.
         try:
-            self.fatigue_model = load_model(model_path)
-            self.logger.info("Fatigue detection model loaded successfully")
+            if isinstance(backend, InferenceBackend):
+                self.backend = backend
+            else:
+                self.backend = create_backend(model_path, backend, **backend_options)
+            self.input_size = self.backend.input_size
+            self.logger.info(f"Fatigue detection model loaded successfully ({self.backend.name} backend)")
         except Exception as e:
             self.logger.error(f"Error loading fatigue model: {str(e)}")
             raise
 
         # Thresholds
+        self.FATIGUE_THRESHOLD = 0.70  # Confidence at which a frame counts as fatigued
         self.EYE_CLOSED_THRESHOLD = 2  # Time in seconds for eye closure
-        self.eye_closed_start_time = None  # Timer for closed eyes
-
-    def preprocess_for_model(self, frame):
-        """Preprocess the frame for the Keras model."""
-        try:
-            # Step 1: Resize the frame to the input size expected by the model
-            processed_frame = cv2.resize(frame, (224, 224))
-
-            # Step 2: Convert BGR to RGB
-            processed_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
+        self.PERCLOS_WINDOW = 60  # Seconds over which the fatigued-frame ratio is measured
+        self.SCORE_TIME_CONSTANT = 1.0  # Seconds of smoothing for the averaged score
 
-            # Step 3: Normalize pixel values
-            processed_frame = processed_frame / 255.0  # Normalize to [0, 1]
+        # Frame-timestamp driven state: closed-eye timer, PERCLOS-style ratio and smoothed score
+        self.eye_closed_timer = SustainedCondition()
+        self.closed_eye_ratio = SlidingWindowRatio(self.PERCLOS_WINDOW)
+        self.score_average = ExponentialMovingAverage(self.SCORE_TIME_CONSTANT)
+        self.errors = 0  # Failed preprocessing or predictions, exported as a metric
 
-            # Step 4: Add batch dimension
-            processed_frame = np.expand_dims(processed_frame, axis=0)
+    def preprocess_for_model(self, frame, face_box=None):
+        """Preprocess the frame (or a FrameContext's shared RGB view) for the fatigue model.
 
-            return processed_frame  # Shape: (1, 224, 224, 3)
+        When a face box is given only that crop is fed to the model.
+        """
+        try:
+            if isinstance(frame, FrameContext):
+                return frame.model_input(self.input_size, face_box)
+            return prepare_model_input(frame, self.input_size, face_box)
         except Exception as e:
+            self.errors += 1
             self.logger.error(f"Error in preprocessing for model: {str(e)}")
             return None
 
-    def predict_fatigue(self, frame):
-        """Use the Keras model to predict fatigue level."""
-        preprocessed_frame = self.preprocess_for_model(frame)
+    def predict_fatigue(self, frame, face_box=None):
+        """Use the fatigue model to predict fatigue level, optionally on the face crop only."""
+        preprocessed_frame = self.preprocess_for_model(frame, face_box)
         if preprocessed_frame is None:
             return None
 
+        scores = self.predict_batch(preprocessed_frame)
+        if scores is None:
+            return None
+        return scores[0]
+
+    def warm_up(self):
+        """Run one inference on a blank input so graph tracing and buffer allocation happen before the first frame."""
         try:
-            prediction = self.fatigue_model.predict(preprocessed_frame)
-            fatigue_class = np.argmax(prediction, axis=1)[0]  # Get class: 0 (active) or 1 (fatigue)
-            confidence_score = prediction[0][fatigue_class]  # Get confidence score
-            return confidence_score
+            start = time.perf_counter()
+            self.backend.predict(np.zeros((1, *self.input_size, 3), dtype=np.float32))
+            self.logger.info(f"Fatigue model warmed up in {time.perf_counter() - start:.2f}s")
         except Exception as e:
+            self.logger.error(f"Error warming up fatigue model: {str(e)}")
+
+    def predict_batch(self, preprocessed_frames):
+        """Predict fatigue scores for a batch of preprocessed frames of shape (N, height, width, 3)."""
+        try:
+            return fatigue_scores(self.backend.predict(preprocessed_frames))
+        except Exception as e:
+            self.errors += 1
             self.logger.error(f"Error during fatigue prediction: {str(e)}")
             return None
 
-    def check_fatigue_alert(self, confidence_score):
+    def check_fatigue_alert(self, confidence_score, timestamp=None):
         """Determine if a fatigue alert should be triggered based on sustained detection."""
         if confidence_score is None:
             return False
 
+        now = time.time() if timestamp is None else timestamp
+
         # Check if the user is showing signs of fatigue
-        is_fatigued = confidence_score >= 0.70
+        is_fatigued = confidence_score >= self.FATIGUE_THRESHOLD
+        self.closed_eye_ratio.update(is_fatigued, now)
+        self.score_average.update(float(confidence_score), now)
 
         # Implement the eye-closed threshold (only alert after sustained detection)
-        if is_fatigued:
-            if self.eye_closed_start_time is None:
-                self.eye_closed_start_time = time.time()
-            elif time.time() - self.eye_closed_start_time >= self.EYE_CLOSED_THRESHOLD:
-                return True
-        else:
-            self.eye_closed_start_time = None  # Reset timer if eyes are open
-
-        return False
\ No newline at end of file
+        closed_for = self.eye_closed_timer.update(is_fatigued, now)
+        return closed_for is not None and closed_for >= self.EYE_CLOSED_THRESHOLD
+
+    def reset(self):
+        """Forget the alert timer, PERCLOS window and smoothed score, e.g. before analyzing another video."""
+        self.eye_closed_timer.reset()
+        self.closed_eye_ratio.reset()
+        self.score_average.reset()
+
+    def fatigue_statistics(self):
+        """Return the PERCLOS-style fatigued-frame ratio and the time-smoothed score."""
+        return {"perclos": self.closed_eye_ratio.ratio, "smoothed_score": self.score_average.value}
\ No newline at end of file
@@ -0,0 +1,259 @@
+import cv2
+import logging
+import queue
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future
+from modules.fatigue_detector import FatigueDetector, fatigue_scores
+from modules.inference_backends import create_backend
+from modules.posture_analyzer import PostureAnalyzer
+from modules.hand_detector import HandDetector
+from modules.frame_context import FrameContext
+from modules.face_region import FaceRegionTracker
+from modules.temporal import CaptureClock
+
+
+class BatchInferenceScheduler:
+    """Collect fatigue-model requests from many streams and run them as batches.
+
+    A batch is dispatched as soon as it is full or when its oldest request has waited
+    `max_latency` seconds, whichever comes first.
+    """
+
+    def __init__(self, backend, max_batch_size=8, max_latency=0.02):
+        self.logger = logging.getLogger(__name__)
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+
+        self.requests = queue.Queue()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="batch-inference", daemon=True)
+        self.buffer = None
+
+        self.batches = 0
+        self.batched_requests = 0
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+
+    def submit(self, model_input):
+        """Queue a (1, H, W, 3) model input and return a Future resolving to its fatigue score."""
+        future = Future()
+        self.requests.put((model_input, future, time.perf_counter()))
+        return future
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                first = self.requests.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = first[2] + self.max_latency
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        """Run one batch through the model and resolve every request's future."""
+        try:
+            sample_shape = batch[0][0].shape[1:]
+            if self.buffer is None or self.buffer.shape[1:] != sample_shape:
+                self.buffer = np.empty((self.max_batch_size,) + sample_shape, dtype=np.float32)
+            for i, (model_input, _, _) in enumerate(batch):
+                self.buffer[i] = model_input[0]
+
+            scores = fatigue_scores(self.backend.predict(self.buffer[:len(batch)]))
+            for (_, future, _), score in zip(batch, scores):
+                future.set_result(float(score))
+        except Exception as e:
+            self.logger.error(f"Error during batched fatigue prediction: {str(e)}")
+            for _, future, _ in batch:
+                future.set_result(None)
+
+        self.batches += 1
+        self.batched_requests += len(batch)
+
+
+class FleetStream:
+    """One monitored video source with its own MediaPipe graphs, alert timers and counters."""
+
+    def __init__(self, stream_id, source, scheduler, fatigue_detector, face_roi=False):
+        self.logger = logging.getLogger(__name__)
+        self.stream_id = stream_id
+        self.source = source
+        self.scheduler = scheduler
+
+        # The fatigue detector shares the server's model; only its alert timer is per stream
+        self.fatigue_detector = fatigue_detector
+        self.posture_analyzer = PostureAnalyzer()
+        self.hand_detector = HandDetector()
+        self.face_tracker = FaceRegionTracker() if face_roi else None
+        self.context = FrameContext(keep_frame=False)
+
+        self.frames = 0
+        self.alerts = {"fatigue": 0, "posture": 0, "hands_off_wheel": 0}
+        self.active_alerts = set()
+        self.start_time = None
+        self.end_time = None
+        self.finished = False
+        self.thread = threading.Thread(target=self._run, name=f"stream-{stream_id}", daemon=True)
+
+    def start(self, stop_event):
+        self.stop_event = stop_event
+        self.thread.start()
+
+    def fps(self):
+        if self.start_time is None:
+            return 0.0
+        elapsed = (self.end_time or time.perf_counter()) - self.start_time
+        return self.frames / elapsed if elapsed > 0 else 0.0
+
+    def _run(self):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            self.logger.error(f"[{self.stream_id}] Cannot open video source {self.source}")
+            self.finished = True
+            return
+
+        # Files are processed as fast as possible and timed by their own position
+        clock = CaptureClock(cap, isinstance(self.source, str))
+        self.start_time = time.perf_counter()
+
+        try:
+            while not self.stop_event.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    self.logger.info(f"[{self.stream_id}] End of video stream")
+                    break
+
+                self.process(frame, clock.timestamp(cap))
+                self.frames += 1
+        except Exception as e:
+            self.logger.error(f"[{self.stream_id}] Error in stream loop: {str(e)}")
+        finally:
+            cap.release()
+            self.posture_analyzer.close()
+            self.hand_detector.close()
+            self.end_time = time.perf_counter()
+            self.finished = True
+
+    def process(self, frame, timestamp):
+        """Analyze one frame; hand detection runs while the fatigue batch is being inferred."""
+        context = self.context.update(frame, timestamp)
+
+        posture_result = self.posture_analyzer.detect_posture(context)
+        pose_result = self.posture_analyzer.get_last_pose_result()
+
+        face_box = None
+        if self.face_tracker is not None:
+            face_box = self.face_tracker.update(pose_result, context.width, context.height)
+        model_input = self.fatigue_detector.preprocess_for_model(context, face_box)
+        future = self.scheduler.submit(model_input) if model_input is not None else None
+
+        hands_info = self.hand_detector.detect_hands(context, pose_result)
+
+        fatigue_score = future.result() if future is not None else None
+        fatigue_alert = self.fatigue_detector.check_fatigue_alert(fatigue_score, timestamp)
+
+        self._track_alerts({
+            "fatigue": fatigue_alert,
+            "posture": bool(posture_result.issues),
+            "hands_off_wheel": hands_info.hands_off_wheel_alert
+        }, posture_result.issues)
+
+    def _track_alerts(self, states, posture_issues):
+        """Count and log each alert once when it starts rather than on every frame."""
+        for alert_type, active in states.items():
+            if active and alert_type not in self.active_alerts:
+                self.alerts[alert_type] += 1
+                detail = f" ({', '.join(posture_issues)})" if alert_type == "posture" else ""
+                self.logger.warning(f"[{self.stream_id}] {alert_type.replace('_', ' ').upper()} ALERT{detail}")
+                self.active_alerts.add(alert_type)
+            elif not active:
+                self.active_alerts.discard(alert_type)
+
+
+class FleetServer:
+    """Monitor several video sources in one process with one shared, batched fatigue model."""
+
+    def __init__(self, sources, fatigue_model_path, fatigue_backend=None, max_batch_size=None,
+                 max_latency_ms=20, face_roi=False, report_interval=10.0):
+        self.logger = logging.getLogger(__name__)
+        self.report_interval = report_interval
+
+        backend = create_backend(fatigue_model_path, fatigue_backend)
+        self.scheduler = BatchInferenceScheduler(backend, max_batch_size or len(sources), max_latency_ms / 1000.0)
+        self.streams = [
+            FleetStream(f"stream-{i}", source, self.scheduler, FatigueDetector(fatigue_model_path, backend), face_roi)
+            for i, source in enumerate(sources)
+        ]
+        self.stop_event = threading.Event()
+        self.start_time = None
+        self.logger.info(f"Fleet server ready with {len(self.streams)} streams on a shared {backend.name} model")
+
+    def run(self):
+        """Process all streams until they end or the server is interrupted."""
+        self.start_time = time.perf_counter()
+        self.scheduler.start()
+        for stream in self.streams:
+            stream.start(self.stop_event)
+
+        try:
+            next_report = time.perf_counter() + self.report_interval
+            while not all(stream.finished for stream in self.streams):
+                time.sleep(0.2)
+                if time.perf_counter() >= next_report:
+                    self.log_stats()
+                    next_report += self.report_interval
+        except KeyboardInterrupt:
+            self.logger.info("Fleet server interrupted")
+        finally:
+            self.stop_event.set()
+            for stream in self.streams:
+                stream.thread.join()
+            self.scheduler.stop()
+            self.log_stats()
+
+    def stats(self):
+        """Return per-stream fps and alert counts plus aggregate throughput and batching figures."""
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0.0
+        total_frames = sum(stream.frames for stream in self.streams)
+        return {
+            "streams": {
+                stream.stream_id: {
+                    "source": stream.source,
+                    "frames": stream.frames,
+                    "fps": round(stream.fps(), 2),
+                    "alerts": dict(stream.alerts)
+                }
+                for stream in self.streams
+            },
+            "total_frames": total_frames,
+            "aggregate_fps": round(total_frames / elapsed, 2) if elapsed > 0 else 0.0,
+            "inference_batches": self.scheduler.batches,
+            "mean_batch_size": round(self.scheduler.batched_requests / self.scheduler.batches, 2)
+            if self.scheduler.batches else 0.0
+        }
+
+    def log_stats(self):
+        stats = self.stats()
+        for stream_id, stream_stats in stats["streams"].items():
+            self.logger.info(f"[{stream_id}] {stream_stats['frames']} frames, {stream_stats['fps']} fps, "
+                             f"alerts {stream_stats['alerts']}")
+        self.logger.info(f"Aggregate: {stats['total_frames']} frames, {stats['aggregate_fps']} fps, "
+                         f"mean batch size {stats['mean_batch_size']}")
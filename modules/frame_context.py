@@ -0,0 +1,140 @@
+import cv2
+import numpy as np
+
+
+class FrameContext:
+    """Per-frame views shared by all detectors, backed by buffers that are reused across frames.
+
+    One context is created up front and updated for every frame: it flips the camera frame once,
+    converts it to RGB once, and fills the float32 model input on demand, so the detectors never
+    repeat those conversions or allocate new arrays in steady state.
+    """
+
+    def __init__(self, frame_buffers=1, keep_frame=True):
+        # Several flipped-frame buffers let another thread (e.g. display) hold on to a returned
+        # frame while the next one is being written
+        self.frame_buffers = [None] * frame_buffers
+        self.buffer_index = 0
+        # Headless callers never draw or display, so they can skip the flipped BGR display copy
+        self.keep_frame = keep_frame
+        self._unflipped_rgb = None
+        self._full_rgb = None
+        self._scaled_rgb = None
+        # Below 1.0 the detectors analyze a downscaled RGB view. Landmarks are normalized, so all geometry
+        # keeps using the full-resolution width and height and results line up with the displayed frame.
+        self.analysis_scale = 1.0
+        self.frame = None  # Flipped BGR frame; overlays are drawn on it (None when keep_frame is off)
+        self.rgb = None  # Flipped RGB view for MediaPipe and the fatigue model, at analysis_scale
+        self.frame_size = None  # (width, height) of the full-resolution frame
+        self.timestamp = None
+        self.frame_index = -1
+
+        self._resized = None
+        self._model_input = None
+        self._model_input_ready = False
+        self._model_input_roi = None
+
+    @classmethod
+    def from_frame(cls, frame, timestamp=None):
+        """Wrap an already flipped BGR frame, e.g. for callers that hand detectors plain arrays."""
+        context = cls()
+        context.frame = frame
+        context.rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        context.frame_size = (frame.shape[1], frame.shape[0])
+        context.timestamp = timestamp
+        context.frame_index = 0
+        return context
+
+    @property
+    def height(self):
+        """Full-resolution frame height, whatever the analysis scale."""
+        return self.frame_size[1]
+
+    @property
+    def width(self):
+        """Full-resolution frame width, whatever the analysis scale."""
+        return self.frame_size[0]
+
+    def analysis_box(self, box):
+        """Map a full-resolution pixel box (x0, y0, x1, y1) onto the `rgb` view."""
+        if box is None or self.rgb.shape[1] == self.width:
+            return box
+        scale_x, scale_y = self.rgb.shape[1] / self.width, self.rgb.shape[0] / self.height
+        x0, y0, x1, y1 = box
+        return (int(x0 * scale_x), int(y0 * scale_y), max(int(x1 * scale_x), int(x0 * scale_x) + 1),
+                max(int(y1 * scale_y), int(y0 * scale_y) + 1))
+
+    def update(self, raw_frame, timestamp=None):
+        """Load a new camera frame: flip it horizontally and build the shared RGB view."""
+        if self._full_rgb is None or self._full_rgb.shape != raw_frame.shape:
+            self._full_rgb = np.empty_like(raw_frame)
+
+        if self.keep_frame:
+            self.buffer_index = (self.buffer_index + 1) % len(self.frame_buffers)
+            frame = self.frame_buffers[self.buffer_index]
+            if frame is None or frame.shape != raw_frame.shape:
+                frame = self.frame_buffers[self.buffer_index] = np.empty_like(raw_frame)
+            cv2.flip(raw_frame, 1, dst=frame)  # Flip frame horizontally for natural view
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._full_rgb)
+            self.frame = frame
+        else:
+            # The analysis view still has to be mirrored so verdicts match the rendered mode
+            if self._unflipped_rgb is None or self._unflipped_rgb.shape != raw_frame.shape:
+                self._unflipped_rgb = np.empty_like(raw_frame)
+            cv2.cvtColor(raw_frame, cv2.COLOR_BGR2RGB, dst=self._unflipped_rgb)
+            cv2.flip(self._unflipped_rgb, 1, dst=self._full_rgb)
+
+        self.frame_size = (raw_frame.shape[1], raw_frame.shape[0])
+        self.rgb = self._full_rgb
+        if self.analysis_scale < 1.0:
+            size = (max(1, int(raw_frame.shape[1] * self.analysis_scale)),
+                    max(1, int(raw_frame.shape[0] * self.analysis_scale)))
+            if self._scaled_rgb is None or self._scaled_rgb.shape[1::-1] != size:
+                self._scaled_rgb = np.empty((size[1], size[0], 3), dtype=raw_frame.dtype)
+            cv2.resize(self._full_rgb, size, dst=self._scaled_rgb, interpolation=cv2.INTER_AREA)
+            self.rgb = self._scaled_rgb
+
+        self.timestamp = timestamp
+        self.frame_index += 1
+        self._model_input_ready = False
+        return self
+
+    def load_rgb(self, rgb, timestamp=None):
+        """Use an already flipped RGB frame as the analysis view without copying it, e.g. a shared-memory slot."""
+        self.rgb = rgb
+        self.frame = None
+        self.frame_size = (rgb.shape[1], rgb.shape[0])
+        self.timestamp = timestamp
+        self.frame_index += 1
+        self._model_input_ready = False
+        return self
+
+    def model_input(self, input_size=(224, 224), roi=None):
+        """Return the (1, height, width, 3) float32 model input for this frame, computed once.
+
+        `roi` is an optional (x0, y0, x1, y1) full-resolution pixel crop, e.g. the driver's face.
+        """
+        height, width = input_size
+        if self._model_input is None or self._model_input.shape[1:3] != (height, width):
+            self._resized = np.empty((height, width, 3), dtype=np.uint8)
+            self._model_input = np.empty((1, height, width, 3), dtype=np.float32)
+            self._model_input_ready = False
+
+        if not self._model_input_ready or roi != self._model_input_roi:
+            source = self.rgb
+            if roi is not None:
+                x0, y0, x1, y1 = self.analysis_box(roi)
+                source = self.rgb[y0:y1, x0:x1]  # A view, the crop is never copied
+            cv2.resize(source, (width, height), dst=self._resized)
+            # Normalize to [0, 1] straight into the float32 buffer, no float64 temporary
+            np.multiply(self._resized, np.float32(1.0 / 255.0), out=self._model_input[0])
+            self._model_input_ready = True
+            self._model_input_roi = roi
+        return self._model_input
+
+
+def as_frame_context(frame, timestamp=None):
+    """Accept either a FrameContext or a plain (already flipped) BGR frame."""
+    if isinstance(frame, FrameContext):
+        return frame
+    return FrameContext.from_frame(frame, timestamp)
@@ -0,0 +1,220 @@
+import cv2
+import logging
+import queue
+import threading
+import time
+from collections import deque
+import numpy as np
+from modules.temporal import CaptureClock
+
+
+class LatestFrameQueue:
+    """Bounded queue that drops the oldest items when full and lets consumers skip to the newest."""
+
+    def __init__(self, maxsize=2):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def put(self, item):
+        """Add an item without blocking, discarding the oldest queued item if there is no room."""
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self._count_drop()
+                except queue.Empty:
+                    pass
+
+    def get_latest(self, timeout=None):
+        """Wait for an item, then return the newest one and count the older ones as dropped.
+
+        The None end-of-stream marker is always the last item put, so it is never skipped.
+        """
+        item = self.queue.get(timeout=timeout)
+        while True:
+            try:
+                newer = self.queue.get_nowait()
+            except queue.Empty:
+                return item
+            self._count_drop()
+            item = newer
+
+    def qsize(self):
+        return self.queue.qsize()
+
+    def _count_drop(self):
+        with self._lock:
+            self.dropped += 1
+
+
+class LatencyTracker:
+    """Rolling window of latency samples in seconds with percentile summaries in milliseconds."""
+
+    def __init__(self, window=1000):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+            self.count += 1
+
+    def summary(self):
+        with self._lock:
+            samples = np.asarray(self.samples) * 1000.0
+            count = self.count
+        if count == 0:
+            return {"count": 0}
+        return {
+            "count": count,
+            "mean_ms": round(float(samples.mean()), 2),
+            "p50_ms": round(float(np.percentile(samples, 50)), 2),
+            "p95_ms": round(float(np.percentile(samples, 95)), 2),
+            "max_ms": round(float(samples.max()), 2)
+        }
+
+
+class FramePipeline:
+    """Run capture, analysis and display on separate threads so alerts are raised on fresh video."""
+
+    def __init__(self, system, video_source=0, queue_size=2, display=True):
+        self.logger = logging.getLogger(__name__)
+        self.system = system
+        self.video_source = video_source
+        self.display = display
+
+        self.frame_queue = LatestFrameQueue(queue_size)
+        self.display_queue = LatestFrameQueue(queue_size)
+        self.stop_event = threading.Event()
+
+        self.frames_captured = 0
+        self.frames_analyzed = 0
+        self.verdict_latency = LatencyTracker()  # capture -> verdict for every analyzed frame
+        self.alert_latency = LatencyTracker()  # capture -> alert for frames that raised one
+
+        # Drops and queue depths are read when metrics are exported, not on every frame
+        system.metrics.registry.add_collect_hook(self._export_metrics)
+
+    def run(self):
+        """Run until the stream ends or 'q' is pressed. Display stays on the calling thread."""
+        cap = cv2.VideoCapture(self.video_source)
+        if not cap.isOpened():
+            self.logger.error(f"Cannot open video source {self.video_source}")
+            return
+
+        self.logger.info(f"Starting pipelined capture from source {self.video_source}")
+        capture_thread = threading.Thread(target=self._capture_loop, args=(cap,), name="capture", daemon=True)
+        analysis_thread = threading.Thread(target=self._analysis_loop, name="analysis", daemon=True)
+        capture_thread.start()
+        analysis_thread.start()
+
+        try:
+            self._display_loop()
+        finally:
+            self.stop_event.set()
+            capture_thread.join()
+            analysis_thread.join()
+            cap.release()
+            self.logger.info(f"Pipeline stats: {self.stats()}")
+
+    def _capture_loop(self, cap):
+        """Read frames as they arrive and hand the newest to the analysis thread."""
+        # Recorded files are replayed at their own frame rate, like a live camera
+        pace = isinstance(self.video_source, str)
+        frame_interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        start_time = time.perf_counter()
+        clock = CaptureClock(cap, pace)
+
+        try:
+            while not self.stop_event.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    self.logger.info("End of video stream")
+                    break
+
+                if pace:
+                    delay = start_time + self.frames_captured * frame_interval - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                self.frame_queue.put((frame, clock.timestamp(cap), time.perf_counter()))
+                self.frames_captured += 1
+        except Exception as e:
+            self.logger.error(f"Error in capture loop: {str(e)}")
+        finally:
+            self.frame_queue.put(None)  # End-of-stream marker
+
+    def _analysis_loop(self):
+        """Always analyze the newest captured frame, skipping any that went stale."""
+        try:
+            while True:
+                try:
+                    item = self.frame_queue.get_latest(timeout=0.1)
+                except queue.Empty:
+                    if self.stop_event.is_set():
+                        break
+                    continue
+                if item is None:
+                    break
+
+                frame, timestamp, captured_at = item
+                processed_frame = self.system.process_frame(frame, timestamp)
+                if self.system.load_error is not None:
+                    self.logger.error("Detectors failed to load, stopping")
+                    break
+                now = time.perf_counter()
+                results = self.system.last_results
+
+                # Frames shown while the detectors are still loading, or that failed, carry no verdict
+                if results is not None and not results.get("initializing"):
+                    self.frames_analyzed += 1
+                    self.verdict_latency.record(now - captured_at)
+                    if results["alert"]:
+                        self.alert_latency.record(now - captured_at)
+
+                if self.display:
+                    self.display_queue.put(processed_frame)
+        except Exception as e:
+            self.logger.error(f"Error in analysis loop: {str(e)}")
+        finally:
+            self.display_queue.put(None)
+
+    def _display_loop(self):
+        """Show processed frames and watch for the quit key."""
+        while True:
+            try:
+                frame = self.display_queue.get_latest(timeout=0.05)
+            except queue.Empty:
+                frame = False
+            if frame is None:
+                break
+
+            if self.display:
+                if frame is not False:
+                    cv2.imshow('Driver Monitoring System', frame)
+                # Keep the window responsive even when no new frame is ready
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    self.logger.info("User requested exit (q key)")
+                    break
+
+    def _export_metrics(self):
+        metrics = self.system.metrics
+        metrics.frames_dropped.set(self.frame_queue.dropped)
+        metrics.queue_depth.set(self.frame_queue.qsize(), queue="capture")
+        metrics.queue_depth.set(self.display_queue.qsize(), queue="display")
+
+    def stats(self):
+        """Return frame counts, drop counts and capture-to-verdict/alert latency summaries."""
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_analyzed": self.frames_analyzed,
+            "frames_dropped": self.frame_queue.dropped,
+            "display_frames_dropped": self.display_queue.dropped,
+            "capture_to_verdict": self.verdict_latency.summary(),
+            "capture_to_alert": self.alert_latency.summary()
+        }
@@ -1,119 +1,154 @@
-import cv2
-import mediapipe as mp
+import numpy as np
 import time
 import logging
-import math
+from modules.frame_context import as_frame_context
+from modules.detection_results import HandsResult, HandStatus
+from modules import landmark_geometry as geometry
+from modules.temporal import SustainedCondition
 
 class HandDetector:
-    def __init__(self):
+    def __init__(self, use_pose_roi=True, roi_margin=0.6, model_complexity=1):
         self.logger = logging.getLogger(__name__)
 
-        # Initialize MediaPipe Hands model for hand landmark detection
+        # Initialize MediaPipe Hands model for hand landmark detection (imported lazily, like in PostureAnalyzer)
+        import mediapipe as mp
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=2,  # Detect up to 2 hands
+        self.model_complexity = model_complexity  # 0 = lite, 1 = full
+
+        # Pose-guided region of interest: run Hands only on the area around the pose wrists
+        self.use_pose_roi = use_pose_roi
+        self.hands = None  # Full-frame graph, tracks hands from one frame to the next
+        self.roi_hands = None  # Graph for wrist crops, which detects hands afresh on every crop
+        self._create_graphs()
+        self.roi_margin = roi_margin  # Padding around the wrists as a fraction of shoulder width
+        self.ROI_VISIBILITY_THRESHOLD = 0.5  # Minimum pose landmark visibility to trust a wrist
+        self.last_roi = None  # (x0, y0, x1, y1) in pixels of the last crop, None for the full frame
+
+        # Thresholds
+        self.HAND_ON_WHEEL_THRESHOLD = 3  # Time in seconds for hands on wheel alert
+        self.hands_off_wheel_timer = SustainedCondition()  # Frame-time timer for hands off wheel alert
+        self.errors = 0  # Frames whose analysis raised, exported as a metric
+
+    def _create_hands(self, static_image_mode=False):
+        return self.mp_hands.Hands(
+            static_image_mode=static_image_mode,
+            max_num_hands=2,  # Both hands are needed to tell whether both are on the wheel
+            model_complexity=self.model_complexity,
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
         )
 
-        # Thresholds
-        self.HAND_ON_WHEEL_THRESHOLD = 3  # Time in seconds for hands on wheel alert
-        self.hands_off_wheel_start_time = None  # Timer for hands off wheel alert
-
-        # Define the hand landmark connections (using MediaPipe's predefined connections)
-        self.HAND_CONNECTIONS = [
-            [0, 1], [1, 2], [2, 3], [3, 4],  # Thumb
-            [0, 5], [5, 6], [6, 7], [7, 8],  # Index finger
-            [0, 9], [9, 10], [10, 11], [11, 12],  # Middle finger
-            [0, 13], [13, 14], [14, 15], [15, 16],  # Ring finger
-            [0, 17], [17, 18], [18, 19], [19, 20]  # Pinky finger
-        ]
-
-    def calculate_distance(self, point1, point2):
-        """Calculate the Euclidean distance between two points."""
-        return math.sqrt((point1[0] - point2[0])**2 + (point1[1] - point2[1])**2)
-
-    def detect_hands(self, frame, pose_result=None):
-        """Detect hands and check if they are on the steering wheel."""
+    def set_model_complexity(self, model_complexity):
+        """Swap the Hands graphs for ones of another complexity; costs a graph rebuild, so change it rarely."""
+        if model_complexity == self.model_complexity:
+            return
+        self.close()
+        self.model_complexity = model_complexity
+        self._create_graphs()
+
+    def _create_graphs(self):
+        self.hands = self._create_hands()
+        if self.use_pose_roi:
+            # The crop moves and changes size every frame, so hands tracked in the previous crop would be
+            # looked for in the wrong place; crops are always searched with palm detection instead
+            self.roi_hands = self._create_hands(static_image_mode=True)
+
+    def reset(self):
+        """Forget the hands-off-wheel timer and the tracked hands, e.g. before analyzing another video."""
+        self.hands_off_wheel_timer.reset()
+        self.last_roi = None
+        # Only the full-frame graph tracks hands between frames; the crop graph keeps no state
+        self.hands.close()
+        self.hands = self._create_hands()
+
+    def hand_region(self, pose_result, width, height):
+        """Return a pixel box (x0, y0, x1, y1) around the visible pose wrists, or None."""
+        if not self.use_pose_roi or pose_result is None or not pose_result.pose_landmarks:
+            return None
+
+        landmarks = pose_result.pose_landmarks.landmark
+        return geometry.hand_region(geometry.landmark_array(landmarks), geometry.visibility_array(landmarks),
+                                    width, height, self.roi_margin, self.ROI_VISIBILITY_THRESHOLD)
+
+    def process_region(self, rgb_frame, roi):
+        """Run MediaPipe Hands on the region and map the landmarks back to full-frame coordinates."""
+        if roi is None:
+            return self.hands.process(rgb_frame)
+
+        x0, y0, x1, y1 = roi
+        height, width = rgb_frame.shape[:2]
+        crop_width, crop_height = x1 - x0, y1 - y0
+        hands = self.roi_hands if self.roi_hands is not None else self.hands
+        result_hands = hands.process(np.ascontiguousarray(rgb_frame[y0:y1, x0:x1]))
+        if result_hands.multi_hand_landmarks:
+            for hand_landmarks in result_hands.multi_hand_landmarks:
+                for landmark in hand_landmarks.landmark:
+                    landmark.x = (x0 + landmark.x * crop_width) / width
+                    landmark.y = (y0 + landmark.y * crop_height) / height
+        return result_hands
+
+    def detect_hands(self, frame, pose_result=None, timestamp=None, roi=None):
+        """Detect hands and check if they are on the steering wheel. Accepts a frame or FrameContext.
+
+        `roi` is a hand region already found from the pose elsewhere, e.g. in another process; without it
+        the region comes from `pose_result`. Returns a HandsResult; nothing is drawn on the frame.
+        """
+        result = HandsResult()
+
         try:
-            # Convert the frame to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Use the shared RGB view instead of converting the frame again
+            context = as_frame_context(frame, timestamp)
+            rgb_frame = context.rgb
+            width, height = context.width, context.height
+            if timestamp is None:
+                timestamp = context.timestamp
+            now = time.time() if timestamp is None else timestamp
 
             # Define a region for the steering wheel (approximate location on the frame)
-            steering_wheel_center = (frame.shape[1] // 2, frame.shape[0] // 2 + 175)  # Center of steering wheel area
-            steering_wheel_radius = 175  # Radius of the region considered as the "steering wheel"
-
-            # Draw the steering wheel region
-            cv2.circle(frame, steering_wheel_center, steering_wheel_radius, (255, 255, 0), 2)
-
-            # Process the frame and get hand landmarks
-            result_hands = self.hands.process(rgb_frame)
+            steering_wheel_center, steering_wheel_radius = geometry.steering_wheel_region(width, height)
+            result.wheel_center = steering_wheel_center
+            result.wheel_radius = steering_wheel_radius
 
-            left_hand_on_wheel = False
-            right_hand_on_wheel = False
+            # Process the frame (or just the area around the wrists) and get hand landmarks
+            self.last_roi = roi if roi is not None else self.hand_region(pose_result, width, height)
+            result.roi = self.last_roi
+            result_hands = self.process_region(rgb_frame, context.analysis_box(self.last_roi))
 
             if result_hands.multi_hand_landmarks:
-                for hand_idx, hand_landmarks in enumerate(result_hands.multi_hand_landmarks):
-                    # Iterate over the hand landmarks to draw them
-                    for i in range(len(hand_landmarks.landmark)):
-                        hand_landmark = hand_landmarks.landmark[i]
-                        x = int(hand_landmark.x * frame.shape[1])
-                        y = int(hand_landmark.y * frame.shape[0])
-                        cv2.circle(frame, (x, y), 5, (0, 0, 255), -1)  # Draw the landmark points
-
-                    # Connect the landmarks using predefined connections
-                    for connection in self.HAND_CONNECTIONS:
-                        start_idx, end_idx = connection
-                        start = hand_landmarks.landmark[start_idx]
-                        end = hand_landmarks.landmark[end_idx]
-                        start_x, start_y = int(start.x * frame.shape[1]), int(start.y * frame.shape[0])
-                        end_x, end_y = int(end.x * frame.shape[1]), int(end.y * frame.shape[0])
-                        cv2.line(frame, (start_x, start_y), (end_x, end_y), (150, 150, 150), 2)
-
-                    # Check the distance from the index finger tip (landmark index 8) to the steering wheel center
-                    index_finger_tip = hand_landmarks.landmark[8]
-                    index_finger_x = int(index_finger_tip.x * frame.shape[1])
-                    index_finger_y = int(index_finger_tip.y * frame.shape[0])
-
-                    # Calculate distance from the index finger to the steering wheel center
-                    distance_from_wheel = self.calculate_distance(
-                        (index_finger_x, index_finger_y),
-                        steering_wheel_center
-                    )
+                # Stack all hands into one (H, 21, 3) array and measure them in one go
+                result.points = np.stack([geometry.landmark_array(hand_landmarks.landmark)
+                                          for hand_landmarks in result_hands.multi_hand_landmarks])
+                pixels = geometry.pixel_positions(result.points, width, height)
 
+                # Distance from each index finger tip to the steering wheel center
+                distances_from_wheel = geometry.wheel_distances(result.points, steering_wheel_center, width, height)
+
+                for hand_idx, distance_from_wheel in enumerate(distances_from_wheel):
                     # Check if the hand is within the steering wheel region
-                    if distance_from_wheel < steering_wheel_radius:
+                    on_wheel = bool(distance_from_wheel < steering_wheel_radius)
+                    result.hands.append(HandStatus([tuple(point) for point in pixels[hand_idx].tolist()], on_wheel))
+                    if on_wheel:
                         # The hand is on the steering wheel
                         if hand_idx == 0:  # First detected hand
-                            left_hand_on_wheel = True
+                            result.left_hand_on_wheel = True
                         else:
-                            right_hand_on_wheel = True
-
-            # Check for hands off wheel for more than threshold seconds
-            hands_off_wheel_alert = False
-            if not left_hand_on_wheel or not right_hand_on_wheel:
-                if self.hands_off_wheel_start_time is None:
-                    self.hands_off_wheel_start_time = time.time()
-                elif time.time() - self.hands_off_wheel_start_time >= self.HAND_ON_WHEEL_THRESHOLD:
-                    hands_off_wheel_alert = True
-            else:
-                self.hands_off_wheel_start_time = None  # Reset timer if hands are on the wheel
-
-            return {
-                "left_hand_on_wheel": left_hand_on_wheel,
-                "right_hand_on_wheel": right_hand_on_wheel,
-                "hands_off_wheel_alert": hands_off_wheel_alert
-            }
+                            result.right_hand_on_wheel = True
+
+            # Check for hands off wheel for more than threshold seconds; the timer resets once both are back
+            hands_off = not result.left_hand_on_wheel or not result.right_hand_on_wheel
+            off_for = self.hands_off_wheel_timer.update(hands_off, now)
+            result.hands_off_wheel_alert = off_for is not None and off_for >= self.HAND_ON_WHEEL_THRESHOLD
+
+            return result
 
         except Exception as e:
+            self.errors += 1
             self.logger.error(f"Error in hand detection: {str(e)}")
-            return {
-                "left_hand_on_wheel": False,
-                "right_hand_on_wheel": False,
-                "hands_off_wheel_alert": False
-            }
+            return HandsResult()
 
     def close(self):
         """Clean up resources."""
         if self.hands:
-            self.hands.close()
\ No newline at end of file
+            self.hands.close()
+        if self.roi_hands:
+            self.roi_hands.close()
\ No newline at end of file
@@ -0,0 +1,133 @@
+import os
+import logging
+import numpy as np
+
+
+class InferenceBackend:
+    """Common interface for the runtimes that can execute the fatigue model."""
+
+    name = None
+
+    def __init__(self, model_path):
+        self.logger = logging.getLogger(__name__)
+        self.model_path = model_path
+        self.input_size = (224, 224)  # (height, width) expected by the model
+
+    def predict(self, batch):
+        """Run the model on a float32 batch of shape (N, H, W, 3) and return the raw outputs."""
+        raise NotImplementedError
+
+
+class KerasBackend(InferenceBackend):
+    """Reference backend running the Keras model through TensorFlow."""
+
+    name = "keras"
+
+    def __init__(self, model_path):
+        super().__init__(model_path)
+        from tensorflow.keras.models import load_model
+
+        self.model = load_model(model_path)
+        self.input_size = tuple(self.model.input_shape[1:3])
+
+    def predict(self, batch):
+        # predict_on_batch skips the per-call dataset setup of model.predict
+        return np.asarray(self.model.predict_on_batch(batch))
+
+
+class TFLiteBackend(InferenceBackend):
+    """Backend for float32, float16 and int8-quantized TensorFlow Lite models."""
+
+    name = "tflite"
+
+    def __init__(self, model_path, num_threads=None):
+        super().__init__(model_path)
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._refresh_details()
+        self.input_size = tuple(int(d) for d in self.input_details["shape"][1:3])
+
+    def _refresh_details(self):
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+
+        # Interpreters are exported with a batch of one; resize when a different batch arrives
+        if self.input_details["shape"][0] != len(batch):
+            self.interpreter.resize_tensor_input(self.input_details["index"], list(batch.shape))
+            self.interpreter.allocate_tensors()
+            self._refresh_details()
+
+        input_dtype = self.input_details["dtype"]
+        if input_dtype in (np.int8, np.uint8):
+            scale, zero_point = self.input_details["quantization"]
+            limits = np.iinfo(input_dtype)
+            batch = np.clip(np.round(batch / scale + zero_point), limits.min, limits.max).astype(input_dtype)
+
+        self.interpreter.set_tensor(self.input_details["index"], batch)
+        self.interpreter.invoke()
+        output = self.interpreter.get_tensor(self.output_details["index"])
+
+        if self.output_details["dtype"] in (np.int8, np.uint8):
+            scale, zero_point = self.output_details["quantization"]
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output
+
+
+class OnnxBackend(InferenceBackend):
+    """Backend running an ONNX export of the model through ONNX Runtime on the CPU."""
+
+    name = "onnx"
+
+    def __init__(self, model_path, num_threads=None):
+        super().__init__(model_path)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, sess_options=options,
+                                            providers=["CPUExecutionProvider"])
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        height, width = model_input.shape[1:3]
+        if isinstance(height, int) and isinstance(width, int):
+            self.input_size = (height, width)
+
+    def predict(self, batch):
+        return self.session.run(None, {self.input_name: np.asarray(batch, dtype=np.float32)})[0]
+
+
+BACKENDS = {
+    KerasBackend.name: KerasBackend,
+    TFLiteBackend.name: TFLiteBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+EXTENSION_BACKENDS = {
+    ".keras": KerasBackend.name,
+    ".h5": KerasBackend.name,
+    ".tflite": TFLiteBackend.name,
+    ".onnx": OnnxBackend.name,
+}
+
+
+def create_backend(model_path, backend=None, **options):
+    """Create an inference backend by name, or from the model file extension when no name is given."""
+    if backend is None:
+        extension = os.path.splitext(model_path)[1].lower()
+        backend = EXTENSION_BACKENDS.get(extension)
+        if backend is None:
+            raise ValueError(f"Cannot infer inference backend for model file {model_path}")
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[backend](model_path, **options)
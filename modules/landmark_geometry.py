@@ -0,0 +1,138 @@
+import numpy as np
+
+# MediaPipe Pose landmark indices used by the posture checks
+NOSE = 0
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_ELBOW = 13
+RIGHT_ELBOW = 14
+LEFT_WRIST = 15
+RIGHT_WRIST = 16
+
+# MediaPipe Pose landmarks on the hands: wrists, pinkies, index fingers and thumbs
+HAND_POSE_LANDMARKS = [15, 16, 17, 18, 19, 20, 21, 22]
+
+# MediaPipe Hands landmark index of the index finger tip
+INDEX_FINGER_TIP = 8
+
+# Named upper-body keypoints reported in PostureResult.landmarks
+POSE_KEYPOINTS = {
+    "shoulder_left": LEFT_SHOULDER,
+    "shoulder_right": RIGHT_SHOULDER,
+    "head": NOSE,  # Using the nose as a proxy for the head
+    "elbow_left": LEFT_ELBOW,
+    "elbow_right": RIGHT_ELBOW,
+    "wrist_left": LEFT_WRIST,
+    "wrist_right": RIGHT_WRIST,
+}
+
+# All kernels below take landmarks as (..., N, 3) arrays of normalized x, y, z, so the same call
+# works for one frame (N, 3) or a whole recording stacked as (T, N, 3).
+
+
+def landmark_array(landmarks, out=None):
+    """Convert a MediaPipe landmark list into an (N, 3) float64 array of normalized x, y, z."""
+    if out is None:
+        out = np.empty((len(landmarks), 3), dtype=np.float64)
+    for i, landmark in enumerate(landmarks):
+        out[i, 0] = landmark.x
+        out[i, 1] = landmark.y
+        out[i, 2] = landmark.z
+    return out
+
+
+def visibility_array(landmarks):
+    """Return the (N,) visibility scores of a MediaPipe landmark list."""
+    return np.fromiter((landmark.visibility for landmark in landmarks), dtype=np.float64, count=len(landmarks))
+
+
+def pixel_positions(points, width, height):
+    """Convert normalized landmarks to integer pixel positions (..., N, 2), truncating like int()."""
+    return np.trunc(points[..., :2] * (width, height)).astype(np.int64)
+
+
+def angle_degrees(point1, point2):
+    """Angle of the vector point1 -> point2 relative to the horizontal axis, in degrees."""
+    delta = point2 - point1
+    return np.arctan2(delta[..., 1], delta[..., 0]) * 180.0 / np.pi
+
+
+def shoulder_angle(points, width, height):
+    """Degrees the shoulder line deviates from horizontal, measured in pixel space."""
+    scale = np.array((width, height), dtype=np.float64)
+    shoulder_left = points[..., LEFT_SHOULDER, :2] * scale
+    shoulder_right = points[..., RIGHT_SHOULDER, :2] * scale
+    return np.abs(180 - np.abs(angle_degrees(shoulder_left, shoulder_right)))
+
+
+def head_tilt_angle(points):
+    """Degrees the shoulder-midpoint -> nose line deviates from vertical, in normalized space."""
+    shoulder_mid = (points[..., LEFT_SHOULDER, :2] + points[..., RIGHT_SHOULDER, :2]) / 2
+    return np.abs(90 - np.abs(angle_degrees(shoulder_mid, points[..., NOSE, :2])))
+
+
+def neck_ratio(points, width, height):
+    """Nose-to-shoulder-midpoint distance over midpoint-to-shoulder distance, in pixel space.
+
+    A small ratio means the head has sunk towards the shoulders. Shoulders that coincide give inf.
+    """
+    scale = np.array((width, height), dtype=np.float64)
+    shoulder_mid = np.trunc((points[..., LEFT_SHOULDER, :2] + points[..., RIGHT_SHOULDER, :2]) / 2 * scale)
+    shoulder_left = np.trunc(points[..., LEFT_SHOULDER, :2] * scale)
+    nose = points[..., NOSE, :2] * scale
+
+    nose_to_midpoint = np.linalg.norm(nose - shoulder_mid, axis=-1)
+    midpoint_to_shoulder = np.linalg.norm(shoulder_mid - shoulder_left, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(midpoint_to_shoulder > 0, nose_to_midpoint / midpoint_to_shoulder, np.inf)
+
+
+def posture_metrics(points, width, height):
+    """Compute all posture measurements at once for (N, 3) or (T, N, 3) pose landmarks."""
+    return {
+        "shoulder_angle": shoulder_angle(points, width, height),
+        "head_tilt_angle": head_tilt_angle(points),
+        "neck_ratio": neck_ratio(points, width, height),
+    }
+
+
+def hand_region(points, visibility, width, height, margin_ratio=0.6, min_visibility=0.5, min_size=32):
+    """Pixel box (x0, y0, x1, y1) around the visible pose hand landmarks, or None.
+
+    `points` and `visibility` are one frame's (33, 3) pose landmarks and (33,) visibility scores. The box is
+    padded by `margin_ratio` x shoulder width (at least a tenth of the frame width), since hands extend well
+    past the wrist, and clipped to the frame.
+    """
+    if points is None or visibility is None:
+        return None
+    pixels = points[:, :2] * (width, height)
+    visible = visibility[HAND_POSE_LANDMARKS] >= min_visibility
+    hand_points = pixels[HAND_POSE_LANDMARKS][visible]
+    if len(hand_points) == 0:
+        return None
+
+    shoulder_width = np.linalg.norm(pixels[LEFT_SHOULDER] - pixels[RIGHT_SHOULDER])
+    margin = max(margin_ratio * shoulder_width, 0.1 * width)
+
+    (x_min, y_min), (x_max, y_max) = hand_points.min(axis=0), hand_points.max(axis=0)
+    x0 = max(int(x_min - margin), 0)
+    y0 = max(int(y_min - margin), 0)
+    x1 = min(int(x_max + margin), width)
+    y1 = min(int(y_max + margin), height)
+    if x1 - x0 < min_size or y1 - y0 < min_size:
+        return None
+    return x0, y0, x1, y1
+
+
+def wheel_distances(hand_points, wheel_center, width, height):
+    """Pixel distance from each hand's index finger tip to the steering wheel center.
+
+    `hand_points` is (..., H, 21, 3); the result is (..., H). Missing hands stored as NaN give NaN.
+    """
+    tip = np.trunc(hand_points[..., INDEX_FINGER_TIP, :2] * (width, height))
+    return np.linalg.norm(tip - np.asarray(wheel_center, dtype=np.float64), axis=-1)
+
+
+def steering_wheel_region(width, height):
+    """Return the ((x, y) center, radius) of the approximate steering wheel region in pixels."""
+    return (width // 2, height // 2 + 175), 175
@@ -0,0 +1,366 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets in seconds, from sub-millisecond flips up to a stalled model call
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _escape(text, quote=True):
+    """Escape a label value (or, with quote=False, HELP text) for the Prometheus text format."""
+    text = str(text).replace("\\", "\\\\").replace("\n", "\\n")
+    return text.replace('"', '\\"') if quote else text
+
+
+def _format_labels(labelnames, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """Base for a named metric family with optional labels; children are created once and cached."""
+
+    type_name = "untyped"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels):
+        """Return the child for one label combination. Keep the child around on hot paths."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self.children.get(key)
+        if child is None:
+            with self._lock:
+                child = self.children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def prometheus_lines(self):
+        lines = [f"# HELP {self.name} {_escape(self.help, quote=False)}", f"# TYPE {self.name} {self.type_name}"]
+        for key, child in list(self.children.items()):
+            lines.extend(child.prometheus_lines(self.name, self.labelnames, key))
+        return lines
+
+    def snapshot(self):
+        return {
+            "type": self.type_name,
+            "values": [dict(labels=dict(zip(self.labelnames, key)), **child.snapshot())
+                       for key, child in list(self.children.items())]
+        }
+
+
+class _Value:
+    """One counter or gauge value."""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+    def prometheus_lines(self, name, labelnames, key):
+        return [f"{name}{_format_labels(labelnames, key)} {self.value}"]
+
+    def snapshot(self):
+        return {"value": self.value}
+
+
+class Counter(Metric):
+    """Monotonically increasing count. Counts kept elsewhere can be mirrored with `set`."""
+
+    type_name = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1, **labels):
+        self.labels(**labels).inc(amount)
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value, **labels):
+        self.labels(**labels).set(value)
+
+
+class _HistogramValue:
+    """Fixed-bucket histogram of observations."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last slot is the +Inf bucket
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def prometheus_lines(self, name, labelnames, key):
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.sum
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            le_label = f'le="{le}"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, key, le_label)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, key)} {total}")
+        lines.append(f"{name}_count{_format_labels(labelnames, key)} {count}")
+        return lines
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket it falls in."""
+        with self._lock:
+            counts, count = list(self.counts), self.count
+        if count == 0:
+            return None
+        rank = q * count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        with self._lock:
+            count, total = self.count, self.sum
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else None,
+            "p50_le": self.quantile(0.5),
+            "p95_le": self.quantile(0.95),
+            "p99_le": self.quantile(0.99)
+        }
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value, **labels):
+        self.labels(**labels).observe(value)
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together as Prometheus text or a JSON snapshot."""
+
+    def __init__(self):
+        self.metrics = {}
+        self.collect_hooks = []  # Called before every export to refresh values kept elsewhere
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def add_collect_hook(self, hook):
+        self.collect_hooks.append(hook)
+
+    def _collect(self):
+        for hook in self.collect_hooks:
+            try:
+                hook()
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Error in metrics collect hook: {str(e)}")
+
+    def render_prometheus(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        self._collect()
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.prometheus_lines())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Return all metrics as a JSON-serializable dict."""
+        self._collect()
+        return {
+            "timestamp": time.time(),
+            "metrics": {name: metric.snapshot() for name, metric in list(self.metrics.items())}
+        }
+
+
+class PipelineMetrics:
+    """The monitoring pipeline's stage timers, frame and alert counters and gauges."""
+
+    STAGES = ("flip", "fatigue", "posture", "hands", "visualize", "alert")
+
+    def __init__(self, registry=None):
+        self.registry = registry or MetricsRegistry()
+        registry = self.registry
+
+        stage_latency = registry.histogram("fatigue_sense_stage_latency_seconds",
+                                           "Latency of each process_frame stage", ("stage",))
+        # Children are resolved once so timing a stage is a bisect and a lock, not a dict lookup chain
+        self.stages = {stage: stage_latency.labels(stage=stage) for stage in self.STAGES}
+        self.frame_latency = registry.histogram("fatigue_sense_frame_latency_seconds",
+                                                "Latency of a whole process_frame call").labels()
+
+        frames = registry.counter("fatigue_sense_frames_total", "Frames by outcome", ("outcome",))
+        self.frames_processed = frames.labels(outcome="processed")
+        self.frames_dropped = frames.labels(outcome="dropped")
+        self.frames_errored = frames.labels(outcome="errored")
+        self.alerts = registry.counter("fatigue_sense_alerts_total", "Alert episodes by type", ("type",))
+        self.detector_errors = registry.counter("fatigue_sense_detector_errors_total",
+                                                "Errors caught inside each detector", ("detector",))
+
+        self.fps = registry.gauge("fatigue_sense_fps", "Processed frames per second").labels()
+        self.queue_depth = registry.gauge("fatigue_sense_queue_depth", "Frames waiting in a pipeline queue",
+                                          ("queue",))
+        self.startup = registry.gauge("fatigue_sense_startup_seconds", "Seconds from startup to each milestone",
+                                      ("milestone",))
+        self.quality_level = registry.gauge("fatigue_sense_quality_level",
+                                            "Adaptive quality level, 0 is full quality").labels()
+
+        self.active_alerts = set()
+        self.last_frame_time = None
+        self.frame_interval = None  # Exponential moving average of the time between frames
+
+    def observe_stage(self, stage, seconds):
+        self.stages[stage].observe(seconds)
+
+    def frame_done(self, seconds, active_alerts=()):
+        """Record one processed frame and count every alert type that just became active."""
+        self.frame_latency.observe(seconds)
+        self.frames_processed.inc()
+
+        now = time.perf_counter()
+        if self.last_frame_time is not None:
+            interval = now - self.last_frame_time
+            self.frame_interval = interval if self.frame_interval is None else \
+                0.9 * self.frame_interval + 0.1 * interval
+            if self.frame_interval > 0:
+                self.fps.set(round(1.0 / self.frame_interval, 2))
+        self.last_frame_time = now
+
+        # Alerts stay active over many frames; count each episode once, when it starts
+        active_alerts = set(active_alerts)
+        for alert_type in active_alerts - self.active_alerts:
+            self.alerts.inc(type=alert_type)
+        self.active_alerts = active_alerts
+
+    def watch_detectors(self, detectors):
+        """Mirror the `errors` count of each named detector into the detector error counter."""
+        def collect():
+            for name, detector in detectors.items():
+                self.detector_errors.labels(detector=name).set(getattr(detector, "errors", 0))
+        self.registry.add_collect_hook(collect)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes are too frequent to log
+
+
+class MetricsServer:
+    """Serve the registry at http://host:port/metrics for Prometheus to scrape. Localhost only by default."""
+
+    def __init__(self, registry, port=9108, host="127.0.0.1"):
+        self.logger = logging.getLogger(__name__)
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        host, port = self.server.server_address[:2]
+        self.logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SnapshotWriter:
+    """Periodically write the registry as JSON, replacing the file atomically."""
+
+    def __init__(self, registry, path, interval=10.0):
+        self.logger = logging.getLogger(__name__)
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="metrics-snapshot", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+        self.write()  # Final snapshot on shutdown
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.write()
+
+    def write(self):
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(self.registry.snapshot(), f, indent=2)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            self.logger.error(f"Error writing metrics snapshot: {str(e)}")
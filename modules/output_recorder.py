@@ -0,0 +1,177 @@
+import cv2
+import logging
+import os
+import queue
+import threading
+from collections import deque
+import numpy as np
+
+_STOP = object()
+
+
+class OutputRecorder:
+    """Save annotated frames to video on a background thread without ever stalling analysis.
+
+    `submit` copies the frame (the pipeline reuses its frame buffers) into a bounded queue and returns at
+    once; when the encoder falls behind and the queue is full the frame is dropped and counted instead.
+
+    mode="continuous" writes every frame to `path`. mode="clips" writes `path` as a directory of short
+    clips around alerts: the last `pre_roll` seconds before an alert starts, and everything until
+    `post_roll` seconds after the last alerting frame. Durations are in frame time. The pre-roll buffer
+    holds at most fps x `pre_roll` frames, whatever the timestamps do, each JPEG-encoded at
+    `pre_roll_quality`: 5 s of raw 1080p frames would take about 900 MB, encoded they take a few tens of MB.
+    """
+
+    FPS_PROBE_FRAMES = 15  # Frames whose timestamps set the output frame rate when `fps` is not given
+
+    def __init__(self, path, mode="continuous", fps=None, pre_roll=5.0, post_roll=5.0, queue_size=64,
+                 codec="mp4v", pre_roll_quality=90, metrics=None):
+        if mode not in ("continuous", "clips"):
+            raise ValueError(f"Unsupported recording mode: {mode}")
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.mode = mode
+        self.fps = fps
+        self.pre_roll = pre_roll
+        self.post_roll = post_roll
+        self.jpeg_params = [cv2.IMWRITE_JPEG_QUALITY, pre_roll_quality]
+        self.fourcc = cv2.VideoWriter_fourcc(*codec)
+        if mode == "clips":
+            os.makedirs(path, exist_ok=True)
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.counts = {"submitted": 0, "written": 0, "dropped": 0, "clips": 0}
+        self.frames = None
+        if metrics is not None:
+            self.frames = metrics.registry.counter("fatigue_sense_recorder_frames_total",
+                                                   "Frames offered to the output recorder by outcome", ("outcome",))
+
+        # Writer thread state
+        self.writer = None
+        self.probe = []  # (timestamp, frame, alert) held until the frame rate is known
+        self.history = None  # Pre-roll ring buffer of (timestamp, JPEG) in clips mode, sized once fps is known
+        self.clip_until = None  # Frame time the open clip ends at unless another alert extends it
+
+        self.thread = threading.Thread(target=self._run, name="output-recorder", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def submit(self, frame, timestamp, alert=False):
+        """Queue a copy of an annotated frame without blocking. Returns False if it was dropped."""
+        self.counts["submitted"] += 1
+        if not self.queue.full():
+            try:
+                self.queue.put_nowait((timestamp, np.copy(frame), bool(alert)))
+                return True
+            except queue.Full:
+                pass
+        self.counts["dropped"] += 1
+        if self.frames is not None:
+            self.frames.inc(outcome="dropped")
+        return False
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            try:
+                self._handle(*item)
+            except Exception as e:
+                self.logger.error(f"Error recording frame: {str(e)}")
+        try:
+            self._flush_probe()
+        except Exception as e:
+            self.logger.error(f"Error recording frame: {str(e)}")
+        self._close_writer()
+
+    def _handle(self, timestamp, frame, alert):
+        if self.fps is None:
+            self.probe.append((timestamp, frame, alert))
+            if len(self.probe) >= self.FPS_PROBE_FRAMES:
+                self._flush_probe()
+            return
+        if self.mode == "continuous":
+            self._write_continuous(frame)
+        else:
+            self._write_clips(timestamp, frame, alert)
+
+    def _flush_probe(self):
+        """Fix the frame rate from the probed timestamps, then process the frames held for it."""
+        if not self.probe:
+            return
+        if self.fps is None:
+            intervals = np.diff([timestamp for timestamp, _, _ in self.probe])
+            intervals = intervals[intervals > 0]
+            self.fps = round(1.0 / float(np.median(intervals)), 2) if len(intervals) else 30.0
+            self.logger.info(f"Recording at {self.fps:g} fps")
+        probe, self.probe = self.probe, []
+        for item in probe:
+            self._handle(*item)
+
+    def _open_writer(self, path, frame):
+        height, width = frame.shape[:2]
+        writer = cv2.VideoWriter(path, self.fourcc, self.fps, (width, height))
+        if not writer.isOpened():
+            raise IOError(f"Cannot open video writer for {path}")
+        return writer
+
+    def _write(self, frame):
+        self.writer.write(frame)
+        self.counts["written"] += 1
+        if self.frames is not None:
+            self.frames.inc(outcome="written")
+
+    def _write_continuous(self, frame):
+        if self.writer is None:
+            self.writer = self._open_writer(self.path, frame)
+            self.logger.info(f"Recording annotated video to {self.path}")
+        self._write(frame)
+
+    def _write_clips(self, timestamp, frame, alert):
+        if self.history is None:
+            self.history = deque(maxlen=max(0, int(round(self.fps * self.pre_roll))))
+        if alert:
+            if self.writer is None:
+                # Start a clip with the frames leading up to the alert
+                clip_path = os.path.join(self.path, f"clip_{self.counts['clips']:04d}_{timestamp:.1f}s.mp4")
+                self.writer = self._open_writer(clip_path, frame)
+                self.counts["clips"] += 1
+                self.logger.info(f"Recording alert clip {clip_path}")
+                for _, encoded in self.history:
+                    self._write(cv2.imdecode(encoded, cv2.IMREAD_COLOR))
+                self.history.clear()
+            self.clip_until = timestamp + self.post_roll
+
+        if self.writer is not None:
+            self._write(frame)
+            if timestamp >= self.clip_until:
+                self._close_writer()
+            return
+
+        # Outside a clip, only keep the pre-roll window; the deque's maxlen also bounds it if timestamps stall
+        if not self.history.maxlen:
+            return
+        ok, encoded = cv2.imencode(".jpg", frame, self.jpeg_params)
+        if not ok:
+            raise IOError("Cannot encode pre-roll frame")
+        self.history.append((timestamp, encoded))
+        while self.history and timestamp - self.history[0][0] > self.pre_roll:
+            self.history.popleft()
+
+    def _close_writer(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+    def stop(self):
+        """Write what is still queued, close the video and report the counts."""
+        self.queue.put(_STOP)
+        if self.thread.is_alive():
+            self.thread.join()
+        self.logger.info(f"Output recorder stopped: {self.stats()}")
+
+    def stats(self):
+        return dict(self.counts)
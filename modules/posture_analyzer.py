@@ -1,51 +1,76 @@
-import cv2
-import mediapipe as mp
 import logging
 import time
-import math
+import numpy as np
+from modules.frame_context import as_frame_context
+from modules.detection_results import PostureResult
+from modules import landmark_geometry as geometry
+from modules.temporal import SustainedCondition
 
 class PostureAnalyzer:
-    def __init__(self):
+    def __init__(self, model_complexity=1):
         self.logger = logging.getLogger(__name__)
 
-        # Initialize MediaPipe Pose model for upper body posture detection
+        # Initialize MediaPipe Pose model for upper body posture detection. MediaPipe is imported here
+        # rather than at module level so importing the package stays fast.
+        import mediapipe as mp
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        self.model_complexity = model_complexity  # 0 = lite, 1 = full, 2 = heavy
+        self.pose = self._create_pose()
 
         # Thresholds
         self.HEAD_TILT_THRESHOLD = 4  # Angle threshold for head tilt
         self.SHOULDER_MISALIGNMENT_THRESHOLD = 3  # Angle threshold for shoulder misalignment
+        self.NECK_RATIO_THRESHOLD = 0.7  # Nose-to-shoulder-midpoint over half the shoulder width
         self.POSTURE_ALERT_THRESHOLD = 1.5  # Time in seconds for posture alert
-        self.posture_start_time = None  # Timer for posture alert
+        self.posture_timer = SustainedCondition()  # Frame-time timer for posture alert
 
         # Store last pose result for other modules to use
         self.last_pose_result = None
+        self.errors = 0  # Frames whose analysis raised, exported as a metric
+
+    def _create_pose(self):
+        return self.mp_pose.Pose(
+            model_complexity=self.model_complexity,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
 
-    def calculate_distance(self, point1, point2):
-        """Calculate the Euclidean distance between two points."""
-        return math.sqrt((point1[0] - point2[0])**2 + (point1[1] - point2[1])**2)
+    def set_model_complexity(self, model_complexity):
+        """Swap the Pose graph for one of another complexity; costs a graph rebuild, so change it rarely."""
+        if model_complexity == self.model_complexity:
+            return
+        self.pose.close()
+        self.model_complexity = model_complexity
+        self.pose = self._create_pose()
+        self.last_pose_result = None
 
-    def calculate_angle(self, point1, point2):
-        """Calculate the angle between two points relative to the horizontal axis."""
-        delta_y = point2[1] - point1[1]
-        delta_x = point2[0] - point1[0]
-        angle = math.atan2(delta_y, delta_x) * 180.0 / math.pi
-        return angle
+    def reset(self):
+        """Forget the posture timer and the tracked person, e.g. before analyzing another video."""
+        self.posture_timer.reset()
+        self.last_pose_result = None
+        # Pose tracks the person from the previous frame; a new graph starts again with detection
+        self.pose.close()
+        self.pose = self._create_pose()
 
     def get_last_pose_result(self):
         """Return the most recent pose detection result."""
         return self.last_pose_result
 
-    def detect_posture(self, frame):
-        """Detect upper body posture using MediaPipe Pose keypoints."""
-        person_visible = False
+    def detect_posture(self, frame, timestamp=None):
+        """Detect upper body posture using MediaPipe Pose keypoints. Accepts a frame or FrameContext.
+
+        Returns a PostureResult; nothing is drawn on the frame.
+        """
+        result = PostureResult()
 
         try:
-            # Convert the frame to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Use the shared RGB view instead of converting the frame again
+            context = as_frame_context(frame, timestamp)
+            rgb_frame = context.rgb
+            width, height = context.width, context.height
+            if timestamp is None:
+                timestamp = context.timestamp
+            now = time.time() if timestamp is None else timestamp
 
             alerts = []
 
@@ -54,113 +79,48 @@ class PostureAnalyzer:
             self.last_pose_result = result_pose  # Store for other modules
 
             if not result_pose.pose_landmarks:
-                return [], person_visible
-
-            person_visible = True
-            # Extract key points for the upper body (shoulders, head)
-            landmarks = result_pose.pose_landmarks.landmark
-            shoulder_left = landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER]
-            shoulder_right = landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER]
-            head = landmarks[self.mp_pose.PoseLandmark.NOSE]  # Using the nose as a proxy for the head
-            elbow_left = landmarks[self.mp_pose.PoseLandmark.LEFT_ELBOW]
-            elbow_right = landmarks[self.mp_pose.PoseLandmark.RIGHT_ELBOW]
-            wrist_left = landmarks[self.mp_pose.PoseLandmark.LEFT_WRIST]
-            wrist_right = landmarks[self.mp_pose.PoseLandmark.RIGHT_WRIST]
-
-            # Draw the key points on the frame
-            cv2.circle(frame, (int(shoulder_left.x * frame.shape[1]), int(shoulder_left.y * frame.shape[0])), 5, (0, 255, 0), -1)
-            cv2.circle(frame, (int(shoulder_right.x * frame.shape[1]), int(shoulder_right.y * frame.shape[0])), 5, (0, 255, 0), -1)
-            cv2.circle(frame, (int(head.x * frame.shape[1]), int(head.y * frame.shape[0])), 5, (0, 255, 0), -1)
-            cv2.circle(frame, (int(elbow_left.x * frame.shape[1]), int(elbow_left.y * frame.shape[0])), 5, (0, 255, 0), -1)
-            cv2.circle(frame, (int(elbow_right.x * frame.shape[1]), int(elbow_right.y * frame.shape[0])), 5, (0, 255, 0), -1)
-            cv2.circle(frame, (int(wrist_left.x * frame.shape[1]), int(wrist_left.y * frame.shape[0])), 5, (0, 255, 0), -1)
-            cv2.circle(frame, (int(wrist_right.x * frame.shape[1]), int(wrist_right.y * frame.shape[0])), 5, (0, 255, 0), -1)
-
-            # Connect the landmarks with lines for better visualization
-            # Connect the shoulders with a line
-            cv2.line(frame,
-                    (int(shoulder_left.x * frame.shape[1]), int(shoulder_left.y * frame.shape[0])),
-                    (int(shoulder_right.x * frame.shape[1]), int(shoulder_right.y * frame.shape[0])),
-                    (0, 255, 0), 2)
-            # Shoulder to Elbow
-            cv2.line(frame, (int(shoulder_left.x * frame.shape[1]), int(shoulder_left.y * frame.shape[0])),
-                     (int(elbow_left.x * frame.shape[1]), int(elbow_left.y * frame.shape[0])), (0, 255, 0), 2)
-            cv2.line(frame, (int(shoulder_right.x * frame.shape[1]), int(shoulder_right.y * frame.shape[0])),
-                     (int(elbow_right.x * frame.shape[1]), int(elbow_right.y * frame.shape[0])), (0, 255, 0), 2)
-            # Elbow to Wrist
-            cv2.line(frame, (int(elbow_left.x * frame.shape[1]), int(elbow_left.y * frame.shape[0])),
-                     (int(wrist_left.x * frame.shape[1]), int(wrist_left.y * frame.shape[0])), (0, 255, 0), 2)
-            cv2.line(frame, (int(elbow_right.x * frame.shape[1]), int(elbow_right.y * frame.shape[0])),
-                     (int(wrist_right.x * frame.shape[1]), int(wrist_right.y * frame.shape[0])), (0, 255, 0), 2)
-
-            # Calculate midpoint of shoulders
-            shoulder_mid_x = (shoulder_left.x + shoulder_right.x) / 2
-            shoulder_mid_y = (shoulder_left.y + shoulder_right.y) / 2
-            shoulder_mid = (int(shoulder_mid_x * frame.shape[1]), int(shoulder_mid_y * frame.shape[0]))
-
-            # Draw a line from the midpoint of the shoulders to the nose (head)
-            cv2.line(frame,
-                    shoulder_mid,
-                    (int(head.x * frame.shape[1]), int(head.y * frame.shape[0])),
-                    (100, 100, 200), 2)  # Yellow line from midpoint of shoulders to head
-
-            y_offset = 30  # Initial position for drawing text
-
-            # Calculate distance from the nose to the midpoint of the shoulders
-            nose_to_midpoint_distance = math.sqrt(
-                (head.x * frame.shape[1] - shoulder_mid[0])**2 + (head.y * frame.shape[0] - shoulder_mid[1])**2
-            )
-
-            # Calculate distance from the midpoint of the shoulders to either shoulder
-            midpoint_to_shoulder_distance = math.sqrt(
-                (shoulder_mid[0] - int(shoulder_left.x * frame.shape[1]))**2 + (shoulder_mid[1] - int(shoulder_left.y * frame.shape[0]))**2
-            )
-
-            # Calculate angle of shoulders relative to horizontal axis
-            shoulder_angle = abs(180 - abs(self.calculate_angle(
-                (shoulder_left.x * frame.shape[1], shoulder_left.y * frame.shape[0]),
-                (shoulder_right.x * frame.shape[1], shoulder_right.y * frame.shape[0])
-            )))
-
-            cv2.putText(frame, f"Shoulder alignment angle: {"%.2f"%shoulder_angle}", (10, y_offset),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-            y_offset += 30  # Move to next line for the next alert
+                return result
+
+            result.person_visible = True
+            # Convert the landmarks once; every measurement below is a vectorized kernel over them
+            points = geometry.landmark_array(result_pose.pose_landmarks.landmark)
+            result.points = points
+            result.visibility = geometry.visibility_array(result_pose.pose_landmarks.landmark)
+
+            # Pixel positions of the upper-body keypoints for rendering
+            pixels = geometry.pixel_positions(points, width, height)
+            result.landmarks = {name: tuple(pixels[index].tolist())
+                                for name, index in geometry.POSE_KEYPOINTS.items()}
+            shoulder_mid = (points[geometry.LEFT_SHOULDER, :2] + points[geometry.RIGHT_SHOULDER, :2]) / 2
+            result.landmarks["shoulder_mid"] = tuple(np.trunc(shoulder_mid * (width, height)).astype(int).tolist())
+
+            metrics = geometry.posture_metrics(points, width, height)
+            result.shoulder_angle = float(metrics["shoulder_angle"])
+            result.head_tilt_angle = float(metrics["head_tilt_angle"])
+            result.neck_ratio = float(metrics["neck_ratio"])
 
             # Threshold for misalignment (adjust as needed)
-            if abs(shoulder_angle) > self.SHOULDER_MISALIGNMENT_THRESHOLD:
+            if result.shoulder_angle > self.SHOULDER_MISALIGNMENT_THRESHOLD:
                 alerts.append("shoulder misalignment")
 
-            # Calculate the deviation in shoulder alignment
-            shoulder_mid = ((shoulder_left.x + shoulder_right.x) / 2, (shoulder_left.y + shoulder_right.y) / 2)
-            head_mid = (head.x, head.y)
-
-            head_tilt_angle = abs(90 - abs(self.calculate_angle(shoulder_mid, head_mid)))
-            cv2.putText(frame, f"Head tilt angle: {"%.2f"%head_tilt_angle}", (10, y_offset),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-
-            # Check if the distance from the nose to midpoint is less than 70% of the distance to the shoulder
-            if nose_to_midpoint_distance < 0.7 * midpoint_to_shoulder_distance:
+            # Nose closer to the shoulder midpoint than 70% of the distance to the shoulder
+            if result.neck_ratio < self.NECK_RATIO_THRESHOLD:
                 alerts.append("neck posture")
 
             # If the angle is above the threshold, alert for head tilt
-            if head_tilt_angle > self.HEAD_TILT_THRESHOLD:
+            if result.head_tilt_angle > self.HEAD_TILT_THRESHOLD:
                 alerts.append("head tilt")
 
-            # Handle posture timer logic
-            if alerts:
-                if self.posture_start_time is None:
-                    self.posture_start_time = time.time()  # Start timer when posture issue is detected
-                elif time.time() - self.posture_start_time >= self.POSTURE_ALERT_THRESHOLD:
-                    return alerts, person_visible  # Only return alerts if sustained for threshold time
-                else:
-                    return [], person_visible  # Issues detected but not sustained long enough
-            else:
-                self.posture_start_time = None  # Reset posture timer if no issue detected
-                return [], person_visible
+            # Only return alerts if sustained for threshold time; the timer resets when no issue is detected
+            sustained_for = self.posture_timer.update(bool(alerts), now)
+            if sustained_for is not None and sustained_for >= self.POSTURE_ALERT_THRESHOLD:
+                result.issues = alerts
+            return result
 
         except Exception as e:
+            self.errors += 1
             self.logger.error(f"Error in posture detection: {str(e)}")
-            return [], person_visible
+            return result
 
     def close(self):
         """Clean up resources."""
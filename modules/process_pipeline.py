@@ -0,0 +1,403 @@
+import cv2
+import logging
+import multiprocessing
+import queue
+import time
+from collections import OrderedDict
+import numpy as np
+from modules.alert_dispatcher import AlertDispatcher, SoundSink
+from modules.detection_results import PostureResult, HandsResult
+from modules.frame_context import FrameContext
+from modules.frame_pipeline import LatencyTracker
+from modules import landmark_geometry as geometry
+from modules.metrics import PipelineMetrics
+from modules.shared_frame_ring import SharedFrameRing
+from modules.temporal import CaptureClock
+from modules.visualizer import Visualizer
+
+DETECTORS = ("fatigue", "posture", "hands")
+NO_FATIGUE_RESULT = {"score": None, "alert": False, "perclos": 0.0, "smoothed_score": None}
+
+
+def _create_detector(kind, options):
+    # Imported here so each worker only loads the libraries its own detector needs
+    if kind == "fatigue":
+        from modules.fatigue_detector import FatigueDetector
+        detector = FatigueDetector(options["fatigue_model_path"], options["fatigue_backend"])
+        detector.warm_up()
+        return detector
+    if kind == "posture":
+        from modules.posture_analyzer import PostureAnalyzer
+        return PostureAnalyzer()
+    from modules.hand_detector import HandDetector
+    return HandDetector(use_pose_roi=options["hand_pose_roi"])
+
+
+def _run_detector(kind, detector, context, timestamp, roi):
+    """Run one detector on a frame and return its small, picklable result."""
+    if kind == "fatigue":
+        # Frames reach each worker in order, so the fatigue timers can stay in the worker
+        score = detector.predict_fatigue(context)
+        score = None if score is None else float(score)
+        alert = detector.check_fatigue_alert(score, timestamp)
+        statistics = detector.fatigue_statistics()
+        return {"score": score, "alert": alert, "perclos": statistics["perclos"],
+                "smoothed_score": statistics["smoothed_score"]}
+    if kind == "posture":
+        return detector.detect_posture(context, timestamp)
+    # The wrist region comes with the task, found from this frame's posture result in the main process
+    return detector.detect_hands(context, None, timestamp, roi=roi)
+
+
+def detector_worker(kind, ring_spec, tasks, results, options):
+    """Worker process: read frames from the shared ring by (frame id, slot) and send back results."""
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+    try:
+        ring = SharedFrameRing.attach(ring_spec)
+        detector = _create_detector(kind, options)
+    except Exception as e:
+        results.put(("error", kind, None, str(e)))
+        return
+    results.put(("ready", kind, None, None))
+
+    context = FrameContext(keep_frame=False)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            frame_id, slot, timestamp, roi = task
+            try:
+                rgb = ring.read(slot, frame_id)
+                if rgb is None:
+                    results.put(("stale", kind, frame_id, None))
+                    continue
+                started = time.perf_counter()
+                result = _run_detector(kind, detector, context.load_rgb(rgb, timestamp), timestamp, roi)
+                results.put(("result", kind, frame_id, (result, time.perf_counter() - started)))
+            except Exception as e:
+                # One bad frame must not stop the worker; the main process still finishes the frame
+                logger.error(f"Error in {kind} worker on frame {frame_id}: {str(e)}")
+                results.put(("error", kind, frame_id, str(e)))
+    finally:
+        # Views into the ring must be released before it can be detached
+        rgb = context.rgb = None
+        if hasattr(detector, "close"):
+            detector.close()
+        ring.close()
+
+
+class ProcessPipeline:
+    """Run FatigueDetector, PostureAnalyzer and HandDetector each in its own process.
+
+    Each frame is flipped and converted straight into a slot of a SharedFrameRing. The workers get only
+    (frame id, slot, timestamp, hand region) and read the slot zero-copy. They send back small result messages, which
+    are merged by frame id and finished (alerts, drawing, display) in frame order in this process.
+
+    With `hand_pose_roi` the hands task for a frame is sent once its posture result is in, together with the
+    region around the wrists, so MediaPipe Hands only searches that crop as in the other modes. Hands then
+    runs one stage behind posture, while the fatigue model runs alongside both.
+
+    A slot stays in use until all three results for its frame are in. If every slot is in use when a
+    camera frame arrives, that frame is dropped. A video file waits for a slot instead, so every frame is
+    analyzed.
+    """
+
+    def __init__(self, fatigue_model_path, alert_sound_path, fatigue_backend=None, video_source=0, slots=8,
+                 render=True, display=True, metrics=None, alert_sinks=None, alert_cooldown=5.0,
+                 output_recorder=None, recorder=None, hand_pose_roi=True):
+        self.logger = logging.getLogger(__name__)
+        self.video_source = video_source
+        self.slots = slots
+        self.render = render
+        self.display = render and display
+        self.alert_sound_path = alert_sound_path
+        self.hand_pose_roi = hand_pose_roi
+        self.options = {"fatigue_model_path": fatigue_model_path, "fatigue_backend": fatigue_backend,
+                        "hand_pose_roi": hand_pose_roi}
+
+        self.visualizer = Visualizer()
+        self.metrics = metrics or PipelineMetrics()
+        self.alert_dispatcher = AlertDispatcher(alert_sinks, cooldown=alert_cooldown, metrics=self.metrics).start()
+        self.output_recorder = output_recorder
+        self.recorder = recorder
+
+        # Spawned, not forked: TensorFlow and MediaPipe must start in a clean interpreter
+        self.mp_context = multiprocessing.get_context("spawn")
+        self.results = self.mp_context.Queue()
+        self.tasks = {kind: self.mp_context.Queue() for kind in DETECTORS}
+        self.workers = {}
+        self.ring = None
+        self.display_frames = None  # Flipped BGR frame per slot, drawn on once the frame is finished
+        self.unflipped_rgb = None
+
+        self.slot_frames = [None] * slots  # Frame id occupying each slot, None when free
+        self.next_slot = 0
+        self.next_frame_id = 0
+        self.in_flight = OrderedDict()  # frame id -> slot, timestamps and the results received so far
+        self.stop_requested = False
+        self.last_results = None
+
+        self.frames_captured = 0
+        self.frames_analyzed = 0
+        self.frames_dropped = 0
+        self.stale_reads = 0
+        self.worker_errors = 0
+        self.verdict_latency = LatencyTracker()  # Capture -> merged verdict
+        self.worker_latency = {kind: LatencyTracker() for kind in DETECTORS}
+
+    def run(self):
+        """Process the video source until it ends or 'q' is pressed."""
+        cap = cv2.VideoCapture(self.video_source)
+        if not cap.isOpened():
+            self.logger.error(f"Cannot open video source {self.video_source}")
+            return
+
+        from_file = isinstance(self.video_source, str)
+        clock = CaptureClock(cap, from_file)
+        try:
+            ret, frame = cap.read()
+            if not ret:
+                self.logger.error(f"No frames from video source {self.video_source}")
+                return
+            self._start(frame.shape)
+
+            while ret and not self.stop_requested:
+                self._submit(frame, clock.timestamp(cap), wait=from_file)
+                self._collect(block=False)
+                ret, frame = cap.read()
+            if not ret:
+                self.logger.info("End of video stream")
+
+            # Finish the frames still being analyzed
+            while self.in_flight and not self.stop_requested:
+                self._collect(block=True)
+        except Exception as e:
+            self.logger.error(f"Error in process pipeline: {str(e)}")
+        finally:
+            cap.release()
+            if self.display:
+                cv2.destroyAllWindows()
+            self.close()
+
+    def _start(self, shape):
+        """Create the frame ring, start one worker per detector and wait until they are all loaded."""
+        start_time = time.perf_counter()
+        self.ring = SharedFrameRing(self.slots, shape)
+        if self.render:
+            self.display_frames = np.empty((self.slots,) + tuple(shape), dtype=np.uint8)
+        self.unflipped_rgb = np.empty(shape, dtype=np.uint8)
+
+        for kind in DETECTORS:
+            worker = self.mp_context.Process(target=detector_worker, name=f"{kind}-worker", daemon=True,
+                                             args=(kind, self.ring.spec(), self.tasks[kind], self.results, self.options))
+            worker.start()
+            self.workers[kind] = worker
+
+        # The alert sound loads here while the workers load their models
+        from modules.alert_system import AlertSystem
+        self.alert_dispatcher.add_sink(SoundSink(AlertSystem(self.alert_sound_path)))
+
+        waiting = set(DETECTORS)
+        while waiting:
+            try:
+                status, kind, _, error = self.results.get(timeout=1.0)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if status == "error":
+                raise RuntimeError(f"The {kind} worker failed to start: {error}")
+            waiting.discard(kind)
+        self.logger.info(f"Detector workers ready after {time.perf_counter() - start_time:.2f}s")
+
+    def _submit(self, frame, timestamp, wait):
+        """Publish a frame into the next slot and hand it to every worker, or drop it if no slot is free."""
+        self.frames_captured += 1
+        if frame.shape != self.ring.shape:
+            self.logger.error(f"Frame shape changed from {self.ring.shape} to {frame.shape}, dropping frame")
+            self._drop()
+            return
+
+        slot = self.next_slot
+        while self.slot_frames[slot] is not None:
+            if not wait or self.stop_requested:
+                self._drop()
+                self._check_workers()
+                return
+            self._collect(block=True)
+
+        frame_id = self.next_frame_id
+        self.next_frame_id += 1
+        # Flip and convert straight into shared memory; the flipped BGR copy is only kept for drawing
+        target = self.ring.slot(slot)
+        if self.render:
+            cv2.flip(frame, 1, dst=self.display_frames[slot])
+            cv2.cvtColor(self.display_frames[slot], cv2.COLOR_BGR2RGB, dst=target)
+        else:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.unflipped_rgb)
+            cv2.flip(self.unflipped_rgb, 1, dst=target)
+        self.ring.publish(slot, frame_id)
+
+        self.slot_frames[slot] = frame_id
+        self.in_flight[frame_id] = {"slot": slot, "timestamp": timestamp, "captured_at": time.perf_counter(),
+                                    "results": {}}
+        for kind in DETECTORS:
+            if kind != "hands" or not self.hand_pose_roi:
+                self.tasks[kind].put((frame_id, slot, timestamp, None))
+        self.next_slot = (slot + 1) % self.slots
+        self.metrics.queue_depth.set(len(self.in_flight), queue="in_flight")
+
+    def _drop(self):
+        self.frames_dropped += 1
+        self.metrics.frames_dropped.inc()
+
+    def _collect(self, block):
+        """Merge every waiting result message, then finish the frames whose results are complete."""
+        try:
+            message = self.results.get(timeout=0.1) if block else self.results.get_nowait()
+        except queue.Empty:
+            # Camera runs never block, so a dead worker must also be noticed here or every slot stays busy
+            self._check_workers()
+            return
+
+        while message is not None:
+            status, kind, frame_id, payload = message
+            entry = self.in_flight.get(frame_id)
+            if entry is not None:
+                if status == "result":
+                    result, seconds = payload
+                    entry["results"][kind] = result
+                    self.worker_latency[kind].record(seconds)
+                elif status == "stale":
+                    entry["results"][kind] = None
+                    self.stale_reads += 1
+                elif status == "error":
+                    entry["results"][kind] = None
+                    self.worker_errors += 1
+                if kind == "posture" and self.hand_pose_roi:
+                    self._submit_hands(frame_id, entry)
+            try:
+                message = self.results.get_nowait()
+            except queue.Empty:
+                message = None
+
+        # Results can arrive out of order across workers; frames are finished in capture order
+        while self.in_flight:
+            frame_id, entry = next(iter(self.in_flight.items()))
+            if len(entry["results"]) < len(DETECTORS):
+                break
+            del self.in_flight[frame_id]
+            self._finish(entry)
+
+    def _submit_hands(self, frame_id, entry):
+        """Send a frame to the hands worker with the wrist region from its posture result."""
+        posture_result = entry["results"].get("posture")
+        roi = None
+        if posture_result is not None:
+            height, width = self.ring.shape[:2]
+            roi = geometry.hand_region(posture_result.points, posture_result.visibility, width, height)
+        self.tasks["hands"].put((frame_id, entry["slot"], entry["timestamp"], roi))
+
+    def _check_workers(self):
+        for kind, worker in self.workers.items():
+            if not worker.is_alive():
+                raise RuntimeError(f"The {kind} worker exited unexpectedly (exit code {worker.exitcode})")
+
+    def _finish(self, entry):
+        """Combine one frame's detector results into a verdict, raise its alerts and draw it."""
+        try:
+            results, timestamp = entry["results"], entry["timestamp"]
+            fatigue = results.get("fatigue") or NO_FATIGUE_RESULT
+            posture_result = results.get("posture") or PostureResult()
+            hands_info = results.get("hands") or HandsResult()
+            posture_issues, fatigue_alert = posture_result.issues, fatigue["alert"]
+
+            active_alerts = [issue.replace(" ", "_") for issue in posture_issues]
+            if fatigue_alert:
+                active_alerts.append("fatigue")
+            if hands_info.hands_off_wheel_alert:
+                active_alerts.append("hands_off_wheel")
+            alert = bool(active_alerts)
+            for alert_type in active_alerts:
+                if alert_type == "fatigue" and fatigue["score"] is not None:
+                    self.alert_dispatcher.submit(alert_type, timestamp, fatigue_score=round(fatigue["score"], 4))
+                else:
+                    self.alert_dispatcher.submit(alert_type, timestamp)
+
+            self.last_results = {
+                "initializing": False,
+                "fatigue_score": fatigue["score"],
+                "perclos": fatigue["perclos"],
+                "smoothed_fatigue_score": fatigue["smoothed_score"],
+                "fatigue_alert": fatigue_alert,
+                "posture_issues": posture_issues,
+                "person_visible": posture_result.person_visible,
+                "posture": posture_result,
+                "hands_info": hands_info,
+                "alert": alert
+            }
+            height, width = self.ring.shape[:2]
+            if self.recorder is not None:
+                # A stale read or worker error leaves a detector's default result in the verdict; it was not evaluated
+                evaluated = [kind for kind in DETECTORS if results.get(kind) is not None]
+                self.recorder.record_results(timestamp, self.last_results, width, height, evaluated)
+
+            slot = entry["slot"]
+            if self.render:
+                frame = self.display_frames[slot]
+                frame = self.visualizer.draw_pose(frame, posture_result)
+                frame = self.visualizer.draw_hands(frame, hands_info)
+                frame = self.visualizer.draw_face_status(frame, fatigue_alert, posture_issues)
+                frame = self.visualizer.draw_posture_status(frame, posture_issues)
+                frame = self.visualizer.draw_hands_status(frame, hands_info, posture_issues)
+                frame = self.visualizer.draw_summary(frame, fatigue_alert, posture_issues,
+                                                     posture_result.person_visible, hands_info)
+                if self.output_recorder is not None:
+                    self.output_recorder.submit(frame, timestamp, alert)
+                if self.display:
+                    cv2.imshow('Driver Monitoring System', frame)
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        self.logger.info("User requested exit (q key)")
+                        self.stop_requested = True
+
+            latency = time.perf_counter() - entry["captured_at"]
+            self.verdict_latency.record(latency)
+            self.metrics.frame_done(latency, active_alerts)
+            self.frames_analyzed += 1
+        except Exception as e:
+            self.metrics.frames_errored.inc()
+            self.logger.error(f"Error finishing frame: {str(e)}")
+        finally:
+            # The slot (and its display frame) can be reused only now
+            self.slot_frames[entry["slot"]] = None
+
+    def close(self):
+        """Stop the workers, free the shared memory and flush the alert, video and telemetry outputs."""
+        for kind, worker in self.workers.items():
+            self.tasks[kind].put(None)
+        for kind, worker in self.workers.items():
+            worker.join(timeout=10)
+            if worker.is_alive():
+                self.logger.warning(f"The {kind} worker did not stop, terminating it")
+                worker.terminate()
+        self.alert_dispatcher.stop()
+        if self.output_recorder is not None:
+            self.output_recorder.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.ring is not None:
+            self.ring.close()
+        self.logger.info(f"Process pipeline stats: {self.stats()}")
+
+    def stats(self):
+        """Return frame and drop counts, capture-to-verdict latency and per-worker detector latency."""
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_analyzed": self.frames_analyzed,
+            "frames_dropped": self.frames_dropped,
+            "stale_reads": self.stale_reads,
+            "worker_errors": self.worker_errors,
+            "capture_to_verdict": self.verdict_latency.summary(),
+            "worker_latency": {kind: tracker.summary() for kind, tracker in self.worker_latency.items()}
+        }
@@ -0,0 +1,100 @@
+import logging
+from modules.temporal import ExponentialMovingAverage
+
+# Quality levels from best to cheapest, in the order the governor gives quality up. Each level keeps the
+# savings of the one before it. Skipping frames costs least accuracy, since alerts need seconds of
+# evidence. Lite MediaPipe graphs come next, then analysing a downscaled image. max_num_hands stays at 2
+# throughout: both hands are needed to tell whether both are on the wheel.
+QUALITY_LEVELS = [
+    {"name": "full", "analysis_scale": 1.0, "pose_complexity": 1, "hands_complexity": 1, "cadence": {}},
+    {"name": "reduced cadence", "analysis_scale": 1.0, "pose_complexity": 1, "hands_complexity": 1,
+     "cadence": {"fatigue": {"every": 2}, "hands": {"every": 2}}},
+    {"name": "lite models", "analysis_scale": 1.0, "pose_complexity": 0, "hands_complexity": 0,
+     "cadence": {"fatigue": {"every": 2}, "hands": {"every": 2}}},
+    {"name": "downscaled", "analysis_scale": 0.75, "pose_complexity": 0, "hands_complexity": 0,
+     "cadence": {"fatigue": {"every": 2}, "hands": {"every": 2}}},
+    {"name": "minimum", "analysis_scale": 0.5, "pose_complexity": 0, "hands_complexity": 0,
+     "cadence": {"fatigue": {"every": 3}, "hands": {"every": 3}, "posture": {"every": 2}}},
+]
+
+
+class QualityGovernor:
+    """Step quality down or up to hold a target frame rate, judged by the measured per-frame latency.
+
+    The latency is smoothed over `time_constant` seconds. Quality drops a level when the frame rate the
+    pipeline can sustain falls below `down_margin` x target, and rises a level when it exceeds
+    `up_margin` x target. After each change the governor waits `hold_seconds`, plus a few frames for the
+    new settings to settle, before deciding again. If quality has to drop right after rising, the wait
+    before the next rise doubles, so the governor does not oscillate between two levels.
+    """
+
+    def __init__(self, target_fps, levels=None, time_constant=2.0, down_margin=0.9, up_margin=1.3,
+                 hold_seconds=3.0, max_hold_seconds=120.0, settle_frames=10):
+        self.logger = logging.getLogger(__name__)
+        self.target_fps = target_fps
+        self.levels = levels or QUALITY_LEVELS
+        self.down_margin = down_margin
+        self.up_margin = up_margin
+        self.hold_seconds = hold_seconds
+        self.max_hold_seconds = max_hold_seconds
+        self.settle_frames = settle_frames
+
+        self.latency = ExponentialMovingAverage(time_constant)
+        self.level = 0
+        self.last_change = None  # Frame time of the last level change
+        self.last_step = 0  # +1 for the last step down in quality, -1 for a step up
+        self.up_hold = hold_seconds
+        self.settling = settle_frames  # Frames to ignore after a change, e.g. a MediaPipe graph rebuild
+        self.capacity = None  # Smoothed frames per second the pipeline can sustain
+        self.frame_interval = ExponentialMovingAverage(time_constant)  # Seconds between stream frames
+        self.last_timestamp = None
+
+    @property
+    def stream_fps(self):
+        """Frame rate of the incoming stream, measured from the frame timestamps (the target until known)."""
+        interval = self.frame_interval.value
+        return 1.0 / interval if interval else self.target_fps
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def observe(self, latency, timestamp):
+        """Feed one frame's processing latency in seconds. Returns the new level's settings on a change."""
+        if self.last_timestamp is not None and timestamp > self.last_timestamp:
+            self.frame_interval.update(timestamp - self.last_timestamp, timestamp)
+        self.last_timestamp = timestamp
+        if self.last_change is None:
+            self.last_change = timestamp
+        if self.settling > 0:
+            self.settling -= 1
+            return None
+
+        average = self.latency.update(latency, timestamp)
+        self.capacity = 1.0 / average if average > 0 else float("inf")
+        held = timestamp - self.last_change
+
+        if self.capacity < self.target_fps * self.down_margin and self.level < len(self.levels) - 1:
+            if held < self.hold_seconds:
+                return None
+            # Dropping soon after a rise means the better level cannot hold the target; wait longer next time
+            if self.last_step < 0 and held < self.max_hold_seconds:
+                self.up_hold = min(self.up_hold * 2, self.max_hold_seconds)
+            else:
+                self.up_hold = self.hold_seconds
+            return self._change(1, timestamp)
+        if self.capacity > self.target_fps * self.up_margin and self.level > 0 and held >= self.up_hold:
+            return self._change(-1, timestamp)
+        return None
+
+    def _change(self, step, timestamp):
+        previous = self.level
+        self.level += step
+        self.logger.info(
+            f"Quality level {previous} -> {self.level} ({self.settings['name']}): "
+            f"{self.capacity:.1f} fps sustainable for a {self.target_fps:g} fps target")
+        self.last_change = timestamp
+        self.last_step = step
+        self.latency.reset()
+        self.settling = self.settle_frames
+        return self.settings
@@ -0,0 +1,219 @@
+import cv2
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import queue
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".m4v", ".webm")
+
+
+@dataclass
+class Shard:
+    """A frame range of one video, analyzed by a single worker process."""
+
+    video_path: str
+    index: int  # Position of the shard within its video
+    start_frame: int
+    end_frame: int  # Exclusive; None for the last shard, which reads to the end of the video
+    warmup_frames: int  # Frames decoded before start_frame to warm the alert timers
+    frames: int  # Frames expected from the container's frame count, for progress and plan checks
+    part_path: str = None
+
+
+def find_videos(inputs):
+    """Expand files and directories into a sorted list of video files."""
+    videos = []
+    for path in inputs:
+        if os.path.isdir(path):
+            videos.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                 if name.lower().endswith(VIDEO_EXTENSIONS)))
+        else:
+            videos.append(path)
+    return videos
+
+
+def plan_shards(video_path, shard_seconds=300.0, overlap_seconds=10.0):
+    """Split a video into consecutive frame ranges of about `shard_seconds` each.
+
+    The plan relies on CAP_PROP_FRAME_COUNT, which is only an estimate for many variable frame rate and
+    variable bitrate files, so the last shard reads to the end of the video instead of stopping at it.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video file {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total = max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0)
+    cap.release()
+
+    shard_frames = max(1, int(round(shard_seconds * fps)))
+    warmup = int(round(overlap_seconds * fps))
+    starts = list(range(0, total, shard_frames)) or [0]
+    shards = []
+    for index, start in enumerate(starts):
+        end = starts[index + 1] if index + 1 < len(starts) else None
+        shards.append(Shard(video_path, index, start, end, min(warmup, start), (end or total) - start))
+    return shards
+
+
+def check_shard(shard, frames_read, logger):
+    """Log when a shard read a different number of frames than planned from the frame count."""
+    if frames_read == shard.frames:
+        return
+    if shard.end_frame is None:
+        # The last shard reads to the end of the file, so a wrong frame count costs no frames
+        logger.warning(f"{os.path.basename(shard.video_path)} shard {shard.index} read {frames_read} frames, "
+                       f"{shard.frames} planned; the frame count of the file is inaccurate")
+    else:
+        logger.warning(f"{os.path.basename(shard.video_path)} shard {shard.index} read {frames_read} of its "
+                       f"{shard.frames} frames (frames {shard.start_frame}-{shard.end_frame}); the video ended "
+                       f"early or seeking is inaccurate, so frames near this shard's boundaries may be missing")
+
+
+def merge_parts(part_paths, output_path, output_format):
+    """Concatenate shard timelines in order; CSV parts keep only the first header."""
+    with open(output_path, "w", newline="") as output:
+        for i, part_path in enumerate(part_paths):
+            with open(part_path, newline="") as part:
+                if output_format == "csv" and i > 0:
+                    part.readline()
+                shutil.copyfileobj(part, output)
+
+
+_worker_analyzer = None
+_worker_progress = None
+
+
+def _init_worker(fatigue_model_path, batch_size, fatigue_backend, face_roi, threads, progress):
+    """Load one set of detectors per worker process, limited to its share of the cores."""
+    global _worker_analyzer, _worker_progress
+    _worker_progress = progress
+    for variable in ("TF_NUM_INTRAOP_THREADS", "OMP_NUM_THREADS"):
+        os.environ.setdefault(variable, str(threads))
+    os.environ.setdefault("TF_NUM_INTEROP_THREADS", "1")
+    cv2.setNumThreads(threads)
+
+    from modules.batch_analyzer import BatchAnalyzer
+    logging.basicConfig(level=logging.WARNING)
+    _worker_analyzer = BatchAnalyzer(fatigue_model_path, batch_size=batch_size, fatigue_backend=fatigue_backend,
+                                     face_roi=face_roi)
+
+
+def _analyze_shard(shard, output_format):
+    def report(frames):
+        _worker_progress.put((shard.part_path, frames))
+
+    return _worker_analyzer.analyze(shard.video_path, shard.part_path, output_format, start_frame=shard.start_frame,
+                                    end_frame=shard.end_frame, warmup_frames=shard.warmup_frames, progress=report)
+
+
+class ShardRunner:
+    """Analyze long recordings on every core by splitting them into frame-range shards.
+
+    Each worker process owns its own detectors. A shard is decoded from `overlap_seconds` before its start
+    so the sustained-alert timers are warm, and only its own frames are written to a part file. The parts
+    of each video are merged in frame order into the same timeline `main.py analyze` produces. Workers report
+    frame progress after every batch, which is logged every `progress_interval` seconds.
+    """
+
+    def __init__(self, fatigue_model_path, workers=None, shard_seconds=300.0, overlap_seconds=10.0, batch_size=32,
+                 fatigue_backend=None, face_roi=False, progress_interval=10.0):
+        self.logger = logging.getLogger(__name__)
+        self.fatigue_model_path = fatigue_model_path
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_seconds = shard_seconds
+        self.overlap_seconds = overlap_seconds
+        self.batch_size = batch_size
+        self.fatigue_backend = fatigue_backend
+        self.face_roi = face_roi
+        self.progress_interval = progress_interval
+
+    def run(self, videos, output_dir=None, output_format="jsonl"):
+        """Analyze every video and return {video_path: timeline_path} plus a throughput summary."""
+        from modules.batch_analyzer import default_output_path
+
+        shards, outputs = [], {}
+        for video_path in videos:
+            if output_dir:
+                name = os.path.splitext(os.path.basename(video_path))[0]
+                outputs[video_path] = os.path.join(output_dir, f"{name}_timeline.{output_format}")
+            else:
+                outputs[video_path] = default_output_path(video_path, output_format)
+            shards.extend(plan_shards(video_path, self.shard_seconds, self.overlap_seconds))
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        total_frames = sum(shard.frames for shard in shards)
+        self.logger.info(f"Analyzing {len(videos)} video(s), {total_frames} frames in {len(shards)} shards "
+                         f"on {self.workers} workers")
+
+        part_dir = tempfile.mkdtemp(prefix="fatigue-sense-shards-")
+        for i, shard in enumerate(shards):
+            shard.part_path = os.path.join(part_dir, f"part_{i:05d}.{output_format}")
+
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        # Spawned workers: TensorFlow and MediaPipe do not survive a fork of a process that started threads
+        context = multiprocessing.get_context("spawn")
+        progress = context.Queue()
+        init_args = (self.fatigue_model_path, self.batch_size, self.fatigue_backend, self.face_roi, threads, progress)
+        shard_frames = {}  # Part path -> frames analyzed so far
+        start_time = last_report = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                     initargs=init_args) as pool:
+                futures = {pool.submit(_analyze_shard, shard, output_format): shard for shard in shards}
+                pending, completed = set(futures), 0
+                while pending:
+                    done, pending = wait(pending, timeout=min(self.progress_interval, 1.0),
+                                         return_when=FIRST_COMPLETED)
+                    self._drain_progress(progress, shard_frames)
+                    for future in done:
+                        shard = futures[future]
+                        frames_read = future.result()["frames"]
+                        check_shard(shard, frames_read, self.logger)
+                        shard_frames[shard.part_path] = frames_read
+                        completed += 1
+                        self._report_progress(f"Shard {completed}/{len(shards)} done "
+                                              f"({os.path.basename(shard.video_path)} shard {shard.index})",
+                                              shard_frames, total_frames, start_time)
+                    if pending and time.perf_counter() - last_report >= self.progress_interval:
+                        self._report_progress(f"{completed}/{len(shards)} shards done", shard_frames,
+                                              total_frames, start_time)
+                        last_report = time.perf_counter()
+
+            for video_path, output_path in outputs.items():
+                parts = [shard.part_path for shard in shards if shard.video_path == video_path]
+                merge_parts(parts, output_path, output_format)
+        finally:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+        elapsed = time.perf_counter() - start_time
+        total_frames = sum(shard_frames.values())
+        summary = {
+            "videos": len(videos),
+            "shards": len(shards),
+            "frames": total_frames,
+            "elapsed_seconds": round(elapsed, 3),
+            "fps": round(total_frames / elapsed, 2) if elapsed > 0 else 0.0
+        }
+        return outputs, summary
+
+    def _drain_progress(self, progress, shard_frames):
+        """Take every (part path, frames) report the workers have sent so far."""
+        while True:
+            try:
+                part_path, frames = progress.get_nowait()
+            except queue.Empty:
+                return
+            shard_frames[part_path] = max(frames, shard_frames.get(part_path, 0))
+
+    def _report_progress(self, status, shard_frames, total_frames, start_time):
+        done_frames = sum(shard_frames.values())
+        elapsed = time.perf_counter() - start_time
+        fps = done_frames / elapsed if elapsed > 0 else 0.0
+        eta = max(total_frames - done_frames, 0) / fps if fps > 0 else 0.0
+        self.logger.info(f"{status}: {done_frames}/{total_frames} frames, {fps:.1f} fps, ETA {eta:.0f}s")
@@ -0,0 +1,74 @@
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+
+
+class SharedFrameRing:
+    """A fixed number of equally sized frame slots in one multiprocessing.shared_memory block.
+
+    The owning process writes each frame into a slot once; other processes attach by name and read the slot
+    as a numpy view, so frames are never pickled or copied between processes. Every slot is stamped with
+    the id of the frame it holds, so a reader can tell if a slot was reused before it got to it. Deciding
+    when a slot may be reused is up to the owner.
+    """
+
+    def __init__(self, slots, shape, dtype=np.uint8, name=None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = name is None
+
+        header_size = slots * np.dtype(np.int64).itemsize
+        frame_size = int(np.prod(self.shape)) * self.dtype.itemsize
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_size + slots * frame_size)
+        else:
+            self.shm = _attach_untracked(name)
+        self.frame_ids = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self.shm.buf, offset=header_size)
+        if self.owner:
+            self.frame_ids[:] = -1
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def spec(self):
+        """Everything another process needs to attach, small enough to pass to a worker."""
+        return {"name": self.name, "slots": self.slots, "shape": self.shape, "dtype": self.dtype.str}
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec["slots"], spec["shape"], spec["dtype"], name=spec["name"])
+
+    def slot(self, index):
+        """Writable view of a slot, e.g. as the `dst` of an OpenCV call so the frame is written in place."""
+        return self.frames[index]
+
+    def publish(self, index, frame_id):
+        """Stamp a slot once its frame has been written."""
+        self.frame_ids[index] = frame_id
+
+    def read(self, index, frame_id):
+        """Zero-copy view of a slot, or None if it no longer holds `frame_id`."""
+        if self.frame_ids[index] != frame_id:
+            return None
+        return self.frames[index]
+
+    def close(self):
+        """Detach; the owner also frees the block. Views returned by `read` must not be used afterwards."""
+        # The numpy views export the buffer and must go before it can be closed
+        del self.frame_ids, self.frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _attach_untracked(name):
+    """Attach to an existing block without the resource tracker claiming it; only the owner frees it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        # Older Pythons register every attached block and would unlink it when this process exits
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
@@ -0,0 +1,245 @@
+import datetime
+import json
+import logging
+import os
+import numpy as np
+
+# Alert bitmask stored with every record
+ALERT_FATIGUE = 1
+ALERT_SHOULDER_MISALIGNMENT = 2
+ALERT_NECK_POSTURE = 4
+ALERT_HEAD_TILT = 8
+ALERT_HANDS_OFF_WHEEL = 16
+
+ALERT_BITS = {
+    "fatigue": ALERT_FATIGUE,
+    "shoulder misalignment": ALERT_SHOULDER_MISALIGNMENT,
+    "neck posture": ALERT_NECK_POSTURE,
+    "head tilt": ALERT_HEAD_TILT,
+    "hands off wheel": ALERT_HANDS_OFF_WHEEL,
+}
+
+# Frame flags: whether a person was seen and which detectors actually ran (the rest carried a result forward)
+FLAG_PERSON_VISIBLE = 1
+FLAG_FATIGUE_EVALUATED = 2
+FLAG_POSTURE_EVALUATED = 4
+FLAG_HANDS_EVALUATED = 8
+
+POSE_LANDMARK_COUNT = 33
+HAND_LANDMARK_COUNT = 21
+MAX_HANDS = 2
+
+# One fixed-width record per processed frame (464 bytes). Missing values are NaN.
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),  # Seconds; epoch time for live sources, video time for recordings
+    ("fatigue_score", "<f4"),
+    ("alerts", "u1"),  # ALERT_* bits
+    ("flags", "u1"),  # FLAG_* bits
+    ("pose", "<f2", (POSE_LANDMARK_COUNT, 3)),  # Normalized pose landmarks
+    ("hands", "<f2", (MAX_HANDS, HAND_LANDMARK_COUNT, 3)),  # Normalized hand landmarks in detection order
+])
+
+INDEX_FILE = "index.json"
+STORE_VERSION = 1
+
+
+def alert_mask(names):
+    """Turn alert names ("head tilt", "hands_off_wheel", ...) into a bitmask."""
+    mask = 0
+    for name in names:
+        mask |= ALERT_BITS[name.replace("_", " ")]
+    return mask
+
+
+def alert_names(mask):
+    """Turn a bitmask back into alert names."""
+    return [name for name, bit in ALERT_BITS.items() if mask & bit]
+
+
+def to_seconds(value):
+    """Accept epoch seconds or a datetime and return epoch seconds."""
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def _write_json_atomic(path, data):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, path)
+
+
+class TelemetryRecorder:
+    """Append per-frame verdicts to chunked, memory-mapped .npy files with a sparse time index.
+
+    Each chunk holds up to `chunk_records` records. The index keeps each chunk's record count, first and last
+    timestamp and the union of its alert bits, so queries only open the chunks that can match. The index is
+    replaced atomically when a chunk fills, every `flush_every` records and on close, so a crash loses at
+    most the records written since the last flush.
+    """
+
+    def __init__(self, path, chunk_records=18000, flush_every=300):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.chunk_records = chunk_records  # 18000 records is ten minutes at 30 fps
+        self.flush_every = flush_every
+        os.makedirs(path, exist_ok=True)
+
+        index_path = os.path.join(path, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                self.index = json.load(f)
+            if self.index.get("version") != STORE_VERSION:
+                raise ValueError(f"Unsupported telemetry store version in {path}")
+        else:
+            self.index = {"version": STORE_VERSION, "record_dtype": RECORD_DTYPE.descr, "width": None,
+                          "height": None, "chunk_records": chunk_records, "chunks": []}
+
+        self.chunk = None  # Memory map of the chunk being written
+        self.entry = None  # Its index entry
+        self.unflushed = 0
+        self.records = 0
+
+    def _open_chunk(self):
+        name = f"chunk_{len(self.index['chunks']):06d}.npy"
+        self.chunk = np.lib.format.open_memmap(os.path.join(self.path, name), mode="w+", dtype=RECORD_DTYPE,
+                                               shape=(self.chunk_records,))
+        self.entry = {"file": name, "count": 0, "first_timestamp": None, "last_timestamp": None, "alert_mask": 0}
+        self.index["chunks"].append(self.entry)
+
+    def append(self, timestamp, fatigue_score=None, alerts=0, flags=0, pose=None, hands=None):
+        """Append one record. `pose` is (33, 3) and `hands` is (H, 21, 3); both may be None."""
+        if self.chunk is None or self.entry["count"] >= self.chunk_records:
+            self._seal_chunk()
+            self._open_chunk()
+
+        i = self.entry["count"]
+        chunk = self.chunk
+        chunk["timestamp"][i] = timestamp
+        chunk["fatigue_score"][i] = np.nan if fatigue_score is None else fatigue_score
+        chunk["alerts"][i] = alerts
+        chunk["flags"][i] = flags
+        chunk["pose"][i] = np.nan if pose is None else pose
+        chunk["hands"][i] = np.nan
+        if hands is not None:
+            count = min(len(hands), MAX_HANDS)
+            chunk["hands"][i, :count] = hands[:count]
+
+        entry = self.entry
+        entry["count"] = i + 1
+        if entry["first_timestamp"] is None:
+            entry["first_timestamp"] = float(timestamp)
+        entry["last_timestamp"] = float(timestamp)
+        entry["alert_mask"] |= int(alerts)
+        self.records += 1
+
+        self.unflushed += 1
+        if self.unflushed >= self.flush_every:
+            self.flush()
+
+    def set_frame_size(self, width, height):
+        """Record the frame size the landmarks are normalized to; the first size recorded is kept."""
+        if self.index["width"] is None:
+            self.index["width"], self.index["height"] = int(width), int(height)
+
+    def record_results(self, timestamp, results, width, height, evaluated=()):
+        """Append DriverMonitoringSystem.last_results; `evaluated` names the detectors that ran on this frame."""
+        try:
+            self.set_frame_size(width, height)
+
+            posture, hands_info = results["posture"], results["hands_info"]
+            alerts = alert_mask(results["posture_issues"])
+            if results["fatigue_alert"]:
+                alerts |= ALERT_FATIGUE
+            if hands_info is not None and hands_info.hands_off_wheel_alert:
+                alerts |= ALERT_HANDS_OFF_WHEEL
+
+            flags = FLAG_PERSON_VISIBLE if results["person_visible"] else 0
+            if "fatigue" in evaluated:
+                flags |= FLAG_FATIGUE_EVALUATED
+            if "posture" in evaluated:
+                flags |= FLAG_POSTURE_EVALUATED
+            if "hands" in evaluated:
+                flags |= FLAG_HANDS_EVALUATED
+
+            self.append(timestamp, results["fatigue_score"], alerts, flags, posture.points,
+                        hands_info.points if hands_info is not None else None)
+        except Exception as e:
+            self.logger.error(f"Error recording telemetry: {str(e)}")
+
+    def flush(self):
+        """Flush the current chunk to disk and atomically rewrite the index."""
+        if self.chunk is not None:
+            self.chunk.flush()
+        _write_json_atomic(os.path.join(self.path, INDEX_FILE), self.index)
+        self.unflushed = 0
+
+    def _seal_chunk(self):
+        if self.chunk is not None:
+            self.flush()
+            del self.chunk
+            self.chunk = None
+
+    def close(self):
+        self._seal_chunk()
+        _write_json_atomic(os.path.join(self.path, INDEX_FILE), self.index)
+        self.logger.info(f"Telemetry: {self.records} records written to {self.path}")
+
+
+class TelemetryStore:
+    """Read-only view of a telemetry store. Chunks are memory-mapped, never loaded whole."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            self.index = json.load(f)
+        if self.index.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported telemetry store version in {path}")
+        self.width = self.index["width"]
+        self.height = self.index["height"]
+
+    def __len__(self):
+        return sum(entry["count"] for entry in self.index["chunks"])
+
+    def time_range(self):
+        """Return the (first, last) timestamp in the store, or None if it is empty."""
+        chunks = [entry for entry in self.index["chunks"] if entry["count"]]
+        if not chunks:
+            return None
+        return chunks[0]["first_timestamp"], chunks[-1]["last_timestamp"]
+
+    def matching_chunks(self, start=None, end=None, alerts=0):
+        """Index entries of the chunks that overlap [start, end] and contain any of the `alerts` bits."""
+        start = -np.inf if start is None else to_seconds(start)
+        end = np.inf if end is None else to_seconds(end)
+        return [entry for entry in self.index["chunks"]
+                if entry["count"] and entry["last_timestamp"] >= start and entry["first_timestamp"] <= end
+                and (not alerts or entry["alert_mask"] & alerts)]
+
+    def iter_chunks(self, start=None, end=None, alerts=0):
+        """Yield memory-mapped record slices of the matching chunks, trimmed to [start, end].
+
+        Timestamps are non-decreasing within a store, so each chunk is trimmed with a binary search that
+        touches only a few pages.
+        """
+        start_seconds = None if start is None else to_seconds(start)
+        end_seconds = None if end is None else to_seconds(end)
+        for entry in self.matching_chunks(start, end, alerts):
+            records = np.load(os.path.join(self.path, entry["file"]), mmap_mode="r")[:entry["count"]]
+            timestamps = records["timestamp"]
+            lo = 0 if start_seconds is None else int(np.searchsorted(timestamps, start_seconds, side="left"))
+            hi = entry["count"] if end_seconds is None else int(np.searchsorted(timestamps, end_seconds, side="right"))
+            if lo < hi:
+                yield records[lo:hi]
+
+    def query(self, start=None, end=None, alerts=0):
+        """Return a copy of the records in [start, end] that have any of the `alerts` bits (all if 0)."""
+        parts = []
+        for records in self.iter_chunks(start, end, alerts):
+            if alerts:
+                records = records[(records["alerts"] & alerts) != 0]
+            parts.append(np.array(records))
+        if not parts:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.concatenate(parts)
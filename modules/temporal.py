@@ -0,0 +1,119 @@
+import math
+import time
+import cv2
+import numpy as np
+
+# Every class here is driven by frame timestamps, never by the wall clock, so a video gives the same
+# alerts whether it is processed in real time, faster or slower.
+
+
+class SustainedCondition:
+    """How long a condition has held without interruption, measured in frame time.
+
+    `update` returns the seconds since the condition became true (0.0 on the frame it starts), or None while
+    it is false. Callers that skip a frame (e.g. nobody visible) simply do not call `update`, which holds
+    the timer.
+    """
+
+    def __init__(self):
+        self.start_time = None
+
+    def update(self, active, timestamp):
+        if not active:
+            self.start_time = None
+            return None
+        if self.start_time is None:
+            self.start_time = timestamp
+        return timestamp - self.start_time
+
+    def reset(self):
+        self.start_time = None
+
+
+class SlidingWindowRatio:
+    """Fraction of true samples over the last `window` seconds, e.g. PERCLOS (share of time eyes are closed).
+
+    Samples live in a fixed-size ring buffer with a running count, so each update is O(1) amortized and
+    allocates nothing. When more than `capacity` samples fall inside the window the oldest are dropped.
+    """
+
+    def __init__(self, window=60.0, capacity=4096):
+        self.window = window
+        self.timestamps = np.empty(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=bool)
+        self.head = 0  # Index of the oldest sample
+        self.size = 0
+        self.true_count = 0
+
+    def update(self, value, timestamp):
+        """Add a sample and return the ratio over the window ending at `timestamp`."""
+        capacity = len(self.timestamps)
+        # Evict samples that have left the window, or the oldest one if the buffer is full
+        while self.size and (timestamp - self.timestamps[self.head] > self.window or self.size == capacity):
+            self.true_count -= int(self.values[self.head])
+            self.head = (self.head + 1) % capacity
+            self.size -= 1
+
+        tail = (self.head + self.size) % capacity
+        self.timestamps[tail] = timestamp
+        self.values[tail] = value
+        self.size += 1
+        self.true_count += int(bool(value))
+        return self.ratio
+
+    @property
+    def ratio(self):
+        return self.true_count / self.size if self.size else 0.0
+
+    def reset(self):
+        self.head = self.size = self.true_count = 0
+
+
+class ExponentialMovingAverage:
+    """EMA whose smoothing depends on elapsed frame time, not on the number of frames.
+
+    With time constant tau, a sample dt seconds after the previous one gets weight 1 - exp(-dt / tau),
+    so the average behaves the same at 10 fps and at 60 fps.
+    """
+
+    def __init__(self, time_constant=1.0):
+        self.time_constant = time_constant
+        self.value = None
+        self.last_timestamp = None
+
+    def update(self, sample, timestamp):
+        if self.value is None or self.time_constant <= 0:
+            self.value = sample
+        else:
+            dt = max(timestamp - self.last_timestamp, 0.0)
+            alpha = 1.0 - math.exp(-dt / self.time_constant)
+            self.value += alpha * (sample - self.value)
+        self.last_timestamp = timestamp
+        return self.value
+
+    def reset(self):
+        self.value = None
+        self.last_timestamp = None
+
+
+class CaptureClock:
+    """Timestamps for frames read from a cv2.VideoCapture.
+
+    Files use their own position (falling back to frame count / fps when the backend reports none), so
+    timers follow video time however fast the file is processed. Cameras use the wall clock at capture.
+    Pass `start_frame` after seeking a file so the fallback keeps counting from the right frame.
+    """
+
+    def __init__(self, cap, from_file, start_frame=0):
+        self.from_file = from_file
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frames = start_frame
+
+    def timestamp(self, cap):
+        """Return the timestamp of the frame just read from `cap`."""
+        index = self.frames
+        self.frames += 1
+        if not self.from_file:
+            return time.time()
+        position = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        return position if position > 0 or index == 0 else index / self.fps
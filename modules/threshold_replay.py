@@ -0,0 +1,212 @@
+import itertools
+import logging
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from modules import landmark_geometry as geometry
+from modules import telemetry_store as telemetry
+
+# Live defaults of the tunable decision constants, named after the detector attributes they mirror
+DEFAULT_THRESHOLDS = {
+    "FATIGUE_THRESHOLD": 0.70,  # FatigueDetector
+    "EYE_CLOSED_THRESHOLD": 2,
+    "HEAD_TILT_THRESHOLD": 4,  # PostureAnalyzer
+    "SHOULDER_MISALIGNMENT_THRESHOLD": 3,
+    "NECK_RATIO_THRESHOLD": 0.7,
+    "POSTURE_ALERT_THRESHOLD": 1.5,
+    "HAND_ON_WHEEL_THRESHOLD": 3,  # HandDetector
+}
+
+ALERT_TYPES = ["fatigue", "shoulder misalignment", "neck posture", "head tilt", "posture", "hands off wheel"]
+
+
+class ReplayFeatures:
+    """Threshold-independent per-frame measurements extracted once from a telemetry store.
+
+    Landmarks are reduced to a few numbers per frame (posture angles, neck ratio, fingertip-to-wheel
+    distances) chunk by chunk, so a full shift replays from a few tens of bytes per frame.
+    """
+
+    def __init__(self, timestamps, scores, flags, alerts, shoulder_angle, head_tilt_angle, neck_ratio,
+                 wheel_distances, wheel_radius):
+        self.timestamps = timestamps
+        self.scores = scores  # NaN where no fatigue score was available
+        self.flags = flags
+        self.alerts = alerts  # Alert bits recorded by the live system
+        self.shoulder_angle = shoulder_angle
+        self.head_tilt_angle = head_tilt_angle
+        self.neck_ratio = neck_ratio
+        self.wheel_distances = wheel_distances  # (T, 2), NaN for a missing hand
+        self.wheel_radius = wheel_radius
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @classmethod
+    def from_store(cls, store, start=None, end=None):
+        """Measure every frame of a TelemetryStore in [start, end] without loading it whole."""
+        width, height = store.width, store.height
+        wheel_center, wheel_radius = geometry.steering_wheel_region(width, height)
+        parts = []
+        for records in store.iter_chunks(start, end):
+            pose = records["pose"].astype(np.float64)
+            with np.errstate(invalid="ignore"):
+                metrics = geometry.posture_metrics(pose, width, height)
+            distances = geometry.wheel_distances(records["hands"].astype(np.float64), wheel_center, width, height)
+            parts.append((records["timestamp"].copy(), records["fatigue_score"].astype(np.float64),
+                          records["flags"].copy(), records["alerts"].copy(), metrics["shoulder_angle"],
+                          metrics["head_tilt_angle"], metrics["neck_ratio"], distances))
+
+        if not parts:
+            empty = np.empty(0)
+            return cls(empty, empty, empty.astype(np.uint8), empty.astype(np.uint8), empty, empty, empty,
+                       np.empty((0, telemetry.MAX_HANDS)), wheel_radius)
+        columns = [np.concatenate(column) for column in zip(*parts)]
+        return cls(*columns, wheel_radius)
+
+
+def sustained(condition, timestamps, threshold):
+    """Vectorized form of temporal.SustainedCondition compared against a threshold.
+
+    A run of `condition` starts a timer on its first frame and alerts on every frame of the run once
+    `threshold` seconds have passed since that start; the timer resets when the condition clears.
+    """
+    if len(condition) == 0:
+        return np.zeros(0, dtype=bool)
+    index = np.arange(len(condition))
+    previous = np.concatenate(([False], condition[:-1]))
+    run_start = np.maximum.accumulate(np.where(condition & ~previous, index, 0))
+    return condition & (timestamps - timestamps[run_start] >= threshold)
+
+
+def carry_forward(values, evaluated):
+    """Hold each evaluated frame's value over the frames where the detector was skipped."""
+    index = np.where(evaluated, np.arange(len(values)), -1)
+    last = np.maximum.accumulate(index) if len(index) else index
+    return np.where(last >= 0, values[np.maximum(last, 0)], False)
+
+
+def evaluate_fatigue(features, thresholds):
+    """check_fatigue_alert on every frame; frames without a score neither alert nor touch the timer."""
+    valid = ~np.isnan(features.scores)
+    alert = np.zeros(len(features), dtype=bool)
+    alert[valid] = sustained(features.scores[valid] >= thresholds["FATIGUE_THRESHOLD"],
+                             features.timestamps[valid], thresholds["EYE_CLOSED_THRESHOLD"])
+    return alert
+
+
+def evaluate_posture(features, thresholds):
+    """PostureAnalyzer's decision logic; returns {issue: per-frame alert}.
+
+    Frames without a person return no issues and hold the timer, skipped frames carry the last result.
+    """
+    evaluated = (features.flags & telemetry.FLAG_POSTURE_EVALUATED) != 0
+    measured = evaluated & ((features.flags & telemetry.FLAG_PERSON_VISIBLE) != 0)
+
+    conditions = {
+        "shoulder misalignment": features.shoulder_angle[measured] > thresholds["SHOULDER_MISALIGNMENT_THRESHOLD"],
+        "neck posture": features.neck_ratio[measured] < thresholds["NECK_RATIO_THRESHOLD"],
+        "head tilt": features.head_tilt_angle[measured] > thresholds["HEAD_TILT_THRESHOLD"],
+    }
+    any_issue = np.logical_or.reduce(list(conditions.values()))
+    gate = sustained(any_issue, features.timestamps[measured], thresholds["POSTURE_ALERT_THRESHOLD"])
+
+    issues = {}
+    for name, condition in conditions.items():
+        frame_alert = np.zeros(len(features), dtype=bool)
+        frame_alert[measured] = gate & condition
+        issues[name] = carry_forward(frame_alert, evaluated)
+    return issues
+
+
+def evaluate_hands(features, thresholds):
+    """HandDetector's hands-off-wheel timer over the frames where hand detection ran."""
+    evaluated = (features.flags & telemetry.FLAG_HANDS_EVALUATED) != 0
+    with np.errstate(invalid="ignore"):
+        on_wheel = features.wheel_distances[evaluated] < features.wheel_radius
+    # The first detected hand counts as the left hand and the second as the right
+    hands_off = ~(on_wheel[:, 0] & on_wheel[:, 1])
+    frame_alert = np.zeros(len(features), dtype=bool)
+    frame_alert[evaluated] = sustained(hands_off, features.timestamps[evaluated],
+                                       thresholds["HAND_ON_WHEEL_THRESHOLD"])
+    return carry_forward(frame_alert, evaluated)
+
+
+def summarize_alert(active, timestamps):
+    """Episode count, seconds active and the first onset of one per-frame alert series."""
+    if len(active) == 0:
+        return {"episodes": 0, "alert_seconds": 0.0, "first_onset": None}
+    onsets = active & ~np.concatenate(([False], active[:-1]))
+    durations = np.diff(timestamps, append=timestamps[-1])
+    onset_times = timestamps[onsets]
+    return {
+        "episodes": int(np.count_nonzero(onsets)),
+        "alert_seconds": round(float(durations[active].sum()), 3),
+        "first_onset": round(float(onset_times[0] - timestamps[0]), 3) if len(onset_times) else None
+    }
+
+
+def replay(features, thresholds=None):
+    """Re-run all alert decisions on the features under one threshold setting."""
+    settings = dict(DEFAULT_THRESHOLDS)
+    settings.update(thresholds or {})
+
+    alerts = evaluate_posture(features, settings)
+    alerts["posture"] = np.logical_or.reduce(list(alerts.values())) if alerts else np.zeros(len(features), bool)
+    alerts["fatigue"] = evaluate_fatigue(features, settings)
+    alerts["hands off wheel"] = evaluate_hands(features, settings)
+    return {name: summarize_alert(alerts[name], features.timestamps) for name in ALERT_TYPES}
+
+
+def recorded_summary(features):
+    """Alert summaries of what the live system actually raised, for comparison with the replay."""
+    summary = {}
+    for name in ALERT_TYPES:
+        if name == "posture":
+            mask = telemetry.ALERT_SHOULDER_MISALIGNMENT | telemetry.ALERT_NECK_POSTURE | telemetry.ALERT_HEAD_TILT
+        else:
+            mask = telemetry.ALERT_BITS[name]
+        summary[name] = summarize_alert((features.alerts & mask) != 0, features.timestamps)
+    return summary
+
+
+def threshold_grid(grid):
+    """Expand {name: [values]} into one settings dict per combination."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+_worker_features = None
+
+
+def _init_worker(features):
+    global _worker_features
+    _worker_features = features
+
+
+def _replay_in_worker(thresholds):
+    return replay(_worker_features, thresholds)
+
+
+class ThresholdReplay:
+    """Evaluate a grid of threshold settings against recorded telemetry, optionally across processes."""
+
+    def __init__(self, features, workers=1):
+        self.logger = logging.getLogger(__name__)
+        self.features = features
+        self.workers = workers
+
+    def run(self, grid):
+        """Return one {"thresholds", "alerts"} row per setting in the grid, in grid order."""
+        settings = threshold_grid(grid)
+        start = time.perf_counter()
+        if self.workers > 1 and len(settings) > 1:
+            # Features are sent to each worker once rather than with every setting
+            with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.features,)) as pool:
+                results = list(pool.map(_replay_in_worker, settings, chunksize=max(1, len(settings) // (4 * self.workers))))
+        else:
+            results = [replay(self.features, thresholds) for thresholds in settings]
+        elapsed = time.perf_counter() - start
+        self.logger.info(f"Replayed {len(settings)} settings over {len(self.features)} frames in {elapsed:.2f}s")
+        return [{"thresholds": {**DEFAULT_THRESHOLDS, **thresholds}, "alerts": alerts}
+                for thresholds, alerts in zip(settings, results)]
@@ -5,6 +5,70 @@ class Visualizer:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
 
+        # Define the hand landmark connections (using MediaPipe's predefined connections)
+        self.HAND_CONNECTIONS = [
+            [0, 1], [1, 2], [2, 3], [3, 4],  # Thumb
+            [0, 5], [5, 6], [6, 7], [7, 8],  # Index finger
+            [0, 9], [9, 10], [10, 11], [11, 12],  # Middle finger
+            [0, 13], [13, 14], [14, 15], [15, 16],  # Ring finger
+            [0, 17], [17, 18], [18, 19], [19, 20]  # Pinky finger
+        ]
+
+        # Upper-body skeleton drawn from PostureResult.landmarks
+        self.POSE_CONNECTIONS = [
+            ("shoulder_left", "shoulder_right"),  # Connect the shoulders with a line
+            ("shoulder_left", "elbow_left"), ("shoulder_right", "elbow_right"),  # Shoulder to Elbow
+            ("elbow_left", "wrist_left"), ("elbow_right", "wrist_right")  # Elbow to Wrist
+        ]
+        self.POSE_KEYPOINTS = ["shoulder_left", "shoulder_right", "head", "elbow_left", "elbow_right",
+                               "wrist_left", "wrist_right"]
+
+    def draw_pose(self, frame, posture_result):
+        """Draw the upper-body keypoints, skeleton and posture angles."""
+        if posture_result is None or not posture_result.person_visible:
+            return frame
+        landmarks = posture_result.landmarks
+
+        # Draw the key points on the frame
+        for name in self.POSE_KEYPOINTS:
+            cv2.circle(frame, landmarks[name], 5, (0, 255, 0), -1)
+
+        # Connect the landmarks with lines for better visualization
+        for start, end in self.POSE_CONNECTIONS:
+            cv2.line(frame, landmarks[start], landmarks[end], (0, 255, 0), 2)
+
+        # Draw a line from the midpoint of the shoulders to the nose (head)
+        cv2.line(frame, landmarks["shoulder_mid"], landmarks["head"], (100, 100, 200), 2)
+
+        cv2.putText(frame, f"Shoulder alignment angle: {"%.2f"%posture_result.shoulder_angle}", (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        cv2.putText(frame, f"Head tilt angle: {"%.2f"%posture_result.head_tilt_angle}", (10, 60),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        return frame
+
+    def draw_hands(self, frame, hands_info):
+        """Draw the steering wheel region and every detected hand."""
+        if hands_info is None or hands_info.wheel_center is None:
+            return frame
+
+        # Draw the steering wheel region
+        cv2.circle(frame, hands_info.wheel_center, hands_info.wheel_radius, (255, 255, 0), 2)
+
+        for hand in hands_info.hands:
+            # Draw the landmark points
+            for point in hand.landmarks:
+                cv2.circle(frame, point, 5, (0, 0, 255), -1)
+
+            # Connect the landmarks using predefined connections
+            for start_idx, end_idx in self.HAND_CONNECTIONS:
+                cv2.line(frame, hand.landmarks[start_idx], hand.landmarks[end_idx], (150, 150, 150), 2)
+        return frame
+
+    def draw_initializing(self, frame):
+        """Mark a frame shown while the detectors are still loading."""
+        cv2.putText(frame, "INITIALIZING...", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        return frame
+
     def draw_face_status(self, frame, fatigue_alert, posture_alerts):
         """Draw face-related status information on the frame."""
         y_offset = 120 + 30 * len(posture_alerts)
@@ -25,7 +89,7 @@ class Visualizer:
 
     def draw_hands_status(self, frame, hands_info, posture_alerts):
         """Draw hands-related status information on the frame."""
-        if hands_info and hands_info.get("hands_off_wheel_alert", False):
+        if hands_info and hands_info.hands_off_wheel_alert:
             # stack immediately below any posture alerts
             y_offset = 90 + 30 * len(posture_alerts)
             cv2.putText(frame,
@@ -36,8 +100,8 @@ class Visualizer:
 
     def draw_summary(self, frame, fatigue_alert, posture_alerts, person_visible, hands_info):
         """Draw overall status summary on the frame."""
-        hands_alert = hands_info.get("hands_off_wheel_alert", False) if hands_info else False
+        hands_alert = hands_info.hands_off_wheel_alert if hands_info else False
         # If no issues detected and person is visible, show "ALL GOOD"
         if person_visible and not any([fatigue_alert, posture_alerts, hands_alert]):
             cv2.putText(frame, "ALL GOOD!", (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        return frame
+        return frame
\ No newline at end of file
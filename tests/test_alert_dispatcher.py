@@ -0,0 +1,86 @@
+import queue
+import unittest
+from modules.alert_dispatcher import AlertDispatcher, CallbackSink
+
+
+class FailingSink:
+    def handle(self, event):
+        raise RuntimeError("sink down")
+
+    def close(self):
+        pass
+
+
+class AlertDispatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.delivered = []
+        self.dispatcher = AlertDispatcher([CallbackSink(self.delivered.append)], cooldown=5.0)
+
+    def test_waiting_event_absorbs_repeats(self):
+        self.assertTrue(self.dispatcher.submit("fatigue", 0.0, fatigue_score=0.8))
+        self.assertFalse(self.dispatcher.submit("fatigue", 0.1, fatigue_score=0.9))
+        self.assertFalse(self.dispatcher.submit("fatigue", 0.2))
+        self.dispatcher.start().stop()
+
+        self.assertEqual(len(self.delivered), 1)
+        event = self.delivered[0]
+        self.assertEqual((event.count, event.timestamp, event.last_timestamp), (3, 0.0, 0.2))
+        self.assertEqual(event.details["fatigue_score"], 0.9)
+        self.assertEqual(self.dispatcher.stats()["coalesced"], 2)
+
+    def deliver(self, dispatcher, alert_type, timestamp):
+        """Submit to a running dispatcher and wait until an accepted event has been delivered."""
+        delivered = queue.Queue()
+        dispatcher.add_sink(CallbackSink(delivered.put))
+        accepted = dispatcher.submit(alert_type, timestamp)
+        if accepted:
+            delivered.get(timeout=5)
+        return accepted
+
+    def test_cooldown_in_frame_time(self):
+        dispatcher = AlertDispatcher(cooldown=5.0).start()
+        try:
+            self.assertTrue(self.deliver(dispatcher, "neck_posture", 10.0))
+            self.assertFalse(self.deliver(dispatcher, "neck_posture", 14.9))
+            self.assertTrue(self.deliver(dispatcher, "neck_posture", 15.0))
+            # A timestamp before the last accepted one (e.g. the next video) is not rate limited
+            self.assertTrue(self.deliver(dispatcher, "neck_posture", 1.0))
+        finally:
+            dispatcher.stop()
+        self.assertEqual(dispatcher.stats()["rate_limited"], 1)
+
+    def test_per_type_cooldown_override(self):
+        dispatcher = AlertDispatcher(cooldown=5.0, cooldowns={"fatigue": 1.0}).start()
+        try:
+            self.deliver(dispatcher, "fatigue", 0.0)
+            self.deliver(dispatcher, "head_tilt", 0.0)
+            self.assertTrue(self.deliver(dispatcher, "fatigue", 1.0))
+            self.assertFalse(self.deliver(dispatcher, "head_tilt", 1.0))
+        finally:
+            dispatcher.stop()
+
+    def test_waiting_events_go_out_by_priority(self):
+        for alert_type in ("shoulder_misalignment", "custom", "hands_off_wheel", "fatigue", "head_tilt"):
+            self.dispatcher.submit(alert_type, 0.0)
+        self.dispatcher.start().stop()
+        self.assertEqual([event.alert_type for event in self.delivered],
+                         ["fatigue", "hands_off_wheel", "head_tilt", "shoulder_misalignment", "custom"])
+
+    def test_full_queue_drops_new_types(self):
+        dispatcher = AlertDispatcher(max_pending=2)
+        self.assertTrue(dispatcher.submit("fatigue", 0.0))
+        self.assertTrue(dispatcher.submit("head_tilt", 0.0))
+        self.assertFalse(dispatcher.submit("neck_posture", 0.0))
+        self.assertEqual(dispatcher.stats()["dropped"], 1)
+
+    def test_failing_sink_does_not_stop_the_others(self):
+        dispatcher = AlertDispatcher([FailingSink(), CallbackSink(self.delivered.append)])
+        dispatcher.submit("fatigue", 0.0)
+        dispatcher.start().stop()
+        self.assertEqual(len(self.delivered), 1)
+        stats = dispatcher.stats()
+        self.assertEqual((stats["dispatched"], stats["sink_errors"]), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import cv2
+import numpy as np
+from modules import batch_analyzer
+from modules.detection_results import PostureResult, HandsResult
+from modules.inference_backends import InferenceBackend
+from modules.telemetry_store import TelemetryRecorder, TelemetryStore
+
+
+class BrightnessBackend(InferenceBackend):
+    """Scores bright frames as fatigued and dark ones as alert."""
+
+    name = "brightness"
+
+    def __init__(self):
+        super().__init__(None)
+        self.input_size = (32, 32)
+
+    def predict(self, batch):
+        return np.where(batch.mean(axis=(1, 2, 3)) > 0.5, 0.9, 0.1)[:, None].astype(np.float32)
+
+
+class StubPostureAnalyzer:
+    def detect_posture(self, frame, timestamp=None):
+        return PostureResult()
+
+    def get_last_pose_result(self):
+        return None
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class StubHandDetector:
+    def detect_hands(self, frame, pose_result=None, timestamp=None):
+        return HandsResult()
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def write_video(path, seconds, dark_seconds=0.0, fps=10):
+    """A video that is dark (alert) for `dark_seconds`, then bright (fatigued)."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (64, 48))
+    for i in range(int(seconds * fps)):
+        writer.write(np.full((48, 64, 3), 20 if i < dark_seconds * fps else 220, dtype=np.uint8))
+    writer.release()
+
+
+@mock.patch.multiple(batch_analyzer, PostureAnalyzer=StubPostureAnalyzer, HandDetector=StubHandDetector)
+class BatchAnalyzerResetTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.long_video = os.path.join(self.directory, "long.mp4")
+        self.short_video = os.path.join(self.directory, "short.mp4")
+        # Fatigue starts 4 s into the long video and right away in the short one
+        write_video(self.long_video, 8, dark_seconds=4)
+        write_video(self.short_video, 3)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def analyze(self, analyzer, video_path):
+        output_path = os.path.join(self.directory, "timeline.jsonl")
+        analyzer.analyze(video_path, output_path)
+        with open(output_path) as f:
+            return [json.loads(line) for line in f]
+
+    def new_analyzer(self):
+        analyzer = batch_analyzer.BatchAnalyzer(None, batch_size=8, fatigue_backend=BrightnessBackend())
+        self.addCleanup(analyzer.close)
+        return analyzer
+
+    def test_reused_analyzer_matches_a_fresh_one(self):
+        reused = self.new_analyzer()
+        self.analyze(reused, self.long_video)
+        # The short video's timestamps start again at 0, before the fatigue timer left running at 4 s
+        timeline = self.analyze(reused, self.short_video)
+        self.assertEqual(timeline, self.analyze(self.new_analyzer(), self.short_video))
+        alerts = [record["timestamp"] for record in timeline if record["fatigue_alert"]]
+        self.assertTrue(alerts)
+        self.assertGreaterEqual(alerts[0], 2.0)
+
+    def test_shard_matches_the_whole_file_run(self):
+        analyzer = self.new_analyzer()
+        whole = self.analyze(analyzer, self.long_video)
+        output_path = os.path.join(self.directory, "shard.jsonl")
+        analyzer.analyze(self.long_video, output_path, start_frame=55, end_frame=70, warmup_frames=30)
+        with open(output_path) as f:
+            shard = [json.loads(line) for line in f]
+        # Warm-up from before the fatigue started gives the shard the same alerts as the whole run
+        self.assertEqual(shard, whole[55:70])
+        self.assertTrue(any(record["fatigue_alert"] for record in shard))
+
+    def test_last_shard_reads_to_end_and_reports_progress(self):
+        analyzer = self.new_analyzer()
+        reports = []
+        output_path = os.path.join(self.directory, "shard.jsonl")
+        summary = analyzer.analyze(self.long_video, output_path, start_frame=60, warmup_frames=10,
+                                   progress=reports.append)
+        self.assertEqual(summary["frames"], 20)
+        # One report per batch of 8 decoded frames, counting only frames past the shard start
+        self.assertEqual(reports, [0, 6, 14])
+
+    def test_telemetry_records_frame_size(self):
+        store_path = os.path.join(self.directory, "telemetry")
+        analyzer = batch_analyzer.BatchAnalyzer(None, batch_size=8, fatigue_backend=BrightnessBackend(),
+                                                recorder=TelemetryRecorder(store_path))
+        self.addCleanup(analyzer.close)
+        self.analyze(analyzer, self.short_video)
+        store = TelemetryStore(store_path)
+        self.assertEqual((len(store), store.width, store.height), (30, 64, 48))
+
+
+if __name__ == "__main__":
+    unittest.main()
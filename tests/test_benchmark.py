@@ -0,0 +1,114 @@
+import unittest
+from unittest import mock
+import numpy as np
+import main
+from modules.detection_results import PostureResult, HandsResult
+from tools.benchmark import PipelineBenchmark
+
+
+class StubFatigueDetector:
+    def __init__(self, model_path, backend=None):
+        self.closed_since = None
+
+    def warm_up(self):
+        pass
+
+    def predict_fatigue(self, frame, face_box=None):
+        return 0.9
+
+    def preprocess_for_model(self, context):
+        return np.zeros((1, 8, 8, 3), dtype=np.float32)
+
+    def predict_batch(self, batch):
+        return np.full(len(batch), 0.9)
+
+    def check_fatigue_alert(self, score, timestamp=None):
+        # Alerts once fatigued for 2s, like the real timer
+        if self.closed_since is None:
+            self.closed_since = timestamp
+        return timestamp - self.closed_since >= 2
+
+    def fatigue_statistics(self):
+        return {"perclos": 1.0, "smoothed_score": 0.9}
+
+    def reset(self):
+        self.closed_since = None
+
+
+class StubPostureAnalyzer:
+    def __init__(self):
+        self.calls = 0
+
+    def detect_posture(self, frame, timestamp=None):
+        self.calls += 1
+        return PostureResult()
+
+    def get_last_pose_result(self):
+        return None
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class StubHandDetector:
+    def __init__(self, use_pose_roi=True):
+        pass
+
+    def detect_hands(self, frame, pose_result=None, timestamp=None):
+        return HandsResult()
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class StubAlertSystem:
+    def __init__(self, alert_sound_path):
+        pass
+
+    def play_alert(self):
+        pass
+
+
+@mock.patch.multiple(main, FatigueDetector=StubFatigueDetector, PostureAnalyzer=StubPostureAnalyzer,
+                     HandDetector=StubHandDetector, AlertSystem=StubAlertSystem)
+class PipelineBenchmarkTest(unittest.TestCase):
+    def make_benchmark(self):
+        system = main.DriverMonitoringSystem("model.keras", render=False,
+                                             detector_cadence={"posture": {"hz": 10}})
+        self.addCleanup(system.cleanup)
+        return PipelineBenchmark(system, warmup=0)
+
+    def frames(self, count=30):
+        return (np.zeros((48, 64, 3), dtype=np.uint8) for _ in range(count))
+
+    def test_every_pass_starts_from_a_fresh_state(self):
+        benchmark = self.make_benchmark()
+        posture = benchmark.system.posture_analyzer
+        counts, alerts = [], []
+        for _ in range(2):
+            calls = posture.calls
+            benchmark.run_process_frame(self.frames())
+            counts.append(posture.calls - calls)
+            alerts.append(benchmark.system.last_results["fatigue_alert"])
+        # One second at 30 fps with posture at 10 Hz, and no 2s fatigue alert, in both passes
+        self.assertEqual(counts, [10, 10])
+        self.assertEqual(alerts, [False, False])
+
+    def test_stage_pass_resets_timers(self):
+        benchmark = self.make_benchmark()
+        benchmark.run_process_frame(self.frames(90))
+        self.assertTrue(benchmark.system.last_results["fatigue_alert"])
+        with mock.patch.object(benchmark, "draw"):
+            benchmark.run_stages(self.frames(1))
+        self.assertIsNone(benchmark.system.last_results)
+        self.assertEqual(benchmark.system.fatigue_detector.closed_since, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+import main
+
+
+class CommandLineTest(unittest.TestCase):
+    def parse(self, argv):
+        parser = main.build_arg_parser()
+        args = parser.parse_args(argv)
+        main.check_process_options(parser, args)
+        return args
+
+    def assert_rejected(self, argv):
+        with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+            self.parse(argv)
+
+    def test_no_command_uses_run_defaults(self):
+        args = self.parse([])
+        self.assertIsNone(args.command)
+        self.assertEqual((args.source, args.cadence, args.no_hand_roi, args.alert_cooldown, args.metrics_port),
+                         ("0", None, False, 5.0, None))
+
+    def test_run_options(self):
+        args = self.parse(["run", "--cadence", "fatigue=3", "posture=10hz", "--no-hand-roi", "--alert-cooldown", "3",
+                           "--metrics-port", "9108"])
+        self.assertEqual(args.cadence, ["fatigue=3", "posture=10hz"])
+        self.assertTrue(args.no_hand_roi)
+        self.assertEqual((args.alert_cooldown, args.metrics_port), (3.0, 9108))
+
+    def test_run_options_are_rejected_by_other_commands(self):
+        self.assert_rejected(["analyze", "trip.mp4", "--cadence", "fatigue=3"])
+        self.assert_rejected(["batch", "recordings/", "--no-hand-roi"])
+        self.assert_rejected(["fleet", "0", "--alert-log", "alerts.jsonl"])
+        self.assert_rejected(["analyze", "trip.mp4", "--metrics-port", "9108"])
+
+    def test_shared_options(self):
+        args = self.parse(["--face-roi", "--backend", "onnx", "analyze", "trip.mp4"])
+        self.assertTrue(args.face_roi)
+        self.assertEqual(args.backend, "onnx")
+
+    def test_processes_rejects_options_it_would_ignore(self):
+        for argv in (["run", "--processes", "--cadence", "fatigue=2"], ["--face-roi", "run", "--processes"],
+                     ["run", "--processes", "--target-fps", "20"], ["run", "--processes", "--fast-start"]):
+            self.assert_rejected(argv)
+        self.assertTrue(self.parse(["run", "--processes", "--no-hand-roi"]).no_hand_roi)
+
+
+if __name__ == "__main__":
+    unittest.main()
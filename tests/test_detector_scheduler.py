@@ -0,0 +1,53 @@
+import unittest
+from modules.detector_scheduler import DetectorScheduler, parse_cadence
+
+
+class ParseCadenceTest(unittest.TestCase):
+    def test_frame_and_rate_cadences(self):
+        self.assertEqual(parse_cadence(["fatigue=3", " posture = 10Hz"]),
+                         {"fatigue": {"every": 3}, "posture": {"hz": 10.0}})
+
+    def test_no_specs(self):
+        self.assertEqual(parse_cadence(None), {})
+
+    def test_unknown_detector_is_rejected(self):
+        with self.assertRaises(ValueError):
+            parse_cadence(["fatigeu=3"])
+
+    def test_malformed_spec_is_rejected(self):
+        for spec in ("fatigue", "=3", "fatigue=", "fatigue=fast"):
+            with self.assertRaises(ValueError):
+                parse_cadence([spec])
+
+
+class DetectorSchedulerTest(unittest.TestCase):
+    def runs(self, scheduler, name, frames, fps=30.0):
+        return [i for i in range(frames) if scheduler.should_run(name, i, i / fps)]
+
+    def test_every_n_frames(self):
+        scheduler = DetectorScheduler({"fatigue": {"every": 3}})
+        self.assertEqual(self.runs(scheduler, "fatigue", 10), [0, 3, 6, 9])
+
+    def test_rate_in_video_time(self):
+        scheduler = DetectorScheduler({"posture": {"hz": 10}})
+        self.assertEqual(self.runs(scheduler, "posture", 10), [0, 3, 6, 9])
+
+    def test_detector_without_cadence_runs_every_frame(self):
+        self.assertEqual(self.runs(DetectorScheduler(), "hands", 4), [0, 1, 2, 3])
+
+    def test_reset_runs_every_detector_on_the_next_frame(self):
+        scheduler = DetectorScheduler({"fatigue": {"every": 5}})
+        scheduler.should_run("fatigue", 0, 0.0)
+        self.assertFalse(scheduler.should_run("fatigue", 1, 1 / 30))
+        scheduler.reset()
+        self.assertTrue(scheduler.should_run("fatigue", 2, 2 / 30))
+
+    def test_invalid_cadence(self):
+        with self.assertRaises(ValueError):
+            DetectorScheduler({"fatigue": {"every": 0}})
+        with self.assertRaises(ValueError):
+            DetectorScheduler({"fatigue": {"every": 2, "hz": 5}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import sys
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+from unittest import mock
+from tools import export_model
+
+
+class ExportModelTest(unittest.TestCase):
+    def test_int8_without_calibration_fails_before_exporting(self):
+        argv = ["export_model", "--model", "model.h5", "--output-dir", "unused"]
+        with mock.patch.object(sys, "argv", argv), mock.patch.object(export_model, "export_tflite") as tflite, \
+                mock.patch.object(export_model, "export_onnx") as onnx, redirect_stderr(StringIO()) as stderr:
+            with self.assertRaises(SystemExit):
+                export_model.main()
+        self.assertIn("--calibration is required", stderr.getvalue())
+        tflite.assert_not_called()
+        onnx.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
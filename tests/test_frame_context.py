@@ -0,0 +1,68 @@
+import tracemalloc
+import unittest
+import numpy as np
+from modules.frame_context import FrameContext
+
+
+class FrameContextAllocationTest(unittest.TestCase):
+    """Steady-state frames must reuse the context's buffers instead of allocating new ones."""
+
+    FRAMES = 50
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.frames = [rng.integers(0, 256, (480, 640, 3), dtype=np.uint8) for _ in range(4)]
+
+    def run_frames(self, context, count, roi=None):
+        for i in range(count):
+            context.update(self.frames[i % len(self.frames)], i / 30.0)
+            context.model_input((224, 224), roi)
+
+    def assert_no_allocations(self, context, roi=None):
+        self.run_frames(context, 5, roi)  # Warm-up allocates every buffer once
+        tracemalloc.start()
+        try:
+            self.run_frames(context, self.FRAMES, roi)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # NumPy reports its buffers to tracemalloc. One 640x480 frame is ~900 KB, so even a temporary
+        # frame-sized array on any frame would push the peak far past this bound.
+        self.assertLess(current, 64 * 1024)
+        self.assertLess(peak, 64 * 1024)
+
+    def test_rendered_frames_reuse_buffers(self):
+        self.assert_no_allocations(FrameContext(frame_buffers=4))
+
+    def test_headless_frames_reuse_buffers(self):
+        self.assert_no_allocations(FrameContext(keep_frame=False))
+
+    def test_cropped_model_input_reuses_buffers(self):
+        self.assert_no_allocations(FrameContext(keep_frame=False), roi=(100, 50, 400, 350))
+
+    def test_downscaled_frames_reuse_buffers(self):
+        context = FrameContext(keep_frame=False)
+        context.analysis_scale = 0.5
+        self.assert_no_allocations(context)
+
+    def test_buffers_are_the_same_objects_across_frames(self):
+        context = FrameContext(keep_frame=False)
+        self.run_frames(context, 2)
+        rgb, model_input = context.rgb, context.model_input()
+        self.run_frames(context, 10)
+        self.assertIs(context.rgb, rgb)
+        self.assertIs(context.model_input(), model_input)
+
+    def test_model_input_matches_flipped_frame(self):
+        context = FrameContext()
+        context.update(self.frames[0])
+        self.assertTrue(np.array_equal(context.frame, self.frames[0][:, ::-1]))
+        self.assertTrue(np.array_equal(context.rgb, self.frames[0][:, ::-1, ::-1]))
+        model_input = context.model_input((224, 224))
+        self.assertEqual(model_input.shape, (1, 224, 224, 3))
+        self.assertEqual(model_input.dtype, np.float32)
+        self.assertLessEqual(float(model_input.max()), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+from unittest import mock
+import numpy as np
+import main
+from modules.detection_results import PostureResult, HandsResult, HandStatus
+
+LANDMARKS = {name: (100 + 10 * i, 100) for i, name in enumerate(
+    ["shoulder_left", "shoulder_right", "head", "elbow_left", "elbow_right", "wrist_left", "wrist_right",
+     "shoulder_mid"])}
+
+
+class StubFatigueDetector:
+    def __init__(self, model_path, backend=None):
+        pass
+
+    def warm_up(self):
+        pass
+
+    def predict_fatigue(self, frame, face_box=None):
+        return 0.9
+
+    def check_fatigue_alert(self, confidence_score, timestamp=None):
+        return True
+
+    def fatigue_statistics(self):
+        return {"perclos": 1.0, "smoothed_score": 0.9}
+
+
+class StubPostureAnalyzer:
+    def detect_posture(self, frame, timestamp=None):
+        return PostureResult(issues=["head tilt"], person_visible=True, landmarks=dict(LANDMARKS),
+                             shoulder_angle=5.0, head_tilt_angle=6.0, neck_ratio=0.5)
+
+    def get_last_pose_result(self):
+        return None
+
+    def close(self):
+        pass
+
+
+class StubHandDetector:
+    def __init__(self, use_pose_roi=True):
+        pass
+
+    def detect_hands(self, frame, pose_result=None, timestamp=None):
+        return HandsResult(hands=[HandStatus([(200 + i, 300) for i in range(21)])], hands_off_wheel_alert=True,
+                           wheel_center=(320, 360), wheel_radius=100)
+
+    def close(self):
+        pass
+
+
+class StubAlertSystem:
+    def __init__(self, alert_sound_path):
+        pass
+
+    def play_alert(self):
+        pass
+
+
+@mock.patch.multiple(main, FatigueDetector=StubFatigueDetector, PostureAnalyzer=StubPostureAnalyzer,
+                     HandDetector=StubHandDetector, AlertSystem=StubAlertSystem)
+class HeadlessModeTest(unittest.TestCase):
+    """With render=False the frame loop must not touch any OpenCV drawing or display function."""
+
+    DRAWING = ("circle", "line", "putText", "rectangle", "imshow")
+
+    def process_frames(self, render):
+        system = main.DriverMonitoringSystem("model.keras", render=render)
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        mocks = {}
+        try:
+            with mock.patch.multiple("cv2", **{name: mock.DEFAULT for name in self.DRAWING}) as mocks:
+                for i in range(3):
+                    system.process_frame(frame, i / 30.0)
+        finally:
+            system.cleanup()
+        self.assertTrue(system.last_results["alert"])
+        return mocks
+
+    def test_headless_never_draws(self):
+        mocks = self.process_frames(render=False)
+        for name, drawing in mocks.items():
+            self.assertFalse(drawing.called, f"cv2.{name} was called in headless mode")
+
+    def test_rendered_mode_draws(self):
+        # Control: the same stub results do get drawn when rendering
+        mocks = self.process_frames(render=True)
+        self.assertTrue(mocks["circle"].called)
+        self.assertTrue(mocks["putText"].called)
+        self.assertFalse(mocks["imshow"].called)  # process_frame never displays; run() does
+
+
+if __name__ == "__main__":
+    unittest.main()
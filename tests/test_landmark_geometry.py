@@ -0,0 +1,54 @@
+import unittest
+import numpy as np
+from modules import landmark_geometry as geometry
+
+
+def pose(visible, **landmarks):
+    """Build (33, 3) points and (33,) visibility with the given landmarks at normalized (x, y)."""
+    points = np.zeros((33, 3))
+    visibility = np.zeros(33)
+    for index, (x, y) in landmarks.items():
+        points[int(index[1:])] = (x, y, 0.0)
+        visibility[int(index[1:])] = 1.0 if visible else 0.0
+    return points, visibility
+
+
+class HandRegionTest(unittest.TestCase):
+    def test_box_around_the_wrists(self):
+        # Shoulders 128 px apart on a 640x480 frame, so the margin is 0.6 x 128 = 76.8 px
+        points, visibility = pose(True, l11=(0.4, 0.4), l12=(0.6, 0.4), l15=(0.45, 0.7), l16=(0.55, 0.7))
+        self.assertEqual(geometry.hand_region(points, visibility, 640, 480), (211, 259, 428, 412))
+
+    def test_box_is_clipped_to_the_frame(self):
+        points, visibility = pose(True, l11=(0.4, 0.4), l12=(0.6, 0.4), l15=(0.02, 0.98), l16=(0.1, 0.95))
+        x0, y0, x1, y1 = geometry.hand_region(points, visibility, 640, 480)
+        self.assertEqual((x0, y1), (0, 480))
+
+    def test_no_visible_hand_landmarks(self):
+        points, visibility = pose(False, l15=(0.45, 0.7), l16=(0.55, 0.7))
+        self.assertIsNone(geometry.hand_region(points, visibility, 640, 480))
+
+    def test_no_person(self):
+        self.assertIsNone(geometry.hand_region(None, None, 640, 480))
+
+
+class PostureMetricsTest(unittest.TestCase):
+    def test_level_shoulders_and_upright_head(self):
+        # MediaPipe's left shoulder is on the right of the image
+        points, _ = pose(True, l0=(0.5, 0.2), l11=(0.6, 0.4), l12=(0.4, 0.4))
+        metrics = geometry.posture_metrics(points, 640, 480)
+        self.assertAlmostEqual(float(metrics["shoulder_angle"]), 0.0)
+        self.assertAlmostEqual(float(metrics["head_tilt_angle"]), 0.0)
+
+    def test_same_result_for_one_frame_and_a_stack(self):
+        first, _ = pose(True, l0=(0.52, 0.2), l11=(0.6, 0.41), l12=(0.4, 0.38))
+        second, _ = pose(True, l0=(0.45, 0.25), l11=(0.62, 0.4), l12=(0.38, 0.45))
+        stacked = geometry.posture_metrics(np.stack([first, second]), 640, 480)
+        for i, points in enumerate((first, second)):
+            single = geometry.posture_metrics(points, 640, 480)
+            for name in ("shoulder_angle", "head_tilt_angle", "neck_ratio"):
+                self.assertAlmostEqual(float(stacked[name][i]), float(single[name]))
+
+
+if __name__ == "__main__":
+    unittest.main()
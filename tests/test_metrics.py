@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import main
+from modules.metrics import MetricsRegistry, PipelineMetrics, SnapshotWriter
+from tests.test_benchmark import StubAlertSystem, StubFatigueDetector, StubHandDetector, StubPostureAnalyzer
+
+
+class PrometheusFormatTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_help_and_type_lines(self):
+        self.registry.counter("frames_total", "Frames by outcome", ("outcome",)).inc(outcome="processed")
+        self.registry.gauge("fps", "Frames per second\nsmoothed").labels().set(29.5)
+        lines = self.registry.render_prometheus().splitlines()
+        self.assertEqual(lines, [
+            "# HELP frames_total Frames by outcome",
+            "# TYPE frames_total counter",
+            'frames_total{outcome="processed"} 1.0',
+            "# HELP fps Frames per second\\nsmoothed",
+            "# TYPE fps gauge",
+            "fps 29.5",
+        ])
+
+    def test_label_values_are_escaped(self):
+        self.registry.counter("alerts_total", "Alerts", ("type",)).inc(type='say "hi"\\\nnow')
+        self.assertIn('alerts_total{type="say \\"hi\\"\\\\\\nnow"} 1.0', self.registry.render_prometheus())
+
+    def test_histogram_buckets_sum_and_count(self):
+        histogram = self.registry.histogram("latency_seconds", "Latency", ("stage",), buckets=(0.01, 0.1, 1.0))
+        for value in (0.005, 0.01, 0.05, 2.0):
+            histogram.observe(value, stage="posture")
+        lines = self.registry.render_prometheus().splitlines()
+        self.assertEqual(lines[2:], [
+            'latency_seconds_bucket{stage="posture",le="0.01"} 2',
+            'latency_seconds_bucket{stage="posture",le="0.1"} 3',
+            'latency_seconds_bucket{stage="posture",le="1.0"} 3',
+            'latency_seconds_bucket{stage="posture",le="+Inf"} 4',
+            'latency_seconds_sum{stage="posture"} 2.065',
+            'latency_seconds_count{stage="posture"} 4',
+        ])
+
+    def test_collect_hooks_run_before_export(self):
+        gauge = self.registry.gauge("depth", "Queue depth").labels()
+        self.registry.add_collect_hook(lambda: gauge.set(3))
+        self.assertIn("depth 3", self.registry.render_prometheus())
+
+
+class SnapshotTest(unittest.TestCase):
+    def test_snapshot_contents(self):
+        metrics = PipelineMetrics()
+        metrics.observe_stage("posture", 0.004)
+        metrics.observe_stage("posture", 0.02)
+        metrics.frame_done(0.03, ["fatigue"])
+        metrics.frame_done(0.03, ["fatigue", "head_tilt"])
+        metrics.frame_done(0.03, [])
+        metrics.frame_done(0.03, ["fatigue"])
+        snapshot = metrics.registry.snapshot()["metrics"]
+
+        stages = {value["labels"]["stage"]: value for value in
+                  snapshot["fatigue_sense_stage_latency_seconds"]["values"]}
+        self.assertEqual(snapshot["fatigue_sense_stage_latency_seconds"]["type"], "histogram")
+        self.assertEqual(stages["posture"]["count"], 2)
+        self.assertAlmostEqual(stages["posture"]["mean"], 0.012)
+        self.assertEqual((stages["posture"]["p50_le"], stages["posture"]["p99_le"]), (0.005, 0.025))
+        self.assertIsNone(stages["hands"]["mean"])
+
+        # Each alert episode is counted once, when it starts
+        alerts = {value["labels"]["type"]: value["value"] for value in
+                  snapshot["fatigue_sense_alerts_total"]["values"]}
+        self.assertEqual(alerts, {"fatigue": 2, "head_tilt": 1})
+        frames = {value["labels"]["outcome"]: value["value"] for value in
+                  snapshot["fatigue_sense_frames_total"]["values"]}
+        self.assertEqual(frames["processed"], 4)
+
+    def test_snapshot_writer_replaces_file(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        metrics = PipelineMetrics()
+        writer = SnapshotWriter(metrics.registry, os.path.join(path, "metrics.json"), interval=60)
+        metrics.frame_done(0.01)
+        writer.write()
+        with open(writer.path) as f:
+            snapshot = json.load(f)
+        self.assertIn("timestamp", snapshot)
+        self.assertEqual(snapshot["metrics"]["fatigue_sense_frame_latency_seconds"]["values"][0]["count"], 1)
+        self.assertEqual(os.listdir(path), ["metrics.json"])
+
+
+@mock.patch.multiple(main, FatigueDetector=StubFatigueDetector, PostureAnalyzer=StubPostureAnalyzer,
+                     HandDetector=StubHandDetector, AlertSystem=StubAlertSystem)
+class StageTimingTest(unittest.TestCase):
+    def test_only_stages_that_ran_are_timed(self):
+        system = main.DriverMonitoringSystem("model.keras", render=False,
+                                             detector_cadence={"posture": {"every": 2}, "fatigue": {"every": 3}})
+        self.addCleanup(system.cleanup)
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        for i in range(6):
+            system.process_frame(frame, i / 30.0)
+        counts = {stage: histogram.count for stage, histogram in system.metrics.stages.items()}
+        self.assertEqual(counts, {"flip": 6, "posture": 3, "fatigue": 2, "hands": 6, "visualize": 0, "alert": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import cv2
+import numpy as np
+from modules.metrics import PipelineMetrics
+from modules.output_recorder import OutputRecorder
+
+
+def read_frames(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def frame_count(path):
+    return len(read_frames(path))
+
+
+class OutputRecorderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.frame = np.full((48, 64, 3), 128, dtype=np.uint8)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self, recorder, frames, images=None):
+        """Submit (timestamp, alert) frames, pacing them so the queue never overflows."""
+        recorder.start()
+        for i, (timestamp, alert) in enumerate(frames):
+            while recorder.queue.full():
+                time.sleep(0.001)
+            self.assertTrue(recorder.submit(self.frame if images is None else images[i], timestamp, alert))
+        recorder.stop()
+        return recorder.stats()
+
+    def test_continuous_writes_every_frame(self):
+        path = os.path.join(self.directory, "out.mp4")
+        stats = self.record(OutputRecorder(path, fps=10), [(i / 10, False) for i in range(25)])
+        self.assertEqual(stats["written"], 25)
+        self.assertEqual(frame_count(path), 25)
+
+    def test_clip_holds_pre_and_post_roll(self):
+        # One alerting frame at 5 s: 1 s before it, the frame itself and 1 s after it
+        frames = [(i / 10, i == 50) for i in range(100)]
+        stats = self.record(OutputRecorder(self.directory, mode="clips", fps=10, pre_roll=1, post_roll=1), frames)
+        clips = sorted(os.listdir(self.directory))
+        self.assertEqual((stats["clips"], len(clips)), (1, 1))
+        self.assertEqual(frame_count(os.path.join(self.directory, clips[0])), 10 + 1 + 10)
+
+    def test_alerts_within_post_roll_extend_the_clip(self):
+        frames = [(i / 10, i in (20, 25, 60)) for i in range(100)]
+        stats = self.record(OutputRecorder(self.directory, mode="clips", fps=10, pre_roll=0.5, post_roll=1), frames)
+        self.assertEqual(stats["clips"], 2)
+
+    def test_pre_roll_is_bounded_when_timestamps_stall(self):
+        # A stalled clock keeps every frame inside the time window; the frame cap must still hold
+        frames = [(1.0, False)] * 200 + [(1.0, True)]
+        recorder = OutputRecorder(self.directory, mode="clips", fps=10, pre_roll=2, post_roll=0)
+        stats = self.record(recorder, frames)
+        self.assertEqual(stats["written"], 20 + 1)
+
+    def test_clip_on_the_first_frame(self):
+        stats = self.record(OutputRecorder(self.directory, mode="clips", fps=10, post_roll=0), [(0.0, True)])
+        self.assertEqual((stats["clips"], stats["written"]), (1, 1))
+
+    def test_pre_roll_is_flushed_in_order_on_the_alert_edge(self):
+        # Each frame's brightness encodes its index, so the clip shows which frames it holds
+        images = [np.full((48, 64, 3), 8 * i, dtype=np.uint8) for i in range(30)]
+        frames = [(i / 10, i == 20) for i in range(30)]
+        recorder = OutputRecorder(self.directory, mode="clips", fps=10, pre_roll=0.5, post_roll=0.3)
+        stats = self.record(recorder, frames, images)
+        clips = sorted(os.listdir(self.directory))
+        self.assertEqual(len(clips), 1)
+        indexes = [round(float(frame.mean()) / 8) for frame in read_frames(os.path.join(self.directory, clips[0]))]
+        # Five pre-roll frames, the alerting frame, then post-roll until 0.3 s after it
+        self.assertEqual(indexes, list(range(15, 24)))
+        self.assertEqual(stats["written"], 9)
+
+    def test_post_roll_closes_the_clip(self):
+        frames = [(i / 10, i == 10) for i in range(60)]
+        recorder = OutputRecorder(self.directory, mode="clips", fps=10, pre_roll=0, post_roll=1)
+        stats = self.record(recorder, frames)
+        # The alerting frame and 1 s after it; nothing later is written
+        self.assertEqual((stats["clips"], stats["written"]), (1, 11))
+        self.assertIsNone(recorder.writer)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        metrics = PipelineMetrics()
+        # Not started yet, so nothing drains the queue
+        recorder = OutputRecorder(os.path.join(self.directory, "out.mp4"), fps=10, queue_size=2, metrics=metrics)
+        start = time.perf_counter()
+        accepted = [recorder.submit(self.frame, i / 10) for i in range(5)]
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(accepted, [True, True, False, False, False])
+        self.assertEqual(recorder.stats()["dropped"], 3)
+        recorder.start()
+        recorder.stop()
+        self.assertEqual(recorder.stats()["written"], 2)
+        self.assertIn('fatigue_sense_recorder_frames_total{outcome="dropped"} 3', metrics.registry.render_prometheus())
+
+
+if __name__ == "__main__":
+    unittest.main()
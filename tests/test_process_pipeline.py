@@ -0,0 +1,165 @@
+import queue
+import unittest
+import numpy as np
+from modules import process_pipeline
+from modules.detection_results import PostureResult, HandsResult
+from modules.process_pipeline import ProcessPipeline
+from modules.shared_frame_ring import SharedFrameRing
+
+SHAPE = (120, 160, 3)
+
+
+class FakeRecorder:
+    """Telemetry recorder that keeps the timestamp and evaluated detectors of every finished frame."""
+
+    def __init__(self):
+        self.frames = []
+
+    def record_results(self, timestamp, results, width, height, evaluated):
+        self.frames.append((timestamp, evaluated))
+
+    def close(self):
+        pass
+
+
+class FakeWorker:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.exitcode = None if alive else 1
+
+    def is_alive(self):
+        return self.alive
+
+    def join(self, timeout=None):
+        pass
+
+
+def visible_posture():
+    """A person with both wrists near the middle of the frame."""
+    points = np.full((33, 3), 0.5)
+    points[11, 0], points[12, 0] = 0.6, 0.4  # Shoulders
+    return PostureResult(person_visible=True, points=points, visibility=np.ones(33))
+
+
+class ProcessPipelineTest(unittest.TestCase):
+    """Drives _submit/_collect/_finish with result messages posted by hand instead of worker processes."""
+
+    def make_pipeline(self, slots=4, hand_pose_roi=False):
+        pipeline = ProcessPipeline("model.keras", "alert.wav", slots=slots, render=False, display=False,
+                                   recorder=FakeRecorder(), hand_pose_roi=hand_pose_roi)
+        pipeline.results = queue.Queue()
+        pipeline.tasks = {kind: queue.Queue() for kind in process_pipeline.DETECTORS}
+        pipeline.ring = SharedFrameRing(slots, SHAPE)
+        pipeline.unflipped_rgb = np.empty(SHAPE, dtype=np.uint8)
+        self.addCleanup(pipeline.close)
+        return pipeline
+
+    def submit(self, pipeline, count, wait=False):
+        for _ in range(count):
+            pipeline._submit(np.zeros(SHAPE, dtype=np.uint8), float(pipeline.frames_captured), wait)
+
+    def post(self, pipeline, frame_id, kinds=process_pipeline.DETECTORS, status="result", posture=None):
+        results = {"fatigue": {"score": 0.2, "alert": False, "perclos": 0.0, "smoothed_score": 0.2},
+                   "posture": posture or PostureResult(), "hands": HandsResult()}
+        for kind in kinds:
+            payload = (results[kind], 0.01) if status == "result" else None
+            pipeline.results.put((status, kind, frame_id, payload))
+
+    def test_frames_finish_in_capture_order(self):
+        pipeline = self.make_pipeline()
+        self.submit(pipeline, 3)
+        # Frame 1 completes first, but waits for frame 0
+        self.post(pipeline, 1)
+        self.post(pipeline, 0, ["fatigue", "posture"])
+        pipeline._collect(block=False)
+        self.assertEqual(pipeline.recorder.frames, [])
+
+        self.post(pipeline, 0, ["hands"])
+        pipeline._collect(block=False)
+        self.assertEqual([timestamp for timestamp, _ in pipeline.recorder.frames], [0.0, 1.0])
+        self.assertEqual(list(pipeline.in_flight), [2])
+        self.assertEqual(pipeline.slot_frames, [None, None, 2, None])
+        self.assertEqual(pipeline.last_results["fatigue_score"], 0.2)
+
+    def test_results_merge_by_frame_id(self):
+        pipeline = self.make_pipeline()
+        self.submit(pipeline, 2)
+        pipeline.results.put(("result", "fatigue", 1, ({"score": 0.9, "alert": False, "perclos": 0.0,
+                                                         "smoothed_score": 0.9}, 0.01)))
+        self.post(pipeline, 1, ["posture", "hands"])
+        self.post(pipeline, 0)
+        pipeline._collect(block=False)
+        self.assertEqual(pipeline.last_results["fatigue_score"], 0.9)
+        self.assertEqual(pipeline.frames_analyzed, 2)
+
+    def test_hands_task_follows_posture_with_wrist_region(self):
+        pipeline = self.make_pipeline(hand_pose_roi=True)
+        self.submit(pipeline, 2)
+        self.assertEqual(pipeline.tasks["fatigue"].qsize(), 2)
+        self.assertTrue(pipeline.tasks["hands"].empty())
+
+        self.post(pipeline, 0, ["posture"], posture=visible_posture())
+        self.post(pipeline, 1, ["posture"])
+        pipeline._collect(block=False)
+        frame_id, slot, timestamp, roi = pipeline.tasks["hands"].get_nowait()
+        self.assertEqual((frame_id, slot, timestamp), (0, 0, 0.0))
+        x0, y0, x1, y1 = roi
+        self.assertTrue(x0 < 80 < x1 and y0 < 60 < y1)
+        # Without a person there is no region and hands search the whole frame
+        self.assertEqual(pipeline.tasks["hands"].get_nowait(), (1, 1, 1.0, None))
+
+    def test_stale_posture_still_sends_hands_task(self):
+        pipeline = self.make_pipeline(hand_pose_roi=True)
+        self.submit(pipeline, 1)
+        self.post(pipeline, 0, ["posture"], status="stale")
+        pipeline._collect(block=False)
+        self.assertEqual(pipeline.tasks["hands"].get_nowait(), (0, 0, 0.0, None))
+
+    def test_stale_read_finishes_frame_without_that_detector(self):
+        pipeline = self.make_pipeline()
+        self.submit(pipeline, 1)
+        self.post(pipeline, 0, ["fatigue"], status="stale")
+        self.post(pipeline, 0, ["posture", "hands"])
+        pipeline._collect(block=False)
+        self.assertEqual(pipeline.stale_reads, 1)
+        self.assertEqual(pipeline.recorder.frames, [(0.0, ["posture", "hands"])])
+        self.assertIsNone(pipeline.last_results["fatigue_score"])
+
+    def test_worker_error_finishes_frame_without_that_detector(self):
+        pipeline = self.make_pipeline()
+        self.submit(pipeline, 1)
+        self.post(pipeline, 0, ["hands"], status="error")
+        self.post(pipeline, 0, ["fatigue", "posture"])
+        pipeline._collect(block=False)
+        self.assertEqual(pipeline.worker_errors, 1)
+        self.assertEqual(pipeline.recorder.frames, [(0.0, ["fatigue", "posture"])])
+
+    def test_camera_frame_dropped_when_ring_is_full(self):
+        pipeline = self.make_pipeline(slots=2)
+        self.submit(pipeline, 3)
+        self.assertEqual((pipeline.frames_captured, pipeline.frames_dropped), (3, 1))
+        self.assertEqual(list(pipeline.in_flight), [0, 1])
+
+    def test_file_frame_waits_for_a_slot(self):
+        pipeline = self.make_pipeline(slots=2)
+        self.submit(pipeline, 2, wait=True)
+        self.post(pipeline, 0)
+        self.submit(pipeline, 1, wait=True)
+        self.assertEqual(pipeline.frames_dropped, 0)
+        self.assertEqual(pipeline.slot_frames, [2, 1])
+        self.assertEqual(pipeline.recorder.frames, [(0.0, list(process_pipeline.DETECTORS))])
+
+    def test_dead_worker_is_noticed_without_blocking(self):
+        pipeline = self.make_pipeline(slots=1)
+        pipeline.workers = {"fatigue": FakeWorker(), "posture": FakeWorker(alive=False)}
+        with self.assertRaises(RuntimeError):
+            pipeline._collect(block=False)
+        self.submit(pipeline, 1)
+        # A full ring also checks the workers, so a camera run does not drop frames forever
+        with self.assertRaises(RuntimeError):
+            self.submit(pipeline, 1)
+        pipeline.workers = {}
+
+
+if __name__ == "__main__":
+    unittest.main()
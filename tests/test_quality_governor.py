@@ -0,0 +1,112 @@
+import unittest
+import main
+from modules.quality_governor import QUALITY_LEVELS, QualityGovernor
+
+
+class QualityGovernorTest(unittest.TestCase):
+    def setUp(self):
+        self.governor = QualityGovernor(target_fps=20, time_constant=0.0, hold_seconds=1.0,
+                                        max_hold_seconds=8.0, settle_frames=2)
+        self.fps = 20
+        self.frame = 0
+
+    def observe(self, latency):
+        timestamp = self.frame / self.fps
+        self.frame += 1
+        return timestamp, self.governor.observe(latency, timestamp)
+
+    def feed(self, latency, seconds):
+        """Observe `seconds` of frames at `latency` each and return the (timestamp, level) of every change."""
+        changes = []
+        for _ in range(int(round(seconds * self.fps))):
+            timestamp, settings = self.observe(latency)
+            if settings is not None:
+                changes.append((timestamp, self.governor.level))
+        return changes
+
+    def until_change(self, latency, limit=60.0):
+        """Observe frames at `latency` until the level changes; return the time since the previous frame."""
+        start = (self.frame - 1) / self.fps
+        while self.frame / self.fps - start < limit:
+            timestamp, settings = self.observe(latency)
+            if settings is not None:
+                return timestamp - start
+        self.fail(f"No level change within {limit}s")
+
+    def test_holds_quality_at_target(self):
+        self.assertEqual(self.feed(1 / 25, 10), [])
+        self.assertEqual(self.governor.level, 0)
+
+    def test_steps_down_one_level_per_hold(self):
+        self.assertEqual(self.feed(1 / 10, 3.5), [(1.0, 1), (2.0, 2), (3.0, 3)])
+        self.assertEqual(self.governor.settings, QUALITY_LEVELS[3])
+
+    def test_stops_at_cheapest_level(self):
+        self.feed(1.0, 30)
+        self.assertEqual(self.governor.level, len(QUALITY_LEVELS) - 1)
+
+    def test_steps_up_when_there_is_headroom(self):
+        self.until_change(1 / 10)
+        self.assertEqual(self.governor.level, 1)
+        self.assertEqual(self.feed(1 / 40, 1.5), [(2.0, 0)])
+
+    def test_ignores_frames_while_settling(self):
+        self.until_change(1 / 10)
+        # A latency spike right after a change, e.g. while a graph is rebuilt, is not measured
+        self.feed(10.0, self.governor.settle_frames / self.fps)
+        self.assertIsNone(self.governor.latency.value)
+        self.feed(1 / 25, 5.0)
+        self.assertEqual(self.governor.level, 1)
+
+    def test_oscillation_doubles_wait_before_next_rise(self):
+        self.until_change(1 / 10)
+        self.assertAlmostEqual(self.until_change(1 / 40), 1.0)
+        # Level 0 cannot hold the target after all
+        self.until_change(1 / 10)
+        self.assertEqual((self.governor.level, self.governor.up_hold), (1, 2.0))
+        self.assertAlmostEqual(self.until_change(1 / 40), 2.0)
+
+    def test_hold_is_capped(self):
+        for _ in range(6):
+            self.until_change(1 / 10)
+            self.until_change(1 / 40)
+        self.assertEqual(self.governor.up_hold, 8.0)
+
+    def test_drop_after_a_long_stay_resets_hold(self):
+        for _ in range(3):
+            self.until_change(1 / 10)
+            self.until_change(1 / 40)
+        self.assertEqual(self.governor.up_hold, 4.0)
+        # A drop is only seen as an oscillation within max_hold_seconds of the rise
+        self.feed(1 / 25, 10.0)
+        self.until_change(1 / 10)
+        self.assertEqual(self.governor.up_hold, 1.0)
+
+    def test_measures_stream_frame_rate(self):
+        self.assertEqual(self.governor.stream_fps, 20)
+        self.fps = 30
+        self.feed(1 / 40, 2.0)
+        self.assertAlmostEqual(self.governor.stream_fps, 30.0)
+
+
+class SlowerCadenceTest(unittest.TestCase):
+    def test_configured_rate_slower_than_level_is_kept(self):
+        # 2 Hz on a 30 fps stream is every 15 frames, far slower than the level's every 2 frames
+        self.assertEqual(main.slower_cadence({"hz": 2.0}, {"every": 2}, 30.0), {"hz": 2.0})
+
+    def test_level_slower_than_configured_rate_wins(self):
+        self.assertEqual(main.slower_cadence({"hz": 20.0}, {"every": 3}, 30.0), {"every": 3})
+        self.assertEqual(main.slower_cadence({"every": 2}, {"hz": 5.0}, 30.0), {"hz": 5.0})
+
+    def test_frame_counts_compare_directly(self):
+        self.assertEqual(main.slower_cadence({"every": 4}, {"every": 2}, 30.0), {"every": 4})
+        self.assertEqual(main.slower_cadence({"every": 2}, {"every": 3}, 30.0), {"every": 3})
+
+    def test_missing_rules(self):
+        self.assertEqual(main.slower_cadence(None, {"every": 2}, 30.0), {"every": 2})
+        self.assertEqual(main.slower_cadence({"hz": 2.0}, None, 30.0), {"hz": 2.0})
+        self.assertIsNone(main.slower_cadence(None, None, 30.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
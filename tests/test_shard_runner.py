@@ -0,0 +1,117 @@
+import os
+import queue
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+import cv2
+import numpy as np
+from modules import shard_runner
+from modules.shard_runner import Shard, ShardRunner, check_shard, find_videos, merge_parts, plan_shards
+
+
+def write_video(path, frames, fps=10):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (64, 48))
+    for _ in range(frames):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+
+class ShardRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_plan_shards_covers_video_without_gaps(self):
+        video_path = os.path.join(self.path, "drive.mp4")
+        write_video(video_path, 95)
+        shards = plan_shards(video_path, shard_seconds=3.0, overlap_seconds=1.0)
+        # The last shard reads to the end of the file, whatever the frame count says
+        self.assertEqual([(shard.start_frame, shard.end_frame) for shard in shards],
+                         [(0, 30), (30, 60), (60, 90), (90, None)])
+        self.assertEqual([shard.index for shard in shards], [0, 1, 2, 3])
+        # The first shard has nothing before it to warm up on
+        self.assertEqual([shard.warmup_frames for shard in shards], [0, 10, 10, 10])
+        self.assertEqual(sum(shard.frames for shard in shards), 95)
+
+    def test_plan_shards_single_shard_for_short_video(self):
+        video_path = os.path.join(self.path, "short.mp4")
+        write_video(video_path, 12)
+        shards = plan_shards(video_path, shard_seconds=300.0, overlap_seconds=10.0)
+        self.assertEqual(len(shards), 1)
+        self.assertEqual((shards[0].start_frame, shards[0].end_frame, shards[0].warmup_frames, shards[0].frames),
+                         (0, None, 0, 12))
+
+    def test_plan_shards_without_frame_count(self):
+        video_path = os.path.join(self.path, "stream.mp4")
+        write_video(video_path, 12)
+        with mock.patch.object(shard_runner.cv2.VideoCapture, "get",
+                               side_effect=lambda prop: 0.0 if prop == cv2.CAP_PROP_FRAME_COUNT else 10.0):
+            shards = plan_shards(video_path, shard_seconds=3.0, overlap_seconds=1.0)
+        # An unknown frame count still gives one shard that reads the whole file
+        self.assertEqual([(shard.start_frame, shard.end_frame, shard.frames) for shard in shards], [(0, None, 0)])
+
+    def test_check_shard_logs_plan_mismatch(self):
+        shard = Shard("drive.mp4", 1, 30, 60, 10, 30)
+        with self.assertNoLogs("modules.shard_runner"):
+            check_shard(shard, 30, shard_runner.logging.getLogger("modules.shard_runner"))
+        with self.assertLogs("modules.shard_runner", "WARNING") as logs:
+            check_shard(shard, 25, shard_runner.logging.getLogger("modules.shard_runner"))
+        self.assertIn("read 25 of its 30 frames", logs.output[0])
+        last = Shard("drive.mp4", 2, 60, None, 10, 35)
+        with self.assertLogs("modules.shard_runner", "WARNING") as logs:
+            check_shard(last, 41, shard_runner.logging.getLogger("modules.shard_runner"))
+        self.assertIn("read 41 frames, 35 planned", logs.output[0])
+
+    def test_progress_reports_are_merged_per_shard(self):
+        runner = ShardRunner("model.keras", workers=2)
+        reports = queue.Queue()
+        for report in [("a", 32), ("b", 32), ("a", 64), ("a", 32)]:
+            reports.put(report)
+        shard_frames = {}
+        runner._drain_progress(reports, shard_frames)
+        self.assertEqual(shard_frames, {"a": 64, "b": 32})
+        with self.assertLogs("modules.shard_runner", "INFO") as logs:
+            runner._report_progress("1/4 shards done", shard_frames, 200, time.perf_counter() - 2.0)
+        self.assertRegex(logs.output[0], r"1/4 shards done: 96/200 frames, 4\d\.\d fps, ETA \ds")
+
+    def test_plan_shards_missing_video(self):
+        with self.assertRaises(IOError):
+            plan_shards(os.path.join(self.path, "missing.mp4"))
+
+    def test_merge_csv_parts_keeps_first_header(self):
+        parts = []
+        for i, rows in enumerate([["1,a", "2,b"], ["3,c"], ["4,d"]]):
+            part_path = os.path.join(self.path, f"part_{i}.csv")
+            with open(part_path, "w", newline="") as part:
+                part.write("frame,value\r\n" + "".join(f"{row}\r\n" for row in rows))
+            parts.append(part_path)
+        output_path = os.path.join(self.path, "timeline.csv")
+        merge_parts(parts, output_path, "csv")
+        with open(output_path, newline="") as output:
+            self.assertEqual(output.read(), "frame,value\r\n1,a\r\n2,b\r\n3,c\r\n4,d\r\n")
+
+    def test_merge_jsonl_parts_in_order(self):
+        parts = []
+        for i in range(3):
+            part_path = os.path.join(self.path, f"part_{i}.jsonl")
+            with open(part_path, "w") as part:
+                part.write(f'{{"frame": {i}}}\n')
+            parts.append(part_path)
+        output_path = os.path.join(self.path, "timeline.jsonl")
+        merge_parts(parts, output_path, "jsonl")
+        with open(output_path) as output:
+            self.assertEqual(output.read().splitlines(), ['{"frame": 0}', '{"frame": 1}', '{"frame": 2}'])
+
+    def test_find_videos_expands_directories(self):
+        for name in ("b.mp4", "a.MOV", "notes.txt"):
+            open(os.path.join(self.path, name), "w").close()
+        self.assertEqual(find_videos([self.path, "other.avi"]),
+                         [os.path.join(self.path, "a.MOV"), os.path.join(self.path, "b.mp4"), "other.avi"])
+
+
+if __name__ == "__main__":
+    unittest.main()
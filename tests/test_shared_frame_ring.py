@@ -0,0 +1,75 @@
+import multiprocessing
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from modules.shared_frame_ring import SharedFrameRing
+
+
+def _read_and_mark(spec, index, frame_id):
+    """Worker: sum a slot, then write into the same slot so the owner can see it."""
+    ring = SharedFrameRing.attach(spec)
+    try:
+        frame = ring.read(index, frame_id)
+        if frame is None:
+            return None
+        total = int(frame.sum(dtype=np.int64))
+        frame[0, 0] = 7
+        return total
+    finally:
+        ring.close()
+
+
+class SharedFrameRingTest(unittest.TestCase):
+    def setUp(self):
+        self.ring = SharedFrameRing(3, (4, 5, 3))
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_attached_ring_shares_slots(self):
+        reader = SharedFrameRing.attach(self.ring.spec())
+        try:
+            self.ring.slot(1)[:] = 9
+            self.ring.publish(1, 42)
+            frame = reader.read(1, 42)
+            np.testing.assert_array_equal(frame, np.full((4, 5, 3), 9, dtype=np.uint8))
+            # Reads are views of the block, not copies
+            self.ring.slot(1)[0, 0, 0] = 1
+            self.assertEqual(frame[0, 0, 0], 1)
+            del frame
+        finally:
+            reader.close()
+
+    def test_unpublished_and_reused_slots_read_as_none(self):
+        self.assertIsNone(self.ring.read(0, 0))
+        self.ring.publish(0, 5)
+        self.ring.publish(0, 8)
+        self.assertIsNone(self.ring.read(0, 5))
+        self.assertIsNotNone(self.ring.read(0, 8))
+
+    def test_spec_round_trip(self):
+        ring = SharedFrameRing(2, (2, 2), dtype=np.float32)
+        try:
+            spec = ring.spec()
+            self.assertEqual((spec["slots"], spec["shape"], np.dtype(spec["dtype"])), (2, (2, 2), np.float32))
+            reader = SharedFrameRing.attach(spec)
+            self.assertEqual(reader.frames.dtype, np.float32)
+            self.assertFalse(reader.owner)
+            reader.close()
+        finally:
+            ring.close()
+
+    def test_spawned_process_reads_and_writes_slot(self):
+        self.ring.slot(2)[:] = 2
+        self.ring.publish(2, 11)
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            self.assertEqual(pool.submit(_read_and_mark, self.ring.spec(), 2, 11).result(), 2 * 4 * 5 * 3)
+            self.assertIsNone(pool.submit(_read_and_mark, self.ring.spec(), 2, 10).result())
+        # The worker's write is visible here, and its exit did not free the block
+        np.testing.assert_array_equal(self.ring.read(2, 11)[0, 0], [7, 7, 7])
+        reader = SharedFrameRing.attach(self.ring.spec())
+        reader.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
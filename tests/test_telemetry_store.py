@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from modules import telemetry_store as telemetry
+from modules.telemetry_store import TelemetryRecorder, TelemetryStore
+
+
+class TelemetryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def record(self, frames=100, chunk_records=30, fps=10.0, alert_frames=()):
+        recorder = TelemetryRecorder(self.path, chunk_records=chunk_records, flush_every=7)
+        recorder.set_frame_size(640, 480)
+        pose = np.full((33, 3), 0.5)
+        for i in range(frames):
+            alerts = telemetry.ALERT_HEAD_TILT if i in alert_frames else 0
+            recorder.append(i / fps, 0.25 if i % 2 else None, alerts, telemetry.FLAG_PERSON_VISIBLE, pose,
+                            np.full((3, 21, 3), 0.25))
+        recorder.close()
+        return TelemetryStore(self.path)
+
+    def test_records_round_trip_across_chunks(self):
+        store = self.record()
+        self.assertEqual(len(store), 100)
+        self.assertEqual(len(store.index["chunks"]), 4)
+        self.assertEqual(store.time_range(), (0.0, 9.9))
+        records = store.query()
+        np.testing.assert_allclose(records["timestamp"], np.arange(100) / 10.0)
+        self.assertTrue(np.isnan(records["fatigue_score"][0]))
+        self.assertAlmostEqual(float(records["fatigue_score"][1]), 0.25)
+        # Only MAX_HANDS hands are kept
+        self.assertEqual(records["hands"].shape[1:], (telemetry.MAX_HANDS, 21, 3))
+        self.assertEqual((store.width, store.height), (640, 480))
+
+    def test_time_range_query_is_inclusive(self):
+        records = self.record().query(start=2.95, end=5.0)
+        np.testing.assert_allclose(records["timestamp"], np.arange(30, 51) / 10.0)
+
+    def test_alert_query_only_opens_matching_chunks(self):
+        store = self.record(alert_frames=(35, 36, 80))
+        self.assertEqual([entry["file"] for entry in store.matching_chunks(alerts=telemetry.ALERT_HEAD_TILT)],
+                         ["chunk_000001.npy", "chunk_000002.npy"])
+        records = store.query(alerts=telemetry.ALERT_HEAD_TILT)
+        np.testing.assert_allclose(records["timestamp"], [3.5, 3.6, 8.0])
+        self.assertEqual(len(store.query(alerts=telemetry.ALERT_FATIGUE)), 0)
+
+    def test_empty_query(self):
+        store = self.record()
+        self.assertEqual(len(store.query(start=100.0)), 0)
+        self.assertEqual(store.query(start=100.0).dtype, telemetry.RECORD_DTYPE)
+
+    def test_reopened_store_appends(self):
+        self.record(frames=10)
+        recorder = TelemetryRecorder(self.path, chunk_records=30)
+        recorder.append(1.0)
+        recorder.close()
+        store = TelemetryStore(self.path)
+        self.assertEqual(len(store), 11)
+        self.assertEqual(store.time_range(), (0.0, 1.0))
+
+    def test_index_is_readable_before_close(self):
+        recorder = TelemetryRecorder(self.path, chunk_records=30, flush_every=5)
+        for i in range(12):
+            recorder.append(float(i))
+        # Flushed after 10 records; the last 2 are not in the index yet
+        self.assertEqual(len(TelemetryStore(self.path)), 10)
+        recorder.close()
+        self.assertTrue(os.path.exists(os.path.join(self.path, telemetry.INDEX_FILE)))
+
+    def test_first_frame_size_is_kept(self):
+        recorder = TelemetryRecorder(self.path)
+        recorder.set_frame_size(1280, 720)
+        recorder.set_frame_size(640, 480)
+        recorder.close()
+        store = TelemetryStore(self.path)
+        self.assertEqual((store.width, store.height), (1280, 720))
+
+    def test_alert_mask_round_trip(self):
+        mask = telemetry.alert_mask(["head tilt", "hands_off_wheel"])
+        self.assertEqual(mask, telemetry.ALERT_HEAD_TILT | telemetry.ALERT_HANDS_OFF_WHEEL)
+        self.assertEqual(telemetry.alert_names(mask), ["head tilt", "hands off wheel"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+from modules.temporal import ExponentialMovingAverage, SlidingWindowRatio, SustainedCondition
+
+
+class SustainedConditionTest(unittest.TestCase):
+    def test_measures_time_since_condition_started(self):
+        timer = SustainedCondition()
+        self.assertIsNone(timer.update(False, 0.0))
+        self.assertEqual(timer.update(True, 1.0), 0.0)
+        self.assertEqual(timer.update(True, 2.5), 1.5)
+        self.assertIsNone(timer.update(False, 3.0))
+        self.assertEqual(timer.update(True, 4.0), 0.0)
+
+    def test_reset_restarts_timer(self):
+        timer = SustainedCondition()
+        timer.update(True, 0.0)
+        timer.reset()
+        self.assertEqual(timer.update(True, 5.0), 0.0)
+
+
+class SlidingWindowRatioTest(unittest.TestCase):
+    def test_matches_brute_force_window(self):
+        rng = np.random.default_rng(1)
+        ratio = SlidingWindowRatio(window=2.0, capacity=1000)
+        timestamps = np.cumsum(rng.uniform(0.01, 0.3, 500))
+        values = rng.random(500) < 0.4
+        for i, (value, timestamp) in enumerate(zip(values, timestamps)):
+            inside = timestamp - timestamps[:i + 1] <= 2.0
+            self.assertAlmostEqual(ratio.update(value, timestamp), values[:i + 1][inside].mean())
+
+    def test_capacity_drops_oldest_samples(self):
+        ratio = SlidingWindowRatio(window=60.0, capacity=4)
+        for timestamp in range(4):
+            ratio.update(True, float(timestamp))
+        self.assertEqual(ratio.update(False, 4.0), 0.75)
+        self.assertEqual(ratio.size, 4)
+        for timestamp in range(5, 8):
+            ratio.update(False, float(timestamp))
+        self.assertEqual(ratio.ratio, 0.0)
+
+    def test_reset(self):
+        ratio = SlidingWindowRatio(window=1.0, capacity=8)
+        ratio.update(True, 0.0)
+        ratio.reset()
+        self.assertEqual(ratio.ratio, 0.0)
+        self.assertEqual(ratio.update(False, 10.0), 0.0)
+
+
+class ExponentialMovingAverageTest(unittest.TestCase):
+    def test_independent_of_frame_rate(self):
+        # One second of a step input gives the same average at 10 fps and 60 fps
+        values = []
+        for fps in (10, 60):
+            average = ExponentialMovingAverage(time_constant=0.5)
+            average.update(0.0, 0.0)
+            for frame in range(1, fps + 1):
+                value = average.update(1.0, frame / fps)
+            values.append(value)
+        self.assertAlmostEqual(values[0], values[1])
+        self.assertAlmostEqual(values[0], 1.0 - np.exp(-2.0))
+
+    def test_first_sample_and_zero_time_constant(self):
+        average = ExponentialMovingAverage(time_constant=0.0)
+        self.assertEqual(average.update(3.0, 0.0), 3.0)
+        self.assertEqual(average.update(5.0, 0.1), 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import numpy as np
+from modules import telemetry_store as telemetry
+from modules import threshold_replay as replay
+from modules.temporal import SustainedCondition
+
+
+def live_sustained(condition, timestamps, threshold):
+    timer = SustainedCondition()
+    held = [timer.update(active, timestamp) for active, timestamp in zip(condition, timestamps)]
+    return np.array([seconds is not None and seconds >= threshold for seconds in held])
+
+
+def make_features(timestamps, scores=None, flags=None):
+    count = len(timestamps)
+    nan = np.full(count, np.nan)
+    return replay.ReplayFeatures(
+        np.asarray(timestamps, dtype=np.float64),
+        np.asarray(scores if scores is not None else nan, dtype=np.float64),
+        np.asarray(flags if flags is not None else np.zeros(count), dtype=np.uint8),
+        np.zeros(count, dtype=np.uint8), nan, nan, nan, np.full((count, 2), np.nan), 100.0)
+
+
+class SustainedTest(unittest.TestCase):
+    def test_matches_sustained_condition(self):
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            count = int(rng.integers(1, 200))
+            condition = rng.random(count) < rng.uniform(0.2, 0.95)
+            # Irregular frame spacing, as from a camera dropping frames
+            timestamps = np.cumsum(rng.uniform(0.01, 0.2, count))
+            threshold = float(rng.uniform(0.0, 2.0))
+            np.testing.assert_array_equal(replay.sustained(condition, timestamps, threshold),
+                                          live_sustained(condition, timestamps, threshold))
+
+    def test_run_starting_on_first_frame(self):
+        condition = np.array([True, True, True, False, True])
+        timestamps = np.array([0.0, 1.0, 2.0, 3.0, 4.0])
+        np.testing.assert_array_equal(replay.sustained(condition, timestamps, 2.0),
+                                      [False, False, True, False, False])
+
+    def test_empty(self):
+        self.assertEqual(len(replay.sustained(np.zeros(0, bool), np.zeros(0), 1.0)), 0)
+
+
+class ReplayHelpersTest(unittest.TestCase):
+    def test_carry_forward_holds_last_evaluated_value(self):
+        values = np.array([False, True, False, False, False, False])
+        evaluated = np.array([False, True, False, True, False, False])
+        np.testing.assert_array_equal(replay.carry_forward(values, evaluated),
+                                      [False, True, True, False, False, False])
+
+    def test_summarize_alert(self):
+        active = np.array([False, True, True, False, True, False])
+        timestamps = np.array([10.0, 10.5, 11.0, 11.5, 12.0, 12.5])
+        self.assertEqual(replay.summarize_alert(active, timestamps),
+                         {"episodes": 2, "alert_seconds": 1.5, "first_onset": 0.5})
+        self.assertEqual(replay.summarize_alert(np.zeros(3, bool), timestamps[:3])["first_onset"], None)
+
+    def test_threshold_grid(self):
+        grid = replay.threshold_grid({"FATIGUE_THRESHOLD": [0.6, 0.7], "EYE_CLOSED_THRESHOLD": [1, 2, 3]})
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(grid[0], {"FATIGUE_THRESHOLD": 0.6, "EYE_CLOSED_THRESHOLD": 1})
+
+    def test_fatigue_skips_frames_without_a_score(self):
+        # The missing score at t=1 neither alerts nor resets the eye-closed timer
+        features = make_features([0.0, 1.0, 2.0, 3.0], scores=[0.9, np.nan, 0.9, 0.9])
+        np.testing.assert_array_equal(replay.evaluate_fatigue(features, replay.DEFAULT_THRESHOLDS),
+                                      [False, False, True, True])
+
+    def test_run_reports_every_setting(self):
+        timestamps = np.arange(0, 10, 0.5)
+        scores = np.where(timestamps < 5, 0.9, 0.1)
+        features = make_features(timestamps, scores)
+        rows = replay.ThresholdReplay(features).run({"EYE_CLOSED_THRESHOLD": [1, 4, 10]})
+        self.assertEqual([row["thresholds"]["EYE_CLOSED_THRESHOLD"] for row in rows], [1, 4, 10])
+        self.assertEqual([row["alerts"]["fatigue"]["alert_seconds"] for row in rows], [4.0, 1.0, 0.0])
+        self.assertEqual(rows[0]["alerts"]["hands off wheel"]["episodes"], 0)
+
+    def test_features_from_empty_store_range(self):
+        class EmptyStore:
+            width, height = 640, 480
+
+            def iter_chunks(self, start, end):
+                return iter(())
+
+        features = replay.ReplayFeatures.from_store(EmptyStore())
+        self.assertEqual(len(features), 0)
+        self.assertEqual(features.wheel_distances.shape, (0, telemetry.MAX_HANDS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,271 @@
+"""Per-stage latency benchmark of the monitoring pipeline on synthetic or recorded video.
+
+Runs each stage (frame context, model input, fatigue model, posture, hands, drawing) on its own and
+then the full `DriverMonitoringSystem.process_frame`, at several resolutions. Reports fps, p50/p95/p99
+latency per stage and peak RSS, writes them as JSON and optionally fails on a regression against a
+stored baseline. Needs no camera, display, audio device or GPU.
+
+Usage:
+    python -m tools.benchmark --resolutions 640x480 1280x720 1920x1080 --output benchmark.json
+    python -m tools.benchmark --video recordings/trip.mp4 --baseline benchmarks/baseline.json --threshold 0.15
+"""
+import os
+
+# Keep TensorFlow on the CPU and let pygame open a silent audio device; both must be set before import
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import datetime
+import json
+import logging
+import platform
+import resource
+import time
+import cv2
+import numpy as np
+from main import DriverMonitoringSystem
+from modules.frame_context import FrameContext
+from tools.synthetic_video import generate_frames
+
+STAGES = ["context", "model_input", "fatigue", "posture", "hands", "visualize", "process_frame"]
+VIDEO_FPS = 30.0
+
+
+def parse_resolution(value):
+    """Parse "WIDTHxHEIGHT" into a (width, height) tuple."""
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def video_frames(path, count):
+    """Yield up to `count` frames of a recorded video."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video file {path}")
+    try:
+        for _ in range(count):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (ru_maxrss is in KB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def summarize(latencies_ms):
+    """Reduce per-frame latencies in ms to fps and percentiles."""
+    latencies = np.asarray(latencies_ms, dtype=np.float64)
+    if latencies.size == 0:
+        return {"frames": 0}
+    mean = float(latencies.mean())
+    return {
+        "frames": int(latencies.size),
+        "fps": round(1000.0 / mean, 2) if mean > 0 else 0.0,
+        "mean_ms": round(mean, 3),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "max_ms": round(float(latencies.max()), 3)
+    }
+
+
+class PipelineBenchmark:
+    """Time every pipeline stage of one DriverMonitoringSystem over a stream of frames."""
+
+    def __init__(self, system, warmup=10):
+        self.logger = logging.getLogger(__name__)
+        self.system = system
+        self.warmup = warmup
+
+    def run_stages(self, frames):
+        """Run each stage on its own for every frame and return per-stage latencies in ms."""
+        system = self.system
+        # Every pass restarts its timestamps at 0, so timers and tracking from the last pass must not carry over
+        system.reset()
+        context = FrameContext(keep_frame=True)
+        latencies = {stage: [] for stage in STAGES[:-1]}
+
+        for index, frame in enumerate(frames):
+            timestamp = index / VIDEO_FPS
+            timings = {}
+
+            start = time.perf_counter()
+            context.update(frame, timestamp)
+            timings["context"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            model_input = system.fatigue_detector.preprocess_for_model(context)
+            timings["model_input"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            scores = system.fatigue_detector.predict_batch(model_input)
+            timings["fatigue"] = time.perf_counter() - start
+            fatigue_alert = system.fatigue_detector.check_fatigue_alert(
+                scores[0] if scores is not None else None, timestamp)
+
+            start = time.perf_counter()
+            posture_result = system.posture_analyzer.detect_posture(context, timestamp)
+            timings["posture"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            hands_info = system.hand_detector.detect_hands(
+                context, system.posture_analyzer.get_last_pose_result(), timestamp)
+            timings["hands"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            self.draw(context.frame, fatigue_alert, posture_result, hands_info)
+            timings["visualize"] = time.perf_counter() - start
+
+            if index >= self.warmup:
+                for stage, seconds in timings.items():
+                    latencies[stage].append(seconds * 1000.0)
+        return latencies
+
+    def draw(self, frame, fatigue_alert, posture_result, hands_info):
+        """Draw every overlay the way process_frame does."""
+        visualizer = self.system.visualizer
+        issues = posture_result.issues
+        visualizer.draw_pose(frame, posture_result)
+        visualizer.draw_hands(frame, hands_info)
+        visualizer.draw_face_status(frame, fatigue_alert, issues)
+        visualizer.draw_posture_status(frame, issues)
+        visualizer.draw_hands_status(frame, hands_info, issues)
+        visualizer.draw_summary(frame, fatigue_alert, issues, posture_result.person_visible, hands_info)
+
+    def run_process_frame(self, frames):
+        """Run the full process_frame on every frame and return its latencies in ms."""
+        latencies = []
+        self.system.reset()
+        for index, frame in enumerate(frames):
+            start = time.perf_counter()
+            self.system.process_frame(frame, index / VIDEO_FPS)
+            elapsed = time.perf_counter() - start
+            if index >= self.warmup:
+                latencies.append(elapsed * 1000.0)
+        return latencies
+
+    def run(self, make_frames):
+        """Benchmark all stages; `make_frames` returns a fresh frame iterator for each pass."""
+        latencies = self.run_stages(make_frames())
+        latencies["process_frame"] = self.run_process_frame(make_frames())
+        return {stage: summarize(latencies[stage]) for stage in STAGES}
+
+
+def compare_to_baseline(results, baseline, threshold, metric="p50_ms"):
+    """Return a list of regressions where `metric` or peak RSS grew by more than `threshold`."""
+    regressions = []
+    for name, current in results["runs"].items():
+        reference = baseline.get("runs", {}).get(name)
+        if reference is None:
+            continue
+        for stage, stats in current["stages"].items():
+            old = reference["stages"].get(stage, {}).get(metric)
+            new = stats.get(metric)
+            if old and new is not None and new > old * (1 + threshold):
+                regressions.append(f"{name} {stage} {metric}: {old:.2f} -> {new:.2f} (+{(new / old - 1):.0%})")
+        old_rss, new_rss = reference.get("peak_rss_mb"), current.get("peak_rss_mb")
+        if old_rss and new_rss is not None and new_rss > old_rss * (1 + threshold):
+            regressions.append(f"{name} peak RSS: {old_rss:.0f} MB -> {new_rss:.0f} MB (+{(new_rss / old_rss - 1):.0%})")
+    return regressions
+
+
+def write_json(path, results):
+    """Write results to `path`, creating its directory (e.g. benchmarks/) if needed."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def print_report(results):
+    print(f"{'run':<12} {'stage':<14} {'fps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, run in results["runs"].items():
+        for stage, stats in run["stages"].items():
+            if not stats.get("frames"):
+                continue
+            print(f"{name:<12} {stage:<14} {stats['fps']:>9.1f} {stats['p50_ms']:>9.2f} "
+                  f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+        print(f"{name:<12} {'peak RSS':<14} {run['peak_rss_mb']:>9.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the monitoring pipeline stage by stage")
+    parser.add_argument("--model", default="models/best_fatigue_model.keras", help="Path to the fatigue model")
+    parser.add_argument("--backend", choices=["keras", "tflite", "onnx"], help="Fatigue inference backend")
+    parser.add_argument("--sound", default="sounds/alert_sound.wav", help="Path to the alert sound")
+    parser.add_argument("--resolutions", nargs="+", default=["640x480", "1280x720", "1920x1080"],
+                        help="Synthetic video resolutions as WIDTHxHEIGHT")
+    parser.add_argument("--video", help="Benchmark a recorded fixture video instead of synthetic frames")
+    parser.add_argument("--frames", type=int, default=200, help="Frames per pass, including warm-up")
+    parser.add_argument("--warmup", type=int, default=20, help="Leading frames excluded from the statistics")
+    parser.add_argument("--headless", action="store_true", help="Benchmark process_frame without drawing")
+    parser.add_argument("--output", default="benchmark.json", help="Results JSON path")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Allowed relative slowdown before a stage counts as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="Also write the results to --baseline")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    system = DriverMonitoringSystem(args.model, args.sound, fatigue_backend=args.backend, render=not args.headless)
+    benchmark = PipelineBenchmark(system, args.warmup)
+
+    if args.video:
+        sources = {os.path.basename(args.video): lambda: video_frames(args.video, args.frames)}
+    else:
+        sources = {}
+        for value in args.resolutions:
+            width, height = parse_resolution(value)
+            sources[f"{width}x{height}"] = lambda w=width, h=height: generate_frames(w, h, args.frames)
+
+    results = {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "opencv": cv2.__version__,
+            "model": args.model,
+            "backend": system.fatigue_detector.backend.name,
+            "frames": args.frames,
+            "warmup": args.warmup,
+            "headless": args.headless
+        },
+        "runs": {}
+    }
+    try:
+        for name, make_frames in sources.items():
+            stages = benchmark.run(make_frames)
+            # ru_maxrss only ever grows, so this is the peak up to and including this run
+            results["runs"][name] = {"stages": stages, "peak_rss_mb": round(peak_rss_mb(), 1)}
+    finally:
+        system.cleanup()
+
+    write_json(args.output, results)
+    print_report(results)
+    print(f"Results written to {args.output}")
+
+    if args.baseline and args.save_baseline:
+        write_json(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            raise SystemExit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
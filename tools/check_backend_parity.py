@@ -0,0 +1,80 @@
+"""Compare exported fatigue models against the Keras reference for score drift and latency.
+
+Usage:
+    python -m tools.check_backend_parity models/best_fatigue_model_float16.tflite \
+        models/best_fatigue_model_int8.tflite models/best_fatigue_model.onnx --frames recordings/trip.mp4
+"""
+import argparse
+import logging
+import time
+import numpy as np
+from modules.fatigue_detector import fatigue_scores, prepare_model_input
+from modules.inference_backends import create_backend
+from tools.sample_frames import load_sample_frames
+
+FATIGUE_THRESHOLD = 0.70
+
+
+def measure_backend(backend, frames, warmup=5):
+    """Score every frame one at a time and return (scores, per-frame latencies in ms)."""
+    inputs = [prepare_model_input(frame, backend.input_size).astype(np.float32) for frame in frames]
+    for model_input in inputs[:warmup]:
+        backend.predict(model_input)
+
+    scores, latencies = [], []
+    for model_input in inputs:
+        start = time.perf_counter()
+        prediction = backend.predict(model_input)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        scores.append(fatigue_scores(prediction)[0])
+    return np.asarray(scores, dtype=np.float32), np.asarray(latencies)
+
+
+def compare_backends(reference_path, candidate_paths, frames):
+    """Return one report row per backend, the reference first."""
+    reference = create_backend(reference_path, "keras")
+    reference_scores, reference_latencies = measure_backend(reference, frames)
+    reports = [{
+        "model": reference_path, "backend": reference.name, "max_drift": 0.0, "mean_drift": 0.0,
+        "decision_agreement": 1.0, "p50_ms": float(np.percentile(reference_latencies, 50)),
+        "p95_ms": float(np.percentile(reference_latencies, 95))
+    }]
+
+    for path in candidate_paths:
+        backend = create_backend(path)
+        scores, latencies = measure_backend(backend, frames)
+        drift = np.abs(scores - reference_scores)
+        agreement = np.mean((scores >= FATIGUE_THRESHOLD) == (reference_scores >= FATIGUE_THRESHOLD))
+        reports.append({
+            "model": path, "backend": backend.name, "max_drift": float(drift.max()),
+            "mean_drift": float(drift.mean()), "decision_agreement": float(agreement),
+            "p50_ms": float(np.percentile(latencies, 50)), "p95_ms": float(np.percentile(latencies, 95))
+        })
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check exported fatigue models against the Keras reference")
+    parser.add_argument("candidates", nargs="+", help="Exported .tflite / .onnx models to check")
+    parser.add_argument("--reference", default="models/best_fatigue_model.keras", help="Keras reference model")
+    parser.add_argument("--frames", help="Video file or image directory to sample frames from (default: random)")
+    parser.add_argument("--count", type=int, default=100, help="Number of frames to score")
+    parser.add_argument("--max-drift", type=float, default=0.05,
+                        help="Fail when any backend drifts more than this from the reference")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    frames = load_sample_frames(args.frames, args.count)
+    reports = compare_backends(args.reference, args.candidates, frames)
+
+    print(f"{'backend':<8} {'max drift':>10} {'mean drift':>11} {'agreement':>10} {'p50 ms':>8} {'p95 ms':>8}  model")
+    for report in reports:
+        print(f"{report['backend']:<8} {report['max_drift']:>10.4f} {report['mean_drift']:>11.4f} "
+              f"{report['decision_agreement']:>10.2%} {report['p50_ms']:>8.2f} {report['p95_ms']:>8.2f}  {report['model']}")
+
+    if any(report["max_drift"] > args.max_drift for report in reports):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Export the Keras fatigue model to TFLite (float16 / int8) and ONNX artifacts.
+
+Usage:
+    python -m tools.export_model --calibration recordings/trip.mp4
+"""
+import argparse
+import logging
+import os
+import numpy as np
+from modules.fatigue_detector import prepare_model_input
+from tools.sample_frames import load_sample_frames
+
+logger = logging.getLogger(__name__)
+
+
+def export_tflite(model, output_path, quantization="float16", calibration_frames=None):
+    """Convert a loaded Keras model to a TFLite flatbuffer with the requested quantization."""
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantization == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        if not calibration_frames:
+            raise ValueError("int8 quantization needs calibration frames")
+        input_size = tuple(model.input_shape[1:3])
+
+        def representative_dataset():
+            for frame in calibration_frames:
+                yield [prepare_model_input(frame, input_size).astype(np.float32)]
+
+        # Weights and activations are int8; the model keeps a float32 input/output interface
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    elif quantization != "float32":
+        raise ValueError(f"Unsupported quantization: {quantization}")
+
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+    logger.info(f"Wrote {quantization} TFLite model to {output_path} ({os.path.getsize(output_path) / 1e6:.2f} MB)")
+    return output_path
+
+
+def export_onnx(model, output_path, opset=13):
+    """Convert a loaded Keras model to ONNX with a dynamic batch dimension."""
+    import tensorflow as tf
+    import tf2onnx
+
+    input_signature = [tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name="input")]
+    tf2onnx.convert.from_keras(model, input_signature=input_signature, opset=opset, output_path=output_path)
+    logger.info(f"Wrote ONNX model to {output_path} ({os.path.getsize(output_path) / 1e6:.2f} MB)")
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the fatigue model to TFLite and ONNX")
+    parser.add_argument("--model", default="models/best_fatigue_model.keras", help="Keras model to export")
+    parser.add_argument("--output-dir", default="models", help="Directory for the exported artifacts")
+    parser.add_argument("--formats", nargs="+", default=["float16", "int8", "onnx"],
+                        choices=["float32", "float16", "int8", "onnx"], help="Artifacts to produce")
+    parser.add_argument("--calibration", help="Video file or image directory for int8 calibration")
+    parser.add_argument("--calibration-frames", type=int, default=200, help="Number of calibration frames")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    # Checked before anything is exported, so a missing flag does not leave a partial set of artifacts
+    calibration_frames = None
+    if "int8" in args.formats:
+        if args.calibration is None:
+            parser.error("--calibration is required for int8 export; pass it or leave int8 out of --formats")
+        calibration_frames = load_sample_frames(args.calibration, args.calibration_frames)
+
+    from tensorflow.keras.models import load_model
+
+    model = load_model(args.model)
+    os.makedirs(args.output_dir, exist_ok=True)
+    stem = os.path.join(args.output_dir, os.path.splitext(os.path.basename(args.model))[0])
+
+    for export_format in args.formats:
+        if export_format == "onnx":
+            export_onnx(model, f"{stem}.onnx")
+            continue
+
+        export_tflite(model, f"{stem}_{export_format}.tflite", export_format,
+                      calibration_frames if export_format == "int8" else None)
+
+
+if __name__ == "__main__":
+    main()
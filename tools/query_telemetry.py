@@ -0,0 +1,50 @@
+"""Query a telemetry store recorded with `main.py run --telemetry DIR`.
+
+Usage:
+    python -m tools.query_telemetry telemetry/shift1 --start "2026-10-16 14:00" --end "2026-10-16 14:30" \
+        --alert "head tilt"
+"""
+import argparse
+import datetime
+import numpy as np
+from modules.telemetry_store import TelemetryStore, alert_mask, alert_names
+
+
+def parse_time(value):
+    """Accept epoch seconds or an ISO date/time in local time."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).timestamp()
+
+
+def format_time(seconds):
+    # Recorded videos store video time, which would otherwise show up as dates in 1970
+    if seconds < 10 ** 9:
+        return f"{seconds:.2f}s"
+    return datetime.datetime.fromtimestamp(seconds).isoformat(sep=" ", timespec="milliseconds")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query a telemetry store by time range and alert type")
+    parser.add_argument("store", help="Telemetry store directory")
+    parser.add_argument("--start", type=parse_time, help="Start time (epoch seconds or ISO date/time)")
+    parser.add_argument("--end", type=parse_time, help="End time (epoch seconds or ISO date/time)")
+    parser.add_argument("--alert", action="append", default=[],
+                        help="Only frames with this alert, e.g. fatigue, \"head tilt\", hands_off_wheel")
+    parser.add_argument("--limit", type=int, default=20, help="Matching frames to print")
+    args = parser.parse_args()
+
+    store = TelemetryStore(args.store)
+    mask = alert_mask(args.alert)
+    chunks = store.matching_chunks(args.start, args.end, mask)
+    records = store.query(args.start, args.end, mask)
+    print(f"{len(records)} matching frames from {len(chunks)} of {len(store.index['chunks'])} chunks")
+
+    for record in records[:args.limit]:
+        score = "" if np.isnan(record["fatigue_score"]) else f"{record['fatigue_score']:.3f}"
+        print(f"{format_time(record['timestamp'])}  score {score:>5}  {', '.join(alert_names(record['alerts']))}")
+
+
+if __name__ == "__main__":
+    main()
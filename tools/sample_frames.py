@@ -0,0 +1,46 @@
+import os
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def load_sample_frames(source=None, count=64, size=(480, 640)):
+    """Load up to `count` BGR frames from a video file or an image directory.
+
+    Frames are mirrored the same way DriverMonitoringSystem.process_frame mirrors them. Without a source, random noise frames of the given (height, width) are returned so the
+    tools still run on a box without any recordings.
+    """
+    if source is None:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 256, size=(*size, 3), dtype=np.uint8) for _ in range(count)]
+
+    frames = []
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                image = cv2.imread(os.path.join(source, name))
+                if image is not None:
+                    frames.append(image)
+            if len(frames) >= count:
+                break
+    else:
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            raise IOError(f"Cannot open video file {source}")
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or count
+        # Spread the samples over the whole recording instead of taking the first seconds
+        step = max(total // count, 1)
+        for frame_index in range(0, total, step):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+            if len(frames) >= count:
+                break
+        cap.release()
+
+    if not frames:
+        raise ValueError(f"No frames could be read from {source}")
+    return [cv2.flip(frame, 1) for frame in frames]
@@ -0,0 +1,90 @@
+"""Generate a synthetic cabin video: a cartoon driver swaying in front of a steering wheel.
+
+The frames are deterministic for a given seed so benchmark runs are comparable.
+
+Usage:
+    python -m tools.synthetic_video synthetic_720p.mp4 --width 1280 --height 720 --frames 300
+"""
+import argparse
+import math
+import cv2
+import numpy as np
+
+
+def generate_frames(width=1280, height=720, count=120, seed=0):
+    """Yield `count` BGR frames of a driver-like figure with a little motion and sensor noise."""
+    rng = np.random.default_rng(seed)
+    background = np.empty((height, width, 3), dtype=np.uint8)
+    background[:] = (70, 60, 55)
+    # Seats and windows: a few large flat shapes behind the driver
+    cv2.rectangle(background, (0, 0), (width, height // 3), (150, 140, 120), -1)
+    cv2.rectangle(background, (width // 5, height // 4), (4 * width // 5, height), (40, 40, 45), -1)
+
+    scale = height / 720.0
+    noise = np.empty((height, width, 3), dtype=np.int16)
+    for index in range(count):
+        frame = background.copy()
+        sway = math.sin(index / 15.0)
+        center_x = int(width / 2 + 40 * scale * sway)
+        head_y = int(height * 0.3 + 10 * scale * math.sin(index / 9.0))
+        shoulder_y = int(height * 0.5)
+        shoulder_half = int(150 * scale)
+
+        # Torso and arms reaching to the wheel
+        cv2.rectangle(frame, (center_x - shoulder_half, shoulder_y), (center_x + shoulder_half, height),
+                      (90, 60, 40), -1)
+        wheel_center = (width // 2, height // 2 + int(175 * scale))
+        for side in (-1, 1):
+            shoulder = (center_x + side * shoulder_half, shoulder_y + int(10 * scale))
+            hand = (wheel_center[0] + side * int(120 * scale), wheel_center[1] - int(40 * scale))
+            cv2.line(frame, shoulder, hand, (90, 60, 40), int(40 * scale))
+            cv2.circle(frame, hand, int(22 * scale), (120, 160, 210), -1)
+
+        # Head with eyes that close now and then
+        cv2.ellipse(frame, (center_x, head_y), (int(70 * scale), int(90 * scale)), 5 * sway, 0, 360,
+                    (120, 160, 210), -1)
+        eyes_closed = (index // 20) % 5 == 4
+        for side in (-1, 1):
+            eye = (center_x + side * int(28 * scale), head_y - int(15 * scale))
+            if eyes_closed:
+                cv2.line(frame, (eye[0] - int(12 * scale), eye[1]), (eye[0] + int(12 * scale), eye[1]), (30, 30, 30), 2)
+            else:
+                cv2.circle(frame, eye, int(9 * scale), (30, 30, 30), -1)
+        cv2.circle(frame, wheel_center, int(175 * scale), (20, 20, 20), int(18 * scale))
+
+        # Sensor noise so encoders and detectors do not see perfectly flat regions
+        noise[:] = rng.integers(-8, 9, size=noise.shape, dtype=np.int16)
+        yield np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def write_video(path, frames, fps=30.0):
+    """Write frames to an MP4 file and return the number of frames written."""
+    writer = None
+    written = 0
+    for frame in frames:
+        if writer is None:
+            height, width = frame.shape[:2]
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+        writer.write(frame)
+        written += 1
+    if writer is not None:
+        writer.release()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic driver video")
+    parser.add_argument("output", help="Output .mp4 path")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    written = write_video(args.output, generate_frames(args.width, args.height, args.frames, args.seed), args.fps)
+    print(f"Wrote {written} frames to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
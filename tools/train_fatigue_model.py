@@ -0,0 +1,221 @@
+"""Train compact fatigue models on the CPU and pick the most accurate one within a latency budget.
+
+Each variant is a small depthwise-separable CNN with global average pooling at a reduced input size. The
+report lists validation accuracy next to parameter count and measured single-frame CPU latency. The
+chosen model is exported with the scoring contract FatigueDetector expects: one sigmoid unit giving
+P(fatigue), output shape (N, 1).
+
+The dataset layout matches model.ipynb: one sub-directory of images per class.
+
+Usage:
+    python -m tools.train_fatigue_model dataset --variants 96:0.5 128:0.75 160:1.0 --epochs 30 \
+        --latency-budget-ms 5 --reference models/best_fatigue_model.keras
+"""
+import os
+
+# Train and time on the CPU the detector will run on; must be set before TensorFlow is imported
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import argparse
+import json
+import logging
+import time
+import numpy as np
+
+# (filters, stride) of the depthwise-separable blocks at width multiplier 1.0
+SEPARABLE_BLOCKS = [(32, 1), (64, 2), (64, 1), (128, 2), (128, 1), (256, 2), (256, 1)]
+
+
+def parse_variant(value):
+    """Parse "INPUT_SIZE:WIDTH", e.g. "128:0.75"."""
+    size, _, width = value.partition(":")
+    return int(size), float(width or 1.0)
+
+
+class CompactFatigueModelTrainer:
+    def __init__(self, data_dir, classes=("active", "fatigue"), batch_size=32, validation_split=0.2, seed=42):
+        # Initialize logging
+        logging.basicConfig(level=logging.INFO)
+        self.logger = logging.getLogger(__name__)
+
+        # Configuration
+        self.data_dir = data_dir
+        self.classes = list(classes)  # [negative, positive]; the model scores the second one
+        self.batch_size = batch_size
+        self.validation_split = validation_split
+        self.seed = seed
+
+    def create_model(self, input_size=128, width=1.0):
+        """Build a depthwise-separable CNN that outputs one fatigue logit."""
+        from tensorflow.keras import layers, Model
+
+        def filters(count):
+            return max(8, int(count * width))
+
+        inputs = layers.Input(shape=(input_size, input_size, 3))
+
+        # Strided stem halves the resolution right away
+        x = layers.Conv2D(filters(16), 3, strides=2, padding="same", use_bias=False)(inputs)
+        x = layers.BatchNormalization()(x)
+        x = layers.ReLU(6.0)(x)
+
+        for block_filters, stride in SEPARABLE_BLOCKS:
+            # Depthwise 3x3 per channel, then a 1x1 pointwise conv to mix channels
+            x = layers.DepthwiseConv2D(3, strides=stride, padding="same", use_bias=False)(x)
+            x = layers.BatchNormalization()(x)
+            x = layers.ReLU(6.0)(x)
+            x = layers.Conv2D(filters(block_filters), 1, use_bias=False)(x)
+            x = layers.BatchNormalization()(x)
+            x = layers.ReLU(6.0)(x)
+
+        # Global pooling instead of Flatten -> Dense keeps the head tiny at any input size
+        x = layers.GlobalAveragePooling2D()(x)
+        x = layers.Dropout(0.2)(x)
+        logits = layers.Dense(1, name="fatigue_logit")(x)
+        return Model(inputs, logits, name=f"compact_fatigue_{input_size}_{width:g}")
+
+    def setup_datasets(self, input_size):
+        """Training and validation datasets of RGB images scaled to [0, 1], like FatigueDetector's input."""
+        import tensorflow as tf
+
+        train, validation = tf.keras.utils.image_dataset_from_directory(
+            self.data_dir,
+            labels="inferred",
+            label_mode="binary",
+            class_names=self.classes,
+            image_size=(input_size, input_size),
+            batch_size=self.batch_size,
+            validation_split=self.validation_split,
+            subset="both",
+            seed=self.seed
+        )
+
+        # The live frame is mirrored, so horizontal flips are part of the augmentation
+        augment = tf.keras.Sequential([
+            tf.keras.layers.RandomFlip("horizontal"),
+            tf.keras.layers.RandomRotation(0.05),
+            tf.keras.layers.RandomZoom(0.15),
+            tf.keras.layers.RandomTranslation(0.1, 0.1),
+            tf.keras.layers.RandomContrast(0.2),
+        ])
+        scale = 1.0 / 255.0
+        train = train.map(lambda x, y: (augment(x * scale, training=True), y), num_parallel_calls=tf.data.AUTOTUNE)
+        validation = validation.map(lambda x, y: (x * scale, y), num_parallel_calls=tf.data.AUTOTUNE)
+        return train.prefetch(tf.data.AUTOTUNE), validation.cache().prefetch(tf.data.AUTOTUNE)
+
+    def train_variant(self, input_size, width, epochs=30):
+        """Train one variant and return its exported (sigmoid) model and validation accuracy."""
+        import tensorflow as tf
+
+        model = self.create_model(input_size, width)
+        model.compile(
+            optimizer=tf.keras.optimizers.Adam(1e-3),
+            loss=tf.keras.losses.BinaryCrossentropy(from_logits=True),
+            metrics=[tf.keras.metrics.BinaryAccuracy(name="accuracy", threshold=0.0)]
+        )
+        train, validation = self.setup_datasets(input_size)
+        model.fit(
+            train,
+            epochs=epochs,
+            validation_data=validation,
+            callbacks=[tf.keras.callbacks.EarlyStopping(monitor="val_accuracy", mode="max", patience=6,
+                                                        restore_best_weights=True)],
+            verbose=2
+        )
+        exported = self.export_model(model)
+        return exported, self.evaluate(exported, validation)
+
+    def export_model(self, model):
+        """Wrap the logit model with a sigmoid so it outputs P(fatigue) with shape (N, 1)."""
+        from tensorflow.keras import layers, Model
+
+        probability = layers.Activation("sigmoid", name="fatigue_probability")(model.output)
+        return Model(model.input, probability, name=model.name)
+
+    def evaluate(self, model, dataset, cutoff=0.5):
+        """Validation accuracy of a probability-output model."""
+        correct = total = 0
+        for images, labels in dataset:
+            probabilities = np.asarray(model.predict_on_batch(images))[:, 0]
+            correct += int(np.sum((probabilities >= cutoff) == (labels.numpy()[:, 0] >= 0.5)))
+            total += len(probabilities)
+        return correct / total if total else 0.0
+
+    def measure_latency(self, model, frames=200, warmup=20):
+        """Per-frame CPU latency in ms of one-frame inference, the way the live loop calls the model."""
+        frame = np.random.default_rng(0).random((1, *model.input_shape[1:]), dtype=np.float32)
+        for _ in range(warmup):
+            model.predict_on_batch(frame)
+        latencies = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            model.predict_on_batch(frame)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+        return {"p50_ms": round(float(np.percentile(latencies, 50)), 3),
+                "p95_ms": round(float(np.percentile(latencies, 95)), 3)}
+
+    def report_row(self, name, model, accuracy):
+        return {"model": name, "input_size": int(model.input_shape[1]), "params": int(model.count_params()),
+                "val_accuracy": round(float(accuracy), 4), **self.measure_latency(model)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train compact fatigue models and report accuracy vs. CPU latency")
+    parser.add_argument("data_dir", help="Dataset directory with one sub-directory per class")
+    parser.add_argument("--classes", nargs=2, default=["active", "fatigue"], metavar=("NEGATIVE", "POSITIVE"),
+                        help="Class directory names; the model scores the positive (fatigue) class")
+    parser.add_argument("--variants", nargs="+", default=["96:0.5", "128:0.75", "160:1.0"],
+                        help="INPUT_SIZE:WIDTH_MULTIPLIER per candidate model")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--latency-budget-ms", type=float,
+                        help="Only export models whose p95 single-frame latency is within this budget")
+    parser.add_argument("--reference", help="Existing Keras model to score on the same validation split")
+    parser.add_argument("--output", default="models/compact_fatigue_model.keras", help="Exported model path")
+    parser.add_argument("--report", default="models/compact_fatigue_report.json", help="Report JSON path")
+    args = parser.parse_args()
+
+    trainer = CompactFatigueModelTrainer(args.data_dir, args.classes, args.batch_size)
+    rows, models = [], {}
+
+    if args.reference:
+        from tensorflow.keras.models import load_model
+        reference = load_model(args.reference)
+        _, validation = trainer.setup_datasets(int(reference.input_shape[1]))
+        rows.append(trainer.report_row(args.reference, reference, trainer.evaluate(reference, validation)))
+
+    for variant in args.variants:
+        input_size, width = parse_variant(variant)
+        model, accuracy = trainer.train_variant(input_size, width, args.epochs)
+        rows.append(trainer.report_row(model.name, model, accuracy))
+        models[model.name] = model
+
+    print(f"{'model':<40} {'input':>6} {'params':>10} {'val acc':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for row in rows:
+        print(f"{row['model'][:40]:<40} {row['input_size']:>6} {row['params']:>10,} {row['val_accuracy']:>8.2%} "
+              f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f}")
+
+    candidates = [row for row in rows if row["model"] in models
+                  and (args.latency_budget_ms is None or row["p95_ms"] <= args.latency_budget_ms)]
+    chosen = max(candidates, key=lambda row: row["val_accuracy"]) if candidates else None
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    if chosen is not None:
+        models[chosen["model"]].save(args.output)
+        print(f"Exported {chosen['model']} to {args.output}")
+    else:
+        print(f"No model met the {args.latency_budget_ms} ms latency budget; nothing exported")
+
+    with open(args.report, "w") as f:
+        json.dump({
+            "classes": args.classes,
+            "output": "sigmoid probability of the positive class, shape (N, 1)",
+            "latency_budget_ms": args.latency_budget_ms,
+            "chosen": chosen["model"] if chosen else None,
+            "models": rows
+        }, f, indent=2)
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
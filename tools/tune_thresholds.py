@@ -0,0 +1,81 @@
+"""Re-tune alert thresholds by replaying recorded scores and landmarks instead of re-running the models.
+
+Record telemetry once (`main.py analyze trip.mp4 --telemetry telemetry/trip` or `main.py run --telemetry DIR`),
+then evaluate any grid of settings in seconds:
+
+Usage:
+    python -m tools.tune_thresholds telemetry/trip --grid HEAD_TILT_THRESHOLD=3,4,5,6 \
+        POSTURE_ALERT_THRESHOLD=1,1.5,2 FATIGUE_THRESHOLD=0.6,0.7,0.8 --workers 4 --output tuning.csv
+"""
+import argparse
+import csv
+import json
+import logging
+from modules.telemetry_store import TelemetryStore
+from modules.threshold_replay import (ALERT_TYPES, DEFAULT_THRESHOLDS, ReplayFeatures, ThresholdReplay,
+                                      recorded_summary)
+
+
+def parse_grid(items):
+    """Parse NAME=v1,v2,... items into {NAME: [values]}."""
+    grid = {}
+    for item in items or []:
+        name, _, values = item.partition("=")
+        name = name.strip().upper()
+        if name not in DEFAULT_THRESHOLDS:
+            raise ValueError(f"Unknown threshold {name}; choose from {', '.join(DEFAULT_THRESHOLDS)}")
+        grid[name] = [float(value) for value in values.split(",") if value]
+    return grid
+
+
+def flatten(row):
+    """One CSV row: the settings followed by episodes and alert seconds per alert type."""
+    flat = dict(row["thresholds"])
+    for name in ALERT_TYPES:
+        key = name.replace(" ", "_")
+        flat[f"{key}_episodes"] = row["alerts"][name]["episodes"]
+        flat[f"{key}_seconds"] = row["alerts"][name]["alert_seconds"]
+    return flat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded telemetry under a grid of alert thresholds")
+    parser.add_argument("store", help="Telemetry store directory")
+    parser.add_argument("--grid", nargs="+", metavar="NAME=V1,V2",
+                        help=f"Threshold values to try; any of {', '.join(DEFAULT_THRESHOLDS)}")
+    parser.add_argument("--start", type=float, help="Only replay from this timestamp")
+    parser.add_argument("--end", type=float, help="Only replay up to this timestamp")
+    parser.add_argument("--workers", type=int, default=1, help="Processes to spread the grid over")
+    parser.add_argument("--output", help="Write every setting's results to .csv or .json")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    grid = parse_grid(args.grid)
+    features = ReplayFeatures.from_store(TelemetryStore(args.store), args.start, args.end)
+    rows = ThresholdReplay(features, args.workers).run(grid)
+    recorded = recorded_summary(features)
+
+    # Alert episodes per setting, with what the live system raised for reference
+    labels = [", ".join(f"{name}={row['thresholds'][name]:g}" for name in grid) or "defaults" for row in rows]
+    width = max([len(label) for label in labels] + [24])
+    print(f"Replayed {len(rows)} settings over {len(features)} frames")
+    print(f"{'setting':<{width}} " + " ".join(f"{name.replace(' ', '_')[:15]:>15}" for name in ALERT_TYPES))
+    print(f"{'recorded (live system)':<{width}} " + " ".join(f"{recorded[name]['episodes']:>15}" for name in ALERT_TYPES))
+    for label, row in zip(labels, rows):
+        print(f"{label:<{width}} " + " ".join(f"{row['alerts'][name]['episodes']:>15}" for name in ALERT_TYPES))
+
+    if args.output:
+        if args.output.lower().endswith(".csv"):
+            flat_rows = [flatten(row) for row in rows]
+            with open(args.output, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(flat_rows[0]))
+                writer.writeheader()
+                writer.writerows(flat_rows)
+        else:
+            with open(args.output, "w") as f:
+                json.dump({"frames": len(features), "recorded": recorded, "settings": rows}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()